@@ -0,0 +1,71 @@
+"""Time vent.calculate_effective_air_rate_change on increasingly large stocks.
+
+Run with ``python -m benchmarks.bench_effective_air_rate_change`` - time per row
+should stay flat as the number of rows grows if the dispatch scales linearly.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from rcbm import vent
+
+
+def _make_inputs(no_rows: int, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        "ventilation_method": pd.Series(
+            rng.choice(vent.VENTILATION_METHODS, size=no_rows)
+        ),
+        "building_volume": pd.Series(rng.uniform(100, 600, size=no_rows)),
+        "infiltration_rate": pd.Series(rng.uniform(0.1, 1.5, size=no_rows)),
+        "heat_exchanger_efficiency": pd.Series(rng.uniform(50, 90, size=no_rows)),
+    }
+
+
+def _time(func, repeat: int, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(**kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>12} {'validated [s]':>14} {'trusted [s]':>12}"
+        f" {'categorical [s]':>16} {'ns/row':>8}"
+    )
+    no_rows = 1_000
+    while no_rows <= args.max_rows:
+        inputs = _make_inputs(no_rows)
+        validated = _time(
+            vent.calculate_effective_air_rate_change, args.repeat, **inputs
+        )
+        with vent.trusted_inputs():
+            trusted = _time(
+                vent.calculate_effective_air_rate_change, args.repeat, **inputs
+            )
+            inputs["ventilation_method"] = inputs["ventilation_method"].astype(
+                vent.VENTILATION_METHOD_DTYPE
+            )
+            categorical = _time(
+                vent.calculate_effective_air_rate_change, args.repeat, **inputs
+            )
+        print(
+            f"{no_rows:>12} {validated:>14.4f} {trusted:>12.4f}"
+            f" {categorical:>16.4f} {categorical / no_rows * 1e9:>8.1f}"
+        )
+        no_rows *= 10
+
+
+if __name__ == "__main__":
+    main()
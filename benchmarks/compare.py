@@ -0,0 +1,69 @@
+"""Compare two benchmarks.suite JSON reports & flag regressions.
+
+Run with ``python -m benchmarks.compare base.json new.json`` - exits with
+status 1 if any benchmark got slower or allocates more than --threshold.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any
+from typing import Dict
+from typing import List
+
+METRICS = ["seconds", "peak_memory_bytes"]
+
+
+def _load_results(path: str) -> Dict[Any, Dict[str, Any]]:
+    with open(path) as f:
+        report = json.load(f)
+    return {(r["benchmark"], r["rows"]): r for r in report["results"]}
+
+
+def compare(
+    base: Dict[Any, Dict[str, Any]],
+    new: Dict[Any, Dict[str, Any]],
+    threshold: float = 0.1,
+) -> List[Dict[str, Any]]:
+    comparisons = []
+    for key in base.keys() & new.keys():
+        benchmark, rows = key
+        for metric in METRICS:
+            ratio = new[key][metric] / max(base[key][metric], 1e-12)
+            comparisons.append(
+                {
+                    "benchmark": benchmark,
+                    "rows": rows,
+                    "metric": metric,
+                    "base": base[key][metric],
+                    "new": new[key][metric],
+                    "ratio": ratio,
+                    "is_regression": ratio > 1 + threshold,
+                }
+            )
+    return sorted(comparisons, key=lambda c: (c["benchmark"], c["rows"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    comparisons = compare(
+        _load_results(args.base), _load_results(args.new), threshold=args.threshold
+    )
+    print(f"{'benchmark':<50} {'rows':>10} {'metric':>18} {'ratio':>8}")
+    for c in comparisons:
+        flag = "  REGRESSION" if c["is_regression"] else ""
+        print(
+            f"{c['benchmark']:<50} {c['rows']:>10} {c['metric']:>18}"
+            f" {c['ratio']:>8.2f}{flag}"
+        )
+    if any(c["is_regression"] for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Seeded synthetic building stocks with realistic mixes of every model input."""
+
+import numpy as np
+import pandas as pd
+
+from rcbm import vent
+
+# wall, roof, floor, window & door U-values [W/m²K] of (pre-1980, 1980-2005,
+# 2006-2011 & post-2011) dwellings - stocks mostly share these defaults
+AGE_BAND_UVALUES = {
+    "wall": [2.1, 1.1, 0.55, 0.21],
+    "roof": [2.3, 0.68, 0.4, 0.16],
+    "floor": [0.8, 0.6, 0.45, 0.21],
+    "window": [4.8, 3.1, 2.2, 1.4],
+    "door": [3.0, 3.0, 3.0, 1.5],
+}
+AGE_BAND_WEIGHTS = [0.25, 0.35, 0.2, 0.2]
+STRUCTURE_TYPE_WEIGHTS = [0.1, 0.75, 0.1, 0.05]
+FLOOR_TYPE_WEIGHTS = [0.7, 0.15, 0.15]
+VENTILATION_METHOD_WEIGHTS = [0.03, 0.85, 0.04, 0.05, 0.03]
+
+
+def _categorical(rng, size, dtype, weights) -> pd.Categorical:
+    codes = rng.choice(len(dtype.categories), size=size, p=weights)
+    return pd.Categorical.from_codes(codes.astype("int8"), dtype=dtype)
+
+
+def make_stock(no_rows: int, seed: int = 42) -> pd.DataFrame:
+    """A stock of no_rows valid buildings with one column per model input.
+
+    The same seed always gives the same stock.  Enumerations are categoricals
+    so even 1e7 rows fit comfortably in memory.
+    """
+    rng = np.random.default_rng(seed)
+
+    no_storeys = rng.choice([1, 2, 3], size=no_rows, p=[0.3, 0.6, 0.1])
+    total_floor_area = np.clip(rng.lognormal(np.log(100), 0.35, no_rows), 30, 400)
+    total_floor_area = total_floor_area.round(1)
+    ground_floor_area = total_floor_area / no_storeys
+    storey_height = 2.5
+    window_area = (0.15 * total_floor_area).round(1)
+    wall_area = 4 * np.sqrt(ground_floor_area) * storey_height * no_storeys
+    age_band = rng.choice(len(AGE_BAND_WEIGHTS), size=no_rows, p=AGE_BAND_WEIGHTS)
+    uvalues = {
+        component: np.array(values)[age_band]
+        for component, values in AGE_BAND_UVALUES.items()
+    }
+
+    ventilation_method = _categorical(
+        rng, no_rows, vent.VENTILATION_METHOD_DTYPE, VENTILATION_METHOD_WEIGHTS
+    )
+    is_heat_recovery = ventilation_method == "mechanical_ventilation_heat_recovery"
+    has_permeability_test = rng.random(no_rows) < 0.1
+
+    return pd.DataFrame(
+        {
+            "roof_area": ground_floor_area.round(1),
+            "roof_uvalue": uvalues["roof"],
+            "wall_area": (wall_area - window_area).round(1),
+            "wall_uvalue": uvalues["wall"],
+            "floor_area": ground_floor_area.round(1),
+            "floor_uvalue": uvalues["floor"],
+            "window_area": window_area,
+            "window_uvalue": uvalues["window"],
+            "door_area": rng.choice([1.85, 2.0, 3.7], size=no_rows),
+            "door_uvalue": uvalues["door"],
+            "total_floor_area": total_floor_area,
+            "building_volume": (total_floor_area * storey_height).round(1),
+            "no_chimneys": rng.poisson(0.6, no_rows),
+            "no_open_flues": rng.poisson(0.2, no_rows),
+            "no_fans": rng.poisson(1.5, no_rows),
+            "no_room_heaters": rng.poisson(0.1, no_rows),
+            "is_draught_lobby": rng.random(no_rows) < 0.2,
+            "permeability_test_result": np.where(
+                has_permeability_test, rng.uniform(0.1, 1.0, no_rows).round(2), np.nan
+            ),
+            "no_storeys": no_storeys,
+            "percentage_draught_stripped": rng.choice(
+                [0, 25, 50, 75, 100], size=no_rows
+            ),
+            "is_floor_suspended": _categorical(
+                rng, no_rows, vent.FLOOR_TYPE_DTYPE, FLOOR_TYPE_WEIGHTS
+            ),
+            "structure_type": _categorical(
+                rng, no_rows, vent.STRUCTURE_TYPE_DTYPE, STRUCTURE_TYPE_WEIGHTS
+            ),
+            "no_sides_sheltered": rng.choice(5, size=no_rows),
+            "ventilation_method": ventilation_method,
+            "heat_exchanger_efficiency": np.where(
+                is_heat_recovery, rng.uniform(60, 90, no_rows).round(), np.nan
+            ),
+        }
+    )
@@ -0,0 +1,222 @@
+"""Time & memory-profile rcbm's public functions on synthetic stocks.
+
+Run with ``python -m benchmarks.suite --rows 1000 100000 --output base.json`` &
+compare two runs with ``python -m benchmarks.compare base.json new.json``.
+Each benchmark is timed (best of --repeat runs) & then run once more under
+tracemalloc to record its peak allocation.
+"""
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pandera as pa
+
+from benchmarks.stock import make_stock
+from rcbm import arrays
+from rcbm import fab
+from rcbm import htuse
+from rcbm import pipeline
+from rcbm import vent
+
+INFILTRATION_RATE_COLUMNS = [
+    c
+    for c in vent.INPUT_COLUMNS
+    if c not in ("ventilation_method", "heat_exchanger_efficiency")
+]
+
+
+def _fabric_heat_loss_coefficient(stock: pd.DataFrame) -> Callable[[], Any]:
+    inputs = {c: stock[c] for c in pipeline.FABRIC_COLUMNS}
+    return lambda: fab.calculate_fabric_heat_loss_coefficient(**inputs)
+
+
+def _heat_loss_parameter(stock: pd.DataFrame) -> Callable[[], Any]:
+    heat_loss = pipeline.calculate_heat_loss(stock)
+    return lambda: fab.calculate_heat_loss_parameter(
+        heat_loss["fabric_heat_loss_coefficient"],
+        heat_loss["ventilation_heat_loss_coefficient"],
+        stock["total_floor_area"],
+    )
+
+
+def _infiltration_rate(stock: pd.DataFrame) -> Callable[[], Any]:
+    inputs = {c: stock[c] for c in INFILTRATION_RATE_COLUMNS}
+    return lambda: vent.calculate_infiltration_rate(**inputs)
+
+
+def _effective_air_rate_change(stock: pd.DataFrame) -> Callable[[], Any]:
+    infiltration_rate = vent.calculate_infiltration_rate(
+        **{c: stock[c] for c in INFILTRATION_RATE_COLUMNS}
+    )
+    return lambda: vent.calculate_effective_air_rate_change(
+        ventilation_method=stock["ventilation_method"],
+        building_volume=stock["building_volume"],
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=stock["heat_exchanger_efficiency"],
+    )
+
+
+def _ventilation_heat_loss_coefficient(stock: pd.DataFrame) -> Callable[[], Any]:
+    heat_loss = pipeline.calculate_heat_loss(stock, keep_intermediates=True)
+    return lambda: vent.calculate_ventilation_heat_loss_coefficient(
+        stock["building_volume"], heat_loss["effective_air_rate_change"]
+    )
+
+
+def _heat_loss_per_year(stock: pd.DataFrame) -> Callable[[], Any]:
+    heat_loss_coefficient = pipeline.calculate_heat_loss(stock)["heat_loss_coefficient"]
+    return lambda: htuse.calculate_heat_loss_per_year(heat_loss_coefficient, None, None)
+
+
+def _heat_loss_per_month(stock: pd.DataFrame) -> Callable[[], Any]:
+    heat_loss_coefficient = pipeline.calculate_heat_loss(stock)["heat_loss_coefficient"]
+    return lambda: htuse.calculate_heat_loss_per_month(heat_loss_coefficient)
+
+
+def _pipeline(stock: pd.DataFrame) -> Callable[[], Any]:
+    return lambda: pipeline.calculate_heat_loss(stock)
+
+
+def _deduplicated_pipeline(stock: pd.DataFrame) -> Callable[[], Any]:
+    return lambda: pipeline.calculate_heat_loss(stock, deduplicate=True)
+
+
+def _trusted_pipeline(stock: pd.DataFrame) -> Callable[[], Any]:
+    return lambda: pipeline.calculate_heat_loss(stock, validate=False)
+
+
+def _arrays_infiltration_rate(stock: pd.DataFrame) -> Callable[[], Any]:
+    columns = pipeline._to_arrays(stock)
+    inputs = {c: columns[c] for c in INFILTRATION_RATE_COLUMNS}
+    return lambda: arrays.calculate_infiltration_rate(**inputs)
+
+
+def _arrays_effective_air_rate_change(stock: pd.DataFrame) -> Callable[[], Any]:
+    columns = pipeline._to_arrays(stock)
+    infiltration_rate = arrays.calculate_infiltration_rate(
+        **{c: columns[c] for c in INFILTRATION_RATE_COLUMNS}
+    )
+    return lambda: arrays.calculate_effective_air_rate_change(
+        ventilation_method=columns["ventilation_method"],
+        building_volume=columns["building_volume"],
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=columns["heat_exchanger_efficiency"],
+    )
+
+
+def _arrays_heat_loss(stock: pd.DataFrame) -> Callable[[], Any]:
+    columns = pipeline._to_arrays(stock)
+    return lambda: arrays.calculate_heat_loss(columns)
+
+
+BENCHMARKS: Dict[str, Callable[[pd.DataFrame], Callable[[], Any]]] = {
+    "fab.calculate_fabric_heat_loss_coefficient": _fabric_heat_loss_coefficient,
+    "fab.calculate_heat_loss_parameter": _heat_loss_parameter,
+    "vent.calculate_infiltration_rate": _infiltration_rate,
+    "vent.calculate_effective_air_rate_change": _effective_air_rate_change,
+    "vent.calculate_ventilation_heat_loss_coefficient": (
+        _ventilation_heat_loss_coefficient
+    ),
+    "htuse.calculate_heat_loss_per_year": _heat_loss_per_year,
+    "htuse.calculate_heat_loss_per_month": _heat_loss_per_month,
+    "pipeline.calculate_heat_loss": _pipeline,
+    "pipeline.calculate_heat_loss[deduplicate=True]": _deduplicated_pipeline,
+    "pipeline.calculate_heat_loss[validate=False]": _trusted_pipeline,
+    "arrays.calculate_infiltration_rate": _arrays_infiltration_rate,
+    "arrays.calculate_effective_air_rate_change": _arrays_effective_air_rate_change,
+    "arrays.calculate_heat_loss": _arrays_heat_loss,
+}
+
+
+def _time(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _measure_peak_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run(
+    rows: List[int],
+    repeat: int = 3,
+    seed: int = 42,
+    names: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    names = names or list(BENCHMARKS)
+    results = []
+    for no_rows in rows:
+        stock = make_stock(no_rows, seed=seed)
+        for name in names:
+            func = BENCHMARKS[name](stock)
+            results.append(
+                {
+                    "benchmark": name,
+                    "rows": no_rows,
+                    "seconds": _time(func, repeat),
+                    "peak_memory_bytes": _measure_peak_memory(func),
+                }
+            )
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "versions": {
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pandera": pa.__version__,
+        },
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--benchmark", action="append", choices=list(BENCHMARKS), dest="names"
+    )
+    parser.add_argument("--output", help="save results to this JSON file")
+    args = parser.parse_args()
+
+    report = run(args.rows, repeat=args.repeat, seed=args.seed, names=args.names)
+    print(f"{'benchmark':<50} {'rows':>10} {'time [s]':>10} {'peak [MB]':>10}")
+    for result in report["results"]:
+        print(
+            f"{result['benchmark']:<50} {result['rows']:>10}"
+            f" {result['seconds']:>10.4f}"
+            f" {result['peak_memory_bytes'] / 1e6:>10.1f}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from rcbm.pipeline import calculate_heat_loss
+
+__all__ = ["calculate_heat_loss"]
@@ -0,0 +1,712 @@
+"""The fab, vent & htuse calculations on plain NumPy arrays.
+
+Every function takes & returns ndarrays - no index alignment, no schema
+validation & no pandas objects - so per-call overhead is a few microseconds.
+Enumerations are integer codes into STRUCTURE_TYPES, FLOOR_TYPES &
+VENTILATION_METHODS (see encode) where unknown codes give NaN.  The pandas
+functions in fab, vent & htuse validate their inputs & wrap these.
+"""
+
+from typing import Dict
+from typing import Iterator
+from typing import Mapping
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from rcbm import dtypes
+
+FABRIC_COMPONENTS = ["roof", "wall", "floor", "window", "door"]
+
+STRUCTURE_TYPES = [
+    "unknown",
+    "masonry",
+    "timber_or_steel",
+    "concrete",
+]
+
+FLOOR_TYPES = ["none", "sealed", "unsealed"]
+
+VENTILATION_METHODS = [
+    "positive_input_ventilation_from_loft",
+    "natural_ventilation",
+    "mechanical_ventilation_no_heat_recovery",
+    "mechanical_ventilation_heat_recovery",
+    "positive_input_ventilation_from_outside",
+]
+
+OPENING_VENTILATION_RATES = {
+    "no_chimneys": 40,
+    "no_open_flues": 20,
+    "no_fans": 10,
+    "no_room_heaters": 40,
+}
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=dtypes.get_float_dtype())
+
+
+def encode(values, categories: list) -> np.ndarray:
+    """Integer codes of values in categories - values not in categories are -1.
+
+    Nulls (None or NaN) are not in categories so they are -1 too.
+    """
+    values = np.asarray(values)
+    if values.dtype == object:
+        # mixed objects such as strings & nulls cannot be sorted
+        return pd.Categorical(values, categories=categories).codes
+    categories = np.asarray(categories)
+    order = np.argsort(categories)
+    sorted_categories = categories[order]
+    positions = np.searchsorted(sorted_categories, values)
+    np.clip(positions, 0, len(categories) - 1, out=positions)
+    codes = order[positions]
+    codes[sorted_categories[positions] != values] = -1
+    return codes
+
+
+def _map_codes(codes: np.ndarray, rates: list) -> np.ndarray:
+    # -1 (unknown) indexes the trailing NaN
+    lookup = np.array(list(rates) + [np.nan], dtype=dtypes.get_float_dtype())
+    return lookup[np.asarray(codes)]
+
+
+def _raise_for_zero_floor_areas(floor_areas: np.ndarray) -> None:
+    floor_areas = np.asarray(floor_areas, dtype="float64")
+    if ((floor_areas == 0) | np.isnan(floor_areas)).any():
+        raise ZeroDivisionError(
+            "Cannot divide heat_loss_coefficient by zero"
+            " - please remove any zero floor areas!"
+        )
+
+
+def calculate_fabric_component_heat_loss_coefficient(
+    component_area: np.ndarray,
+    component_uvalue: np.ndarray,
+    thermal_bridging_factor: float = 0.05,
+) -> np.ndarray:
+    component_area = _as_float(component_area)
+    return component_area * (_as_float(component_uvalue) + thermal_bridging_factor)
+
+
+def calculate_fabric_heat_loss_coefficient(
+    roof_area: np.ndarray,
+    roof_uvalue: np.ndarray,
+    wall_area: np.ndarray,
+    wall_uvalue: np.ndarray,
+    floor_area: np.ndarray,
+    floor_uvalue: np.ndarray,
+    window_area: np.ndarray,
+    window_uvalue: np.ndarray,
+    door_area: np.ndarray,
+    door_uvalue: np.ndarray,
+    thermal_bridging_factor: float = 0.05,
+) -> np.ndarray:
+    columns = {
+        "roof_area": roof_area,
+        "roof_uvalue": roof_uvalue,
+        "wall_area": wall_area,
+        "wall_uvalue": wall_uvalue,
+        "floor_area": floor_area,
+        "floor_uvalue": floor_uvalue,
+        "window_area": window_area,
+        "window_uvalue": window_uvalue,
+        "door_area": door_area,
+        "door_uvalue": door_uvalue,
+    }
+    columns = {column: _as_float(values) for column, values in columns.items()}
+    return _calculate_fabric_heat_loss_coefficient(
+        columns,
+        _as_float(thermal_bridging_factor),
+        np.empty_like(columns["roof_area"]),
+    )
+
+
+def calculate_heat_loss_parameter(
+    fabric_heat_loss_coefficient: np.ndarray,
+    ventilation_heat_loss_coefficient: np.ndarray,
+    total_floor_area: np.ndarray,
+) -> np.ndarray:
+    _raise_for_zero_floor_areas(total_floor_area)
+    heat_loss_coefficient = _as_float(fabric_heat_loss_coefficient) + _as_float(
+        ventilation_heat_loss_coefficient
+    )
+    return heat_loss_coefficient / _as_float(total_floor_area)
+
+
+def calculate_infiltration_rate_due_to_opening(
+    no_openings: np.ndarray, building_volume: np.ndarray, ventilation_rate: int
+) -> np.ndarray:
+    return _as_float(no_openings) * ventilation_rate / _as_float(building_volume)
+
+
+def calculate_infiltration_rate_due_to_draught_lobby(
+    is_draught_lobby: np.ndarray,
+) -> np.ndarray:
+    return np.where(np.asarray(is_draught_lobby, dtype="bool"), 0, 0.05).astype(
+        dtypes.get_float_dtype(), copy=False
+    )
+
+
+def calculate_infiltration_rate_due_to_openings(
+    building_volume: np.ndarray,
+    no_chimneys: np.ndarray,
+    no_open_flues: np.ndarray,
+    no_fans: np.ndarray,
+    no_room_heaters: np.ndarray,
+    is_draught_lobby: np.ndarray,
+) -> np.ndarray:
+    building_volume = _as_float(building_volume)
+    columns = {
+        "building_volume": building_volume,
+        "no_chimneys": _as_float(no_chimneys),
+        "no_open_flues": _as_float(no_open_flues),
+        "no_fans": _as_float(no_fans),
+        "no_room_heaters": _as_float(no_room_heaters),
+        "is_draught_lobby": np.asarray(is_draught_lobby, dtype="bool"),
+    }
+    return _calculate_infiltration_rate_due_to_openings(
+        columns, np.empty_like(building_volume)
+    )
+
+
+def calculate_infiltration_rate_due_to_height(no_storeys: np.ndarray) -> np.ndarray:
+    return (_as_float(no_storeys) - 1) * 0.1
+
+
+def calculate_infiltration_rate_due_to_structure_type(
+    structure_type: np.ndarray, unknown_structure_infiltration_rate: float = 0.35
+) -> np.ndarray:
+    return _map_codes(
+        structure_type, [unknown_structure_infiltration_rate, 0.35, 0.25, 0]
+    )
+
+
+def calculate_infiltration_rate_due_to_suspended_floor(
+    is_floor_suspended: np.ndarray,
+) -> np.ndarray:
+    return _map_codes(is_floor_suspended, [0, 0.1, 0.2])
+
+
+def calculate_infiltration_rate_due_to_draught(
+    percentage_draught_stripped: np.ndarray,
+) -> np.ndarray:
+    return 0.25 - (0.2 * (_as_float(percentage_draught_stripped) / 100))
+
+
+def calculate_infiltration_rate_due_to_structure(
+    permeability_test_result: np.ndarray,
+    no_storeys: np.ndarray,
+    percentage_draught_stripped: np.ndarray,
+    is_floor_suspended: np.ndarray,
+    structure_type: np.ndarray,
+) -> np.ndarray:
+    no_storeys = _as_float(no_storeys)
+    columns = {
+        "permeability_test_result": _as_float(permeability_test_result),
+        "no_storeys": no_storeys,
+        "percentage_draught_stripped": _as_float(percentage_draught_stripped),
+        "is_floor_suspended": np.asarray(is_floor_suspended),
+        "structure_type": np.asarray(structure_type),
+    }
+    return _calculate_infiltration_rate_due_to_structure(
+        columns, np.empty_like(no_storeys)
+    )
+
+
+def calculate_infiltration_rate_adjustment_factor(
+    no_sides_sheltered: np.ndarray,
+) -> np.ndarray:
+    return 1 - _as_float(no_sides_sheltered) * 0.075
+
+
+def calculate_infiltration_rate(
+    no_sides_sheltered: np.ndarray,
+    building_volume: np.ndarray,
+    no_chimneys: np.ndarray,
+    no_open_flues: np.ndarray,
+    no_fans: np.ndarray,
+    no_room_heaters: np.ndarray,
+    is_draught_lobby: np.ndarray,
+    permeability_test_result: np.ndarray,
+    no_storeys: np.ndarray,
+    percentage_draught_stripped: np.ndarray,
+    is_floor_suspended: np.ndarray,
+    structure_type: np.ndarray,
+) -> np.ndarray:
+    infiltration_rate = calculate_infiltration_rate_due_to_openings(
+        building_volume=building_volume,
+        no_chimneys=no_chimneys,
+        no_open_flues=no_open_flues,
+        no_fans=no_fans,
+        no_room_heaters=no_room_heaters,
+        is_draught_lobby=is_draught_lobby,
+    )
+    infiltration_rate += calculate_infiltration_rate_due_to_structure(
+        permeability_test_result=permeability_test_result,
+        no_storeys=no_storeys,
+        percentage_draught_stripped=percentage_draught_stripped,
+        is_floor_suspended=is_floor_suspended,
+        structure_type=structure_type,
+    )
+    infiltration_rate *= calculate_infiltration_rate_adjustment_factor(
+        no_sides_sheltered
+    )
+    return infiltration_rate
+
+
+def _calculate_natural_ventilation_air_rate_change(
+    infiltration_rate: np.ndarray,
+) -> np.ndarray:
+    return np.where(
+        infiltration_rate > 1, infiltration_rate, 0.5 + (infiltration_rate**2) * 0.5
+    )
+
+
+# NOTE: every method is one row of coefficients in
+#   (natural(infiltration_rate) if is_natural else infiltration_rate + offset)
+#   + loft_rate / building_volume
+#   + 0.5 * (1 - heat_exchanger_efficiency / 100) if is_heat_recovery
+# bounded below by minimum - rows are in VENTILATION_METHODS order & the
+# trailing row is indexed by -1 (unknown) codes, which give NaN
+_AIR_RATE_CHANGE_COEFFICIENTS = {
+    "is_natural": [True, True, False, False, False, False],
+    "offset": [0, 0, 0.5, 0, 0.25, np.nan],
+    "loft_rate": [20, 0, 0, 0, 0, 0],
+    "is_heat_recovery": [False, False, False, True, False, False],
+    "minimum": [-np.inf, -np.inf, -np.inf, -np.inf, 0.5, np.nan],
+}
+
+
+def calculate_effective_air_rate_change(
+    ventilation_method: np.ndarray,
+    building_volume: np.ndarray,
+    infiltration_rate: np.ndarray,
+    heat_exchanger_efficiency: np.ndarray,
+) -> np.ndarray:
+    # NOTE: methods are dispatched by indexing per-method coefficients with
+    # the codes, so every row is calculated in one pass in input order with no
+    # per-method masks, gathers or scatters
+    codes = np.asarray(ventilation_method)
+    building_volume = _as_float(building_volume)
+    infiltration_rate = _as_float(infiltration_rate)
+    heat_exchanger_efficiency = _as_float(heat_exchanger_efficiency)
+    dtype = infiltration_rate.dtype
+    coefficients = {
+        name: np.asarray(values, dtype=bool if name.startswith("is_") else dtype)[codes]
+        for name, values in _AIR_RATE_CHANGE_COEFFICIENTS.items()
+    }
+
+    effective_air_rate_change = infiltration_rate + coefficients["offset"]
+    np.copyto(
+        effective_air_rate_change,
+        _calculate_natural_ventilation_air_rate_change(infiltration_rate),
+        where=coefficients["is_natural"],
+    )
+    loft_rate = coefficients["loft_rate"]
+    np.divide(loft_rate, building_volume, out=loft_rate, where=loft_rate != 0)
+    effective_air_rate_change += loft_rate
+    np.add(
+        effective_air_rate_change,
+        0.5 * (1 - heat_exchanger_efficiency / 100),
+        out=effective_air_rate_change,
+        where=coefficients["is_heat_recovery"],
+    )
+    np.maximum(
+        effective_air_rate_change,
+        coefficients["minimum"],
+        out=effective_air_rate_change,
+    )
+    return effective_air_rate_change
+
+
+def calculate_ventilation_heat_loss_coefficient(
+    building_volume: np.ndarray,
+    effective_air_rate_change: np.ndarray,
+    ventilation_heat_loss_constant: float = 0.33,  # SEAI, DEAP 4.2.0
+) -> np.ndarray:
+    return (
+        _as_float(building_volume)
+        * ventilation_heat_loss_constant
+        * _as_float(effective_air_rate_change)
+    )
+
+
+def _get_monthly_delta_t_and_heating_hours(
+    internal_temperatures=None,
+    external_temperatures=None,
+):
+    # heating_months are ["jan", "feb", "mar", "apr", "may", "oct", "nov", "dec"]
+    heating_hours = np.array(
+        [d * 24 for d in (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)]
+    )
+    heating_hours[5:9] = 0
+
+    if internal_temperatures is None:
+        internal_temperatures = np.array(
+            [
+                17.72,
+                17.73,
+                17.85,
+                17.95,
+                18.15,
+                18.35,
+                18.50,
+                18.48,
+                18.33,
+                18.11,
+                17.88,
+                17.77,
+            ]
+        )
+
+    if external_temperatures is None:
+        external_temperatures = np.array(
+            [
+                5.3,
+                5.5,
+                7.0,
+                8.3,
+                11.0,
+                13.5,
+                15.5,
+                15.2,
+                13.3,
+                10.4,
+                7.5,
+                6.0,
+            ]
+        )
+    delta_t = internal_temperatures - external_temperatures
+
+    return delta_t, heating_hours
+
+
+def _calculate_heat_loss_kwh_by_outer_product(
+    heat_loss_coefficient, delta_t, hours, per_period=False
+):
+    # NOTE: annual heat loss is HLC x sum(delta_t x hours) so the (N, n_periods)
+    # outer product is only built if the per-period breakdown is asked for
+    heat_loss_coefficient = _as_float(heat_loss_coefficient)
+    delta_t = _as_float(delta_t)
+    hours = _as_float(hours)
+    w_to_kwh = 1 / 1000
+    if per_period:
+        return heat_loss_coefficient[:, np.newaxis] * (delta_t * hours * w_to_kwh)
+    return heat_loss_coefficient * (delta_t @ hours * w_to_kwh)
+
+
+def _iter_hourly_delta_t(
+    internal_temperatures, external_temperatures, no_buildings, block_size
+) -> Iterator[Tuple[slice, np.ndarray]]:
+    # NOTE: temperatures are either one profile for all buildings (n_hours,) or
+    # one profile per building (no_buildings, n_hours) - the latter are sliced
+    # into blocks of rows so (no_buildings, n_hours) is never built in memory &
+    # only each block is cast to the float dtype policy
+    dtype = dtypes.get_float_dtype()
+    if internal_temperatures is None or external_temperatures is None:
+        raise ValueError(
+            "Hourly mode needs hourly internal_temperatures & external_temperatures"
+            " - there are no default hourly profiles!"
+        )
+    internal_temperatures = np.asarray(internal_temperatures)
+    external_temperatures = np.asarray(external_temperatures)
+    for temperatures in (internal_temperatures, external_temperatures):
+        if temperatures.ndim not in (1, 2):
+            raise ValueError(
+                "Hourly temperatures must be one profile (n_hours,) or one per"
+                f" building (no_buildings, n_hours) - got {temperatures.ndim}"
+                " dimensions!"
+            )
+        if temperatures.ndim == 2 and len(temperatures) != no_buildings:
+            raise ValueError(
+                "Hourly temperatures must have one row per building"
+                f" - got {len(temperatures)} rows for {no_buildings} buildings!"
+            )
+    if internal_temperatures.shape[-1] != external_temperatures.shape[-1]:
+        raise ValueError(
+            "internal_temperatures & external_temperatures must cover the same hours!"
+        )
+
+    for start in range(0, no_buildings, block_size):
+        block = slice(start, min(start + block_size, no_buildings))
+        internal = (
+            internal_temperatures[block]
+            if internal_temperatures.ndim == 2
+            else internal_temperatures
+        )
+        external = (
+            external_temperatures[block]
+            if external_temperatures.ndim == 2
+            else external_temperatures
+        )
+        delta_t = np.subtract(internal, external, dtype=dtype)
+        # no heat is lost in hours when it is warmer outside than inside
+        np.maximum(delta_t, 0, out=delta_t)
+        yield block, delta_t
+
+
+def _calculate_degree_hours(
+    internal_temperatures, external_temperatures, no_buildings, block_size=100_000
+) -> np.ndarray:
+    degree_hours = np.empty(no_buildings)
+    for block, delta_t in _iter_hourly_delta_t(
+        internal_temperatures=internal_temperatures,
+        external_temperatures=external_temperatures,
+        no_buildings=no_buildings,
+        block_size=block_size,
+    ):
+        # accumulate in float64 so float32 rounding does not grow with n_hours
+        degree_hours[block] = delta_t.sum(axis=-1, dtype="float64")
+    return degree_hours
+
+
+def calculate_heat_loss_per_year(
+    heat_loss_coefficient: np.ndarray,
+    internal_temperatures=None,
+    external_temperatures=None,
+    how: str = "monthly",
+    block_size: int = 100_000,
+) -> np.ndarray:
+    """Annual heat loss [kWh] on monthly average or hourly temperatures.
+
+    Unlike htuse.calculate_heat_loss_per_year the result is not rounded.
+    """
+    if how == "monthly":
+        delta_t, heating_hours = _get_monthly_delta_t_and_heating_hours(
+            internal_temperatures, external_temperatures
+        )
+        return _calculate_heat_loss_kwh_by_outer_product(
+            heat_loss_coefficient, delta_t, heating_hours
+        )
+    if how == "hourly":
+        heat_loss_coefficient = _as_float(heat_loss_coefficient)
+        degree_hours = _calculate_degree_hours(
+            internal_temperatures,
+            external_temperatures,
+            len(heat_loss_coefficient),
+            block_size,
+        )
+        w_to_kwh = 1 / 1000
+        return (heat_loss_coefficient * degree_hours * w_to_kwh).astype(
+            heat_loss_coefficient.dtype, copy=False
+        )
+    raise ValueError(f"how must be 'monthly' or 'hourly' - got {how!r}!")
+
+
+def calculate_heat_loss_per_month(
+    heat_loss_coefficient: np.ndarray,
+    internal_temperatures=None,
+    external_temperatures=None,
+) -> np.ndarray:
+    delta_t, heating_hours = _get_monthly_delta_t_and_heating_hours(
+        internal_temperatures, external_temperatures
+    )
+    return _calculate_heat_loss_kwh_by_outer_product(
+        heat_loss_coefficient, delta_t, heating_hours, per_period=True
+    )
+
+
+def calculate_gain_utilisation_factor(
+    heat_loss: np.ndarray, heat_gain: np.ndarray, time_constant: np.ndarray
+) -> np.ndarray:
+    """ISO 13790:2008 12.2.1.1 utilisation factor of (N, 12) monthly gains.
+
+    time_constant [h] is one per building (N,).  Months without heat loss
+    have no useful gains.
+    """
+    heat_loss = _as_float(heat_loss)
+    heat_gain = _as_float(heat_gain)
+    a = (1 + _as_float(time_constant) / 15)[:, np.newaxis]
+    # NOTE: above a gain/loss ratio of 1 the factor is written in terms of the
+    # inverse ratio r, (r - r ** (a + 1)) / (1 - r ** (a + 1)), so r ** a never
+    # overflows - both forms then share every step & run in a few buffers
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gain_loss_ratio = heat_gain / heat_loss
+        inverse = np.divide(1, gain_loss_ratio)
+        ratio = np.minimum(gain_loss_ratio, inverse)
+        # r if the ratio is above 1, else 1
+        scale = np.minimum(inverse, 1, out=inverse)
+        utilisation_factor = np.power(ratio, a)
+        denominator = np.multiply(ratio, utilisation_factor, out=ratio)
+        np.subtract(1, utilisation_factor, out=utilisation_factor)
+        np.subtract(1, denominator, out=denominator)
+        utilisation_factor /= denominator
+        utilisation_factor *= scale
+    np.copyto(
+        utilisation_factor,
+        np.broadcast_to(a / (a + 1), gain_loss_ratio.shape),
+        where=gain_loss_ratio == 1,
+    )
+    # months without heat loss have no useful gains
+    np.copyto(utilisation_factor, 0, where=~(heat_loss > 0))
+    return utilisation_factor
+
+
+def calculate_space_heating_demand_per_month(
+    heat_loss_coefficient: np.ndarray,
+    thermal_capacitance: np.ndarray,
+    internal_gains=0.0,
+    solar_gains=0.0,
+    internal_temperatures=None,
+    external_temperatures=None,
+) -> np.ndarray:
+    """Monthly heat loss [kWh] net of usable internal & solar gains (N, 12).
+
+    Gains [W] may be anything that broadcasts to (no_buildings, 12) - a
+    scalar, one monthly profile (12,) or one per building (no_buildings, 12).
+    Gains only count in heating hours, as heat loss does.  Months that gain
+    heat through the fabric (a negative heat loss) need no heating - per ISO
+    13790 their utilisation factor is 1/gamma - so demand is never negative.
+    """
+    heat_loss_coefficient = _as_float(heat_loss_coefficient)
+    shape = (len(heat_loss_coefficient), 12)
+    _, heating_hours = _get_monthly_delta_t_and_heating_hours(
+        internal_temperatures, external_temperatures
+    )
+    heat_loss = calculate_heat_loss_per_month(
+        heat_loss_coefficient, internal_temperatures, external_temperatures
+    )
+    w_to_kwh = 1 / 1000
+    heat_gain = np.broadcast_to(
+        _as_float(internal_gains) + _as_float(solar_gains), shape
+    ) * _as_float(heating_hours * w_to_kwh)
+    # ISO 13790:2008 12.2.1.3 - C_m / H in hours
+    time_constant = _as_float(thermal_capacitance) / (3600 * heat_loss_coefficient)
+    utilisation_factor = calculate_gain_utilisation_factor(
+        heat_loss, heat_gain, time_constant
+    )
+    heat_gain *= utilisation_factor
+    heat_loss -= heat_gain
+    return np.maximum(heat_loss, 0, out=heat_loss)
+
+
+def _calculate_fabric_heat_loss_coefficient(
+    columns: Mapping[str, np.ndarray], thermal_bridging_factor: float, buffer
+) -> np.ndarray:
+    heat_loss_coefficient = np.zeros_like(buffer)
+    plane_elements_area = np.zeros_like(buffer)
+    for component in FABRIC_COMPONENTS:
+        area = columns[f"{component}_area"]
+        np.multiply(area, columns[f"{component}_uvalue"], out=buffer)
+        heat_loss_coefficient += buffer
+        plane_elements_area += area
+    plane_elements_area *= thermal_bridging_factor
+    heat_loss_coefficient += plane_elements_area
+    return heat_loss_coefficient
+
+
+def _calculate_infiltration_rate_due_to_openings(
+    columns: Mapping[str, np.ndarray], buffer: np.ndarray
+) -> np.ndarray:
+    infiltration_rate = np.zeros_like(buffer)
+    for column, ventilation_rate in OPENING_VENTILATION_RATES.items():
+        np.multiply(columns[column], ventilation_rate, out=buffer)
+        infiltration_rate += buffer
+    infiltration_rate /= columns["building_volume"]
+    np.add(
+        infiltration_rate,
+        0.05,
+        out=infiltration_rate,
+        where=~columns["is_draught_lobby"],
+    )
+    return infiltration_rate
+
+
+def _calculate_infiltration_rate_due_to_structure(
+    columns: Mapping[str, np.ndarray], buffer: np.ndarray
+) -> np.ndarray:
+    # -1 (unknown) codes index the trailing NaN
+    structure_type_rates = np.array([0.35, 0.35, 0.25, 0, np.nan], dtype=buffer.dtype)
+    suspended_floor_rates = np.array([0, 0.1, 0.2, np.nan], dtype=buffer.dtype)
+
+    infiltration_rate = np.subtract(columns["no_storeys"], 1)
+    infiltration_rate *= 0.1
+    np.take(structure_type_rates, columns["structure_type"], out=buffer)
+    infiltration_rate += buffer
+    np.take(suspended_floor_rates, columns["is_floor_suspended"], out=buffer)
+    infiltration_rate += buffer
+    np.multiply(columns["percentage_draught_stripped"], 0.2 / 100, out=buffer)
+    infiltration_rate += 0.25
+    infiltration_rate -= buffer
+
+    permeability_test_result = columns["permeability_test_result"]
+    np.copyto(
+        infiltration_rate,
+        permeability_test_result,
+        where=~np.isnan(permeability_test_result),
+    )
+    return infiltration_rate
+
+
+def calculate_heat_loss(
+    columns: Mapping[str, np.ndarray],
+    thermal_bridging_factor: float = 0.05,
+    ventilation_heat_loss_constant: float = 0.33,
+    keep_intermediates: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Fabric, ventilation & total HLC & HLP of the arrays in columns.
+
+    columns maps every pipeline.INPUT_COLUMNS to a 1D array - floats in the
+    same dtype, enumerations as codes & is_draught_lobby as bool.  Set
+    keep_intermediates=True to also return the infiltration & air rate change
+    stages.  See calculate_heat_loss_per_year for annual heat loss.
+    """
+    # NOTE: every stage works on plain arrays & writes into a shared buffer so
+    # no stage allocates intermediate Series or aligns on an index
+    buffer = np.empty(
+        len(columns["building_volume"]), dtype=columns["building_volume"].dtype
+    )
+    outputs = {}
+
+    fabric_heat_loss_coefficient = _calculate_fabric_heat_loss_coefficient(
+        columns, thermal_bridging_factor, buffer
+    )
+
+    infiltration_rate_due_to_openings = _calculate_infiltration_rate_due_to_openings(
+        columns, buffer
+    )
+    infiltration_rate_due_to_structure = _calculate_infiltration_rate_due_to_structure(
+        columns, buffer
+    )
+    if keep_intermediates:
+        outputs["infiltration_rate_due_to_openings"] = infiltration_rate_due_to_openings
+        outputs["infiltration_rate_due_to_structure"] = (
+            infiltration_rate_due_to_structure
+        )
+        infiltration_rate = infiltration_rate_due_to_openings.copy()
+    else:
+        infiltration_rate = infiltration_rate_due_to_openings
+    infiltration_rate += infiltration_rate_due_to_structure
+    np.multiply(columns["no_sides_sheltered"], -0.075, out=buffer)
+    buffer += 1
+    infiltration_rate *= buffer
+
+    effective_air_rate_change = calculate_effective_air_rate_change(
+        ventilation_method=columns["ventilation_method"],
+        building_volume=columns["building_volume"],
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=columns["heat_exchanger_efficiency"],
+    )
+    if keep_intermediates:
+        outputs["infiltration_rate"] = infiltration_rate
+        outputs["effective_air_rate_change"] = effective_air_rate_change.copy()
+
+    ventilation_heat_loss_coefficient = effective_air_rate_change
+    ventilation_heat_loss_coefficient *= columns["building_volume"]
+    ventilation_heat_loss_coefficient *= ventilation_heat_loss_constant
+
+    heat_loss_coefficient = fabric_heat_loss_coefficient + (
+        ventilation_heat_loss_coefficient
+    )
+    heat_loss_parameter = np.divide(
+        heat_loss_coefficient, columns["total_floor_area"], out=buffer
+    )
+
+    outputs["fabric_heat_loss_coefficient"] = fabric_heat_loss_coefficient
+    outputs["ventilation_heat_loss_coefficient"] = ventilation_heat_loss_coefficient
+    outputs["heat_loss_coefficient"] = heat_loss_coefficient
+    outputs["heat_loss_parameter"] = heat_loss_parameter
+    return outputs
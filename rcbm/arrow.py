@@ -0,0 +1,307 @@
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+from rcbm import arrays
+from rcbm import dtypes
+from rcbm import instrument
+from rcbm import pipeline
+from rcbm import stream
+
+PathLike = Union[str, Path]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required to read & write Arrow tables"
+            " - please install it via `pip install rcbm[arrow]`!"
+        ) from e
+    return pa, pc
+
+
+def _convert_chunks(column, convert) -> np.ndarray:
+    # NOTE: table columns are chunked - a single chunk is converted as is so
+    # null-free numeric columns stay zero-copy views of the Arrow buffers
+    pa, _ = _import_pyarrow()
+    if not isinstance(column, pa.ChunkedArray):
+        return convert(column)
+    if column.num_chunks == 1:
+        return convert(column.chunk(0))
+    if column.num_chunks == 0:
+        return convert(pa.array([], type=column.type))
+    return np.concatenate([convert(chunk) for chunk in column.chunks])
+
+
+def _get_floats(column, dtype: np.dtype) -> np.ndarray:
+    # nulls become NaN, which copies, as does casting to another dtype
+    return _convert_chunks(
+        column, lambda chunk: chunk.to_numpy(zero_copy_only=False)
+    ).astype(dtype, copy=False)
+
+
+def _get_bools(column) -> np.ndarray:
+    # Arrow packs booleans into bits so they are always copied
+    return _convert_chunks(
+        column, lambda chunk: chunk.to_numpy(zero_copy_only=False)
+    ).astype("bool", copy=False)
+
+
+def _get_codes(column, categories: list) -> np.ndarray:
+    # NOTE: dictionary indices are recoded via a lookup built from the (small)
+    # dictionary so categories are never compared row by row - unknown values
+    # & nulls are coded as -1
+    pa, pc = _import_pyarrow()
+    index = {category: code for code, category in enumerate(categories)}
+
+    def _convert(chunk) -> np.ndarray:
+        if pa.types.is_integer(chunk.type):
+            codes = pc.fill_null(chunk.cast(pa.int64()), -1)
+            return codes.to_numpy(zero_copy_only=False)
+        if not pa.types.is_dictionary(chunk.type):
+            chunk = pc.dictionary_encode(chunk)
+        lookup = np.array(
+            [index.get(value, -1) for value in chunk.dictionary.to_pylist()] + [-1],
+            dtype="int8",
+        )
+        indices = pc.fill_null(chunk.indices.cast(pa.int32()), -1)
+        return lookup[indices.to_numpy(zero_copy_only=False)]
+
+    return _convert_chunks(column, _convert)
+
+
+def _column(source, name: str):
+    return source.column(source.schema.get_field_index(name))
+
+
+def _select_columns(source, columns: Optional[Mapping[str, str]]) -> Dict[str, Any]:
+    if columns is None:
+        columns = {column: column for column in pipeline.INPUT_COLUMNS}
+    names = {column: file_column for file_column, column in columns.items()}
+    missing_columns = [
+        column
+        for column in pipeline.INPUT_COLUMNS
+        if names.get(column) not in source.schema.names
+    ]
+    if missing_columns:
+        raise ValueError(f"Stock is missing input columns {missing_columns}!")
+    return {column: _column(source, names[column]) for column in pipeline.INPUT_COLUMNS}
+
+
+def _validate_columns(columns: Mapping[str, Any]) -> None:
+    # NOTE: as pipeline.input_schema but on Arrow metadata where possible -
+    # null counts & types are known without reading any values
+    pa, _ = _import_pyarrow()
+    schema = pipeline.input_schema()
+    null_columns = [
+        column
+        for column, values in columns.items()
+        if values.null_count > 0 and not schema.columns[column].nullable
+    ]
+    if null_columns:
+        raise ValueError(f"Input columns {null_columns} must not contain nulls!")
+
+    invalid_types = [
+        column
+        for column, values in columns.items()
+        if column not in pipeline.CATEGORICAL_COLUMNS
+        and column != "is_draught_lobby"
+        and not (pa.types.is_integer(values.type) or pa.types.is_floating(values.type))
+    ]
+    if not pa.types.is_boolean(columns["is_draught_lobby"].type):
+        invalid_types.append("is_draught_lobby")
+    if invalid_types:
+        raise ValueError(
+            f"Input columns {invalid_types} have invalid types"
+            " - is_draught_lobby must be boolean & all other numeric!"
+        )
+
+
+def _validate_values(inputs: Mapping[str, np.ndarray]) -> None:
+    # NOTE: NaN floats needn't be Arrow nulls so aren't in the null counts
+    schema = pipeline.input_schema()
+    nan_columns = [
+        column
+        for column, values in inputs.items()
+        if column not in pipeline.CATEGORICAL_COLUMNS
+        and column != "is_draught_lobby"
+        and not schema.columns[column].nullable
+        and np.isnan(values).any()
+    ]
+    if nan_columns:
+        raise ValueError(f"Input columns {nan_columns} must not contain nulls!")
+    invalid_columns = [
+        column
+        for column, categories in pipeline.CATEGORICAL_COLUMNS.items()
+        if ((inputs[column] < 0) | (inputs[column] >= len(categories))).any()
+    ]
+    if invalid_columns:
+        raise ValueError(f"Input columns {invalid_columns} contain unknown categories!")
+    if (inputs["building_volume"] == 0).any():
+        raise ValueError("building_volume must not be zero!")
+
+
+def _to_arrays(columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    dtype = dtypes.get_float_dtype()
+    converted = {}
+    for column, values in columns.items():
+        if column in pipeline.CATEGORICAL_COLUMNS:
+            converted[column] = _get_codes(values, pipeline.CATEGORICAL_COLUMNS[column])
+        elif column == "is_draught_lobby":
+            converted[column] = _get_bools(values)
+        else:
+            converted[column] = _get_floats(values, dtype)
+    return converted
+
+
+def _to_record_batch(outputs: Mapping[str, np.ndarray], index=None):
+    pa, _ = _import_pyarrow()
+    names = list(outputs)
+    columns = [pa.array(values) for values in outputs.values()]
+    if index is not None:
+        name, values = index
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        names.insert(0, name)
+        columns.insert(0, values)
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+
+@instrument.instrumented
+def calculate_heat_loss(
+    source,
+    columns: Optional[Mapping[str, str]] = None,
+    index_column: Optional[str] = None,
+    thermal_bridging_factor: float = 0.05,
+    ventilation_heat_loss_constant: float = 0.33,
+    internal_temperatures=None,
+    external_temperatures=None,
+    how: str = "monthly",
+    validate: bool = True,
+    keep_intermediates: bool = False,
+    dtype: Optional[str] = None,
+):
+    """As rcbm.calculate_heat_loss on a pyarrow Table or RecordBatch.
+
+    Null-free numeric columns of the float dtype policy are read as zero-copy
+    views & enumerations may be strings, integer codes or dictionary-encoded.
+    columns maps column names in source to model input names (see
+    stream.iter_stock).  Returns a RecordBatch of outputs, led by
+    index_column from source if given.
+    """
+    selected_columns = _select_columns(source, columns)
+    if validate:
+        with instrument.stage("arrow.calculate_heat_loss[validation]"):
+            _validate_columns(selected_columns)
+
+    with dtypes.float_dtype(dtypes.get_float_dtype(dtype).name):
+        inputs = _to_arrays(selected_columns)
+        if validate:
+            with instrument.stage("arrow.calculate_heat_loss[validation]"):
+                _validate_values(inputs)
+        arrays._raise_for_zero_floor_areas(inputs["total_floor_area"])
+        outputs = arrays.calculate_heat_loss(
+            inputs,
+            thermal_bridging_factor=thermal_bridging_factor,
+            ventilation_heat_loss_constant=ventilation_heat_loss_constant,
+            keep_intermediates=keep_intermediates,
+        )
+        annual_heat_loss = arrays.calculate_heat_loss_per_year(
+            outputs["heat_loss_coefficient"],
+            internal_temperatures,
+            external_temperatures,
+            how=how,
+        )
+        outputs["annual_heat_loss"] = np.round(annual_heat_loss)
+
+    output_columns = pipeline.OUTPUT_COLUMNS + (
+        pipeline.INTERMEDIATE_COLUMNS if keep_intermediates else []
+    )
+    index = (
+        (index_column, _column(source, index_column))
+        if index_column is not None
+        else None
+    )
+    return _to_record_batch({c: outputs[c] for c in output_columns}, index=index)
+
+
+def _iter_batches(
+    source,
+    columns: Optional[Mapping[str, str]],
+    index_column: Optional[str],
+    batch_size: int,
+) -> Iterable:
+    pa, _ = _import_pyarrow()
+    if isinstance(source, (str, Path)):
+        pq = stream._import_pyarrow_parquet()
+        if columns is None:
+            columns = {column: column for column in pipeline.INPUT_COLUMNS}
+        usecols = list(columns) + ([index_column] if index_column is not None else [])
+        return pq.ParquetFile(source).iter_batches(
+            batch_size=batch_size, columns=usecols
+        )
+    if isinstance(source, pa.Table):
+        return source.to_batches(max_chunksize=batch_size)
+    if isinstance(source, pa.RecordBatch):
+        return (
+            source.slice(start, batch_size)
+            for start in range(0, source.num_rows, batch_size)
+        )
+    return source
+
+
+def iter_heat_loss(
+    source,
+    columns: Optional[Mapping[str, str]] = None,
+    index_column: Optional[str] = None,
+    batch_size: int = 100_000,
+    **kwargs: Any,
+) -> Iterator:
+    """Yield calculate_heat_loss RecordBatches of at most batch_size rows.
+
+    source is a Parquet file (only the model's input columns are read), a
+    Table, a RecordBatch or any iterable of RecordBatches such as a
+    RecordBatchReader.
+    """
+    for batch in _iter_batches(source, columns, index_column, batch_size):
+        yield calculate_heat_loss(
+            batch, columns=columns, index_column=index_column, **kwargs
+        )
+
+
+def write_heat_loss(
+    source,
+    output_path: PathLike,
+    columns: Optional[Mapping[str, str]] = None,
+    index_column: Optional[str] = None,
+    batch_size: int = 100_000,
+    **kwargs: Any,
+) -> None:
+    """Stream iter_heat_loss batches into a Parquet file without pandas."""
+    pa, _ = _import_pyarrow()
+    pq = stream._import_pyarrow_parquet()
+    writer = None
+    try:
+        for batch in iter_heat_loss(
+            source,
+            columns=columns,
+            index_column=index_column,
+            batch_size=batch_size,
+            **kwargs,
+        ):
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, batch.schema)
+            writer.write_table(pa.Table.from_batches([batch]))
+    finally:
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,260 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from rcbm import dtypes
+from rcbm import htuse
+from rcbm import stream
+from rcbm import vent
+
+_METADATA_KEY = b"rcbm"
+
+
+@functools.lru_cache(maxsize=None)
+def _get_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("rcbm")
+    except Exception:
+        return "unknown"
+
+
+def _unlink(filepath: Path) -> None:
+    try:
+        filepath.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _touch(filepath: Path) -> None:
+    # NOTE: set explicitly as filesystem clocks are too coarse to order results
+    # written in quick succession
+    now = time.time_ns()
+    os.utime(filepath, ns=(now, now))
+
+
+_SCALAR_TYPES = (bool, int, float, complex, str, bytes, np.generic, np.dtype)
+
+
+class UnhashableInputError(TypeError):
+    pass
+
+
+def _update_hash_values(hasher: Any, values: Union[pd.Series, pd.Index]) -> None:
+    # NOTE: numeric buffers are hashed as raw bytes, which runs at memory
+    # bandwidth - only object columns are hashed row by row
+    hasher.update(f"{type(values).__name__}:{values.dtype}".encode())
+    if isinstance(values, pd.RangeIndex):
+        hasher.update(repr(values).encode())
+    elif isinstance(values.dtype, pd.CategoricalDtype):
+        _update_hash_values(hasher, values.dtype.categories)
+        _update_hash(hasher, np.asarray(pd.Categorical(values).codes))
+    elif isinstance(values.dtype, np.dtype) and values.dtype != object:
+        _update_hash(hasher, values.to_numpy())
+    else:
+        hashes = pd.util.hash_pandas_object(pd.Series(values), index=False)
+        _update_hash(hasher, hashes.to_numpy())
+
+
+def _update_hash(hasher: Any, value: Any) -> None:
+    if isinstance(value, pd.DataFrame):
+        hasher.update(b"frame")
+        _update_hash_values(hasher, value.index)
+        for column, values in value.items():
+            _update_hash(hasher, column)
+            _update_hash_values(hasher, values)
+    elif isinstance(value, pd.Series):
+        _update_hash_values(hasher, value.index)
+        _update_hash_values(hasher, value)
+    elif isinstance(value, pd.Index):
+        _update_hash_values(hasher, value)
+    elif isinstance(value, np.ndarray):
+        hasher.update(f"array:{value.dtype}:{value.shape}".encode())
+        if value.dtype == object:
+            _update_hash(hasher, pd.Series(value.ravel()))
+        else:
+            hasher.update(np.ascontiguousarray(value).view("uint8").data)
+    elif isinstance(value, dict):
+        hasher.update(b"dict")
+        for key in sorted(value, key=repr):
+            _update_hash(hasher, key)
+            _update_hash(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}:{len(value)}".encode())
+        for item in value:
+            _update_hash(hasher, item)
+    elif value is None or isinstance(value, _SCALAR_TYPES):
+        hasher.update(f"{type(value).__name__}:{value!r}".encode())
+    else:
+        # NOTE: the repr of other objects needn't reflect their contents (a
+        # WeatherStore's is its path) & by default holds their memory address
+        raise UnhashableInputError(
+            f"Cannot hash {type(value).__name__} inputs by their contents"
+        )
+
+
+def _resolve_weather_store_keys(temperatures: Any, weather_store: Any) -> Any:
+    # NOTE: profiles are read as htuse does so a re-saved profile is a miss
+    if isinstance(temperatures, dict):
+        return {
+            zone: _resolve_weather_store_keys(values, weather_store)
+            for zone, values in temperatures.items()
+        }
+    return htuse._read_temperatures(temperatures, weather_store)
+
+
+def hash_inputs(*args: Any, **kwargs: Any) -> str:
+    # NOTE: sha256 is hardware accelerated on most CPUs & so hashes fastest
+    hasher = hashlib.sha256()
+    _update_hash(hasher, args)
+    _update_hash(hasher, kwargs)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """Results of rcbm functions saved as Parquet files keyed by their inputs.
+
+    Keys hash the function, its parameters, the buffers of its input columns
+    (including their indexes), the float dtype policy & the validation mode
+    (see vent.trusted_inputs) so a changed input is a miss.  Weather store
+    keys are hashed by their profiles & calls on inputs that can't be hashed
+    by their contents aren't cached.  Once the cache exceeds max_bytes the
+    least recently used results are evicted.  Only Series & DataFrame results
+    with string column names are cached.  Needs the `arrow` extra.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 2**30) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    def __repr__(self) -> str:
+        return f"ResultCache({str(self.path)!r}, max_bytes={self.max_bytes})"
+
+    def __len__(self) -> int:
+        return len(self._get_filepaths())
+
+    def _get_filepath(self, key: str) -> Path:
+        return self.path / f"{key}.parquet"
+
+    def _get_filepaths(self):
+        return [f for f in self.path.glob("*.parquet") if not f.name.startswith(".")]
+
+    def _get_key(self, func: Callable, args: tuple, kwargs: dict) -> str:
+        arguments = inspect.signature(func).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        name = f"{func.__module__}.{func.__qualname__}"
+        weather_store = arguments.arguments.get("weather_store")
+        if weather_store is not None:
+            for argument, value in arguments.arguments.items():
+                if argument.endswith("_temperatures"):
+                    arguments.arguments[argument] = _resolve_weather_store_keys(
+                        value, weather_store
+                    )
+            arguments.arguments["weather_store"] = None
+        # the float dtype policy & validation mode are context, not arguments
+        policies = {
+            "float_dtype": dtypes.get_float_dtype().name,
+            "is_validating": vent._is_validating.get(),
+        }
+        return hash_inputs(_get_version(), name, dict(arguments.arguments), policies)
+
+    def get(self, key: str) -> Optional[Union[pd.Series, pd.DataFrame]]:
+        pq = stream._import_pyarrow_parquet()
+        filepath = self._get_filepath(key)
+        if not filepath.exists():
+            return None
+        try:
+            table = pq.read_table(filepath)
+        except OSError:
+            # evicted by another process since checking it exists
+            return None
+        # mark as recently used for eviction
+        _touch(filepath)
+        metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+        result = table.to_pandas()
+        if metadata["type"] == "series":
+            result = result.iloc[:, 0].rename(metadata["name"])
+        return result
+
+    def set(self, key: str, result: Union[pd.Series, pd.DataFrame]) -> None:
+        import pyarrow
+
+        pq = stream._import_pyarrow_parquet()
+        if isinstance(result, pd.Series):
+            metadata = {"type": "series", "name": result.name}
+            frame = result.to_frame(name="values")
+        else:
+            metadata = {"type": "frame"}
+            frame = result
+        table = pyarrow.Table.from_pandas(frame, preserve_index=True)
+        table = table.replace_schema_metadata(
+            {**table.schema.metadata, _METADATA_KEY: json.dumps(metadata).encode()}
+        )
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        filepath = self._get_filepath(key)
+        # write to a temporary file first so readers never load a partial result
+        tmp_filepath = filepath.with_name(f".{key}.{os.getpid()}.parquet")
+        pq.write_table(table, tmp_filepath)
+        os.replace(tmp_filepath, filepath)
+        _touch(filepath)
+        self._evict()
+
+    def _evict(self) -> None:
+        files = []
+        for filepath in self._get_filepaths():
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, filepath))
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, filepath in sorted(files):
+            if total_bytes <= self.max_bytes:
+                break
+            _unlink(filepath)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        for filepath in self._get_filepaths():
+            _unlink(filepath)
+
+    def call(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        try:
+            key = self._get_key(func, args, kwargs)
+        except UnhashableInputError:
+            # refuse to cache rather than risk returning a stale result
+            return func(*args, **kwargs)
+        result = self.get(key)
+        if result is None:
+            result = func(*args, **kwargs)
+            if _is_cacheable(result):
+                self.set(key, result)
+        return result
+
+    def cached(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+
+        return wrapper
+
+
+def _is_cacheable(result: Any) -> bool:
+    if isinstance(result, pd.Series):
+        return True
+    return isinstance(result, pd.DataFrame) and all(
+        isinstance(c, str) for c in result.columns
+    )
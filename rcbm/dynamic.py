@@ -0,0 +1,295 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from rcbm import instrument
+
+# ISO 13790:2008 Table 12 - (internal heat capacity [J/m²K], A_m / A_f)
+THERMAL_MASS_CLASSES = {
+    "very_light": (80_000, 2.5),
+    "light": (110_000, 2.5),
+    "medium": (165_000, 2.5),
+    "heavy": (260_000, 3.0),
+    "very_heavy": (370_000, 3.5),
+}
+
+# ISO 13790:2008 7.2.2 - heat transfer coefficients [W/m²K]
+SURFACE_TO_AIR_HEAT_TRANSFER_COEFFICIENT = 3.45
+MASS_TO_SURFACE_HEAT_TRANSFER_COEFFICIENT = 9.1
+# ISO 13790:2008 7.2.2.2 - area of all surfaces facing the zone / floor area
+SURFACE_AREA_TO_FLOOR_AREA_RATIO = 4.5
+
+
+class _Conductances(NamedTuple):
+    h_tr_w: np.ndarray
+    h_tr_em: np.ndarray
+    h_tr_ms: np.ndarray
+    h_tr_is: np.ndarray
+    h_ve: np.ndarray
+    h_tr_1: np.ndarray
+    h_tr_2: np.ndarray
+    h_tr_3: np.ndarray
+
+
+class Simulation(NamedTuple):
+    heating_demand: pd.Series
+    air_temperature: np.ndarray
+    mass_temperature: np.ndarray
+    heating_power: np.ndarray
+
+
+@instrument.instrumented
+def calculate_thermal_capacitance(
+    total_floor_area: pd.Series, thermal_mass_class: str = "medium"
+) -> pd.Series:
+    internal_heat_capacity, _ = THERMAL_MASS_CLASSES[thermal_mass_class]
+    return total_floor_area * internal_heat_capacity
+
+
+def _calculate_conductances(
+    fabric_heat_loss_coefficient: np.ndarray,
+    ventilation_heat_loss_coefficient: np.ndarray,
+    window_heat_loss_coefficient: np.ndarray,
+    surface_area: np.ndarray,
+    mass_area: np.ndarray,
+) -> _Conductances:
+    h_tr_w = window_heat_loss_coefficient
+    h_tr_op = fabric_heat_loss_coefficient - window_heat_loss_coefficient
+    h_tr_ms = MASS_TO_SURFACE_HEAT_TRANSFER_COEFFICIENT * mass_area
+    if ((h_tr_op <= 0) | (h_tr_op >= h_tr_ms)).any():
+        raise ValueError(
+            "Opaque fabric heat loss coefficients must lie between 0 and the"
+            " mass-to-surface coefficient - please check fabric, window &"
+            " floor area inputs!"
+        )
+    h_tr_em = 1 / (1 / h_tr_op - 1 / h_tr_ms)
+    h_tr_is = SURFACE_TO_AIR_HEAT_TRANSFER_COEFFICIENT * surface_area
+    h_ve = ventilation_heat_loss_coefficient
+    h_tr_1 = 1 / (1 / h_ve + 1 / h_tr_is)
+    h_tr_2 = h_tr_1 + h_tr_w
+    h_tr_3 = 1 / (1 / h_tr_2 + 1 / h_tr_ms)
+    return _Conductances(
+        h_tr_w=h_tr_w,
+        h_tr_em=h_tr_em,
+        h_tr_ms=h_tr_ms,
+        h_tr_is=h_tr_is,
+        h_ve=h_ve,
+        h_tr_1=h_tr_1,
+        h_tr_2=h_tr_2,
+        h_tr_3=h_tr_3,
+    )
+
+
+def _step(
+    h: _Conductances,
+    capacitance: np.ndarray,
+    mass_temperature: np.ndarray,
+    external_temperature: np.ndarray,
+    phi_ia: np.ndarray,
+    phi_st: np.ndarray,
+    phi_m: np.ndarray,
+    phi_hc: np.ndarray,
+):
+    # ISO 13790:2008 C.3 - Crank-Nicolson step of the 5R1C network with supply
+    # air at the external temperature
+    t_sup = external_temperature
+    phi_m_tot = (
+        phi_m
+        + h.h_tr_em * external_temperature
+        + h.h_tr_3
+        * (
+            phi_st
+            + h.h_tr_w * external_temperature
+            + h.h_tr_1 * ((phi_ia + phi_hc) / h.h_ve + t_sup)
+        )
+        / h.h_tr_2
+    )
+    c_m = capacitance / 3600
+    h_m = 0.5 * (h.h_tr_3 + h.h_tr_em)
+    next_mass_temperature = (mass_temperature * (c_m - h_m) + phi_m_tot) / (c_m + h_m)
+    average_mass_temperature = 0.5 * (next_mass_temperature + mass_temperature)
+    surface_temperature = (
+        h.h_tr_ms * average_mass_temperature
+        + phi_st
+        + h.h_tr_w * external_temperature
+        + h.h_tr_1 * (t_sup + (phi_ia + phi_hc) / h.h_ve)
+    ) / (h.h_tr_ms + h.h_tr_w + h.h_tr_1)
+    air_temperature = (
+        h.h_tr_is * surface_temperature + h.h_ve * t_sup + phi_ia + phi_hc
+    ) / (h.h_tr_is + h.h_ve)
+    return next_mass_temperature, air_temperature
+
+
+def _simulate(
+    fabric_heat_loss_coefficient,
+    ventilation_heat_loss_coefficient,
+    thermal_capacitance,
+    total_floor_area,
+    external_temperatures,
+    heating_setpoint,
+    internal_gains,
+    solar_gains,
+    window_heat_loss_coefficient,
+    effective_mass_area_factor,
+    max_heating_power,
+    initial_mass_temperature,
+    keep_hourly,
+):
+    fabric_heat_loss_coefficient = pd.Series(fabric_heat_loss_coefficient)
+    index = fabric_heat_loss_coefficient.index
+    no_buildings = len(fabric_heat_loss_coefficient)
+    no_hours = np.shape(external_temperatures)[-1]
+    shape = (no_buildings, no_hours)
+
+    def _to_array(values):
+        return np.asarray(values, dtype="float64")
+
+    floor_area = _to_array(total_floor_area)
+    capacitance = _to_array(thermal_capacitance)
+    surface_area = SURFACE_AREA_TO_FLOOR_AREA_RATIO * floor_area
+    mass_area = _to_array(effective_mass_area_factor) * floor_area
+    h = _calculate_conductances(
+        fabric_heat_loss_coefficient=_to_array(fabric_heat_loss_coefficient),
+        ventilation_heat_loss_coefficient=_to_array(ventilation_heat_loss_coefficient),
+        window_heat_loss_coefficient=np.broadcast_to(
+            _to_array(window_heat_loss_coefficient), (no_buildings,)
+        ),
+        surface_area=surface_area,
+        mass_area=mass_area,
+    )
+
+    # NOTE: hourly inputs are broadcast views so (N, T) is never copied
+    external_temperatures = np.broadcast_to(_to_array(external_temperatures), shape)
+    heating_setpoint = np.broadcast_to(_to_array(heating_setpoint), shape)
+    internal_gains = np.broadcast_to(_to_array(internal_gains), shape)
+    solar_gains = np.broadcast_to(_to_array(solar_gains), shape)
+    max_heating_power = np.broadcast_to(_to_array(max_heating_power), (no_buildings,))
+
+    # ISO 13790:2008 C.2 - split of internal & solar gains between the nodes
+    mass_ratio = mass_area / surface_area
+    surface_ratio = (
+        1
+        - mass_ratio
+        - h.h_tr_w / (MASS_TO_SURFACE_HEAT_TRANSFER_COEFFICIENT * surface_area)
+    )
+    test_power = 10 * floor_area
+
+    mass_temperature = np.broadcast_to(
+        _to_array(initial_mass_temperature), (no_buildings,)
+    ).copy()
+    heating_demand = np.zeros(no_buildings)
+    if keep_hourly:
+        air_temperatures = np.empty(shape)
+        mass_temperatures = np.empty(shape)
+        heating_powers = np.empty(shape)
+    no_heating = np.zeros(no_buildings)
+
+    for hour in range(no_hours):
+        external_temperature = external_temperatures[:, hour]
+        phi_ia = 0.5 * internal_gains[:, hour]
+        gains = phi_ia + solar_gains[:, hour]
+        phi_st = surface_ratio * gains
+        phi_m = mass_ratio * gains
+        args = (h, capacitance, mass_temperature, external_temperature)
+        _, free_floating_temperature = _step(*args, phi_ia, phi_st, phi_m, no_heating)
+        _, test_temperature = _step(*args, phi_ia, phi_st, phi_m, test_power)
+        # air temperature is linear in heating power so one test step is enough
+        # to find the power that holds the air at its setpoint
+        heating_power = (
+            test_power
+            * (heating_setpoint[:, hour] - free_floating_temperature)
+            / (test_temperature - free_floating_temperature)
+        )
+        np.clip(heating_power, 0, max_heating_power, out=heating_power)
+        mass_temperature, air_temperature = _step(
+            *args, phi_ia, phi_st, phi_m, heating_power
+        )
+        heating_demand += heating_power
+        if keep_hourly:
+            air_temperatures[:, hour] = air_temperature
+            mass_temperatures[:, hour] = mass_temperature
+            heating_powers[:, hour] = heating_power
+
+    w_to_kwh = 1 / 1000
+    heating_demand = pd.Series(heating_demand * w_to_kwh, index=index)
+    if keep_hourly:
+        return Simulation(
+            heating_demand=heating_demand,
+            air_temperature=air_temperatures,
+            mass_temperature=mass_temperatures,
+            heating_power=heating_powers,
+        )
+    return heating_demand
+
+
+@instrument.instrumented
+def calculate_heating_demand_per_year(
+    fabric_heat_loss_coefficient: pd.Series,
+    ventilation_heat_loss_coefficient: pd.Series,
+    thermal_capacitance: pd.Series,
+    total_floor_area: pd.Series,
+    external_temperatures: np.ndarray,
+    heating_setpoint=20.0,
+    internal_gains=0.0,
+    solar_gains=0.0,
+    window_heat_loss_coefficient=0.0,
+    effective_mass_area_factor=2.5,
+    max_heating_power=np.inf,
+    initial_mass_temperature=20.0,
+) -> pd.Series:
+    """Heating demand [kWh] of an hourly 5R1C (ISO 13790) simulation.
+
+    All buildings are stepped together one hour at a time.  Hourly inputs
+    (temperatures, setpoints & gains [W]) may be anything that broadcasts to
+    (no_buildings, no_hours) - one profile for all buildings (no_hours,) or
+    one profile per building (no_buildings, no_hours).
+    """
+    return _simulate(
+        fabric_heat_loss_coefficient=fabric_heat_loss_coefficient,
+        ventilation_heat_loss_coefficient=ventilation_heat_loss_coefficient,
+        thermal_capacitance=thermal_capacitance,
+        total_floor_area=total_floor_area,
+        external_temperatures=external_temperatures,
+        heating_setpoint=heating_setpoint,
+        internal_gains=internal_gains,
+        solar_gains=solar_gains,
+        window_heat_loss_coefficient=window_heat_loss_coefficient,
+        effective_mass_area_factor=effective_mass_area_factor,
+        max_heating_power=max_heating_power,
+        initial_mass_temperature=initial_mass_temperature,
+        keep_hourly=False,
+    )
+
+
+@instrument.instrumented
+def simulate(
+    fabric_heat_loss_coefficient: pd.Series,
+    ventilation_heat_loss_coefficient: pd.Series,
+    thermal_capacitance: pd.Series,
+    total_floor_area: pd.Series,
+    external_temperatures: np.ndarray,
+    heating_setpoint=20.0,
+    internal_gains=0.0,
+    solar_gains=0.0,
+    window_heat_loss_coefficient=0.0,
+    effective_mass_area_factor=2.5,
+    max_heating_power=np.inf,
+    initial_mass_temperature=20.0,
+) -> Simulation:
+    """As calculate_heating_demand_per_year but also keep (N, T) hourly results."""
+    return _simulate(
+        fabric_heat_loss_coefficient=fabric_heat_loss_coefficient,
+        ventilation_heat_loss_coefficient=ventilation_heat_loss_coefficient,
+        thermal_capacitance=thermal_capacitance,
+        total_floor_area=total_floor_area,
+        external_temperatures=external_temperatures,
+        heating_setpoint=heating_setpoint,
+        internal_gains=internal_gains,
+        solar_gains=solar_gains,
+        window_heat_loss_coefficient=window_heat_loss_coefficient,
+        effective_mass_area_factor=effective_mass_area_factor,
+        max_heating_power=max_heating_power,
+        initial_mass_temperature=initial_mass_temperature,
+        keep_hourly=True,
+    )
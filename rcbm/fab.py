@@ -1,16 +1,60 @@
+from typing import Any
+from typing import Dict
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
 import pandas as pd
 
+from rcbm import arrays
+from rcbm import dtypes
+from rcbm import instrument
+
+FABRIC_COMPONENTS = arrays.FABRIC_COMPONENTS
+
+
+def _align(inputs: Mapping[str, Any]) -> Tuple[Optional[pd.Index], Dict[str, Any]]:
+    # NOTE: Series are combined on their index as pandas arithmetic does - on
+    # the union of unequal indexes with missing values as NaN - before the
+    # arrays functions combine them by position.  Without any Series, outputs
+    # get a default RangeIndex
+    series = [v for v in inputs.values() if isinstance(v, pd.Series)]
+    if not series:
+        return None, dict(inputs)
+    index = series[0].index
+    for values in series[1:]:
+        if not values.index.equals(index):
+            index = index.union(values.index)
+    return index, {
+        name: (
+            values.reindex(index)
+            if isinstance(values, pd.Series) and not values.index.equals(index)
+            else values
+        )
+        for name, values in inputs.items()
+    }
 
+
+@instrument.instrumented
 def calculate_fabric_component_heat_loss_coefficient(
     component_area: pd.Series,
     component_uvalue: pd.Series,
     thermal_bridging_factor: float = 0.05,
 ) -> pd.Series:
-    heat_loss_via_plane_element = component_area * component_uvalue
-    thermal_bridging = component_area * thermal_bridging_factor
-    return thermal_bridging + heat_loss_via_plane_element
+    index, inputs = _align(
+        {"component_area": component_area, "component_uvalue": component_uvalue}
+    )
+    return pd.Series(
+        arrays.calculate_fabric_component_heat_loss_coefficient(
+            **inputs, thermal_bridging_factor=thermal_bridging_factor
+        ),
+        index=index,
+    )
 
 
+@instrument.instrumented
 def calculate_fabric_heat_loss_coefficient(
     roof_area: pd.Series,
     roof_uvalue: pd.Series,
@@ -24,35 +68,192 @@ def calculate_fabric_heat_loss_coefficient(
     door_uvalue: pd.Series,
     thermal_bridging_factor: float = 0.05,
 ) -> pd.Series:
-    plane_elements_area = roof_area + floor_area + door_area + wall_area + window_area
-    thermal_bridging = thermal_bridging_factor * plane_elements_area
-    heat_loss_via_plane_elements = (
-        wall_area * wall_uvalue
-        + roof_area * roof_uvalue
-        + floor_area * floor_uvalue
-        + window_area * window_uvalue
-        + door_area * door_uvalue
+    index, inputs = _align(
+        {
+            "roof_area": roof_area,
+            "roof_uvalue": roof_uvalue,
+            "wall_area": wall_area,
+            "wall_uvalue": wall_uvalue,
+            "floor_area": floor_area,
+            "floor_uvalue": floor_uvalue,
+            "window_area": window_area,
+            "window_uvalue": window_uvalue,
+            "door_area": door_area,
+            "door_uvalue": door_uvalue,
+        }
+    )
+    return pd.Series(
+        arrays.calculate_fabric_heat_loss_coefficient(
+            **inputs, thermal_bridging_factor=thermal_bridging_factor
+        ),
+        index=index,
     )
 
-    return thermal_bridging + heat_loss_via_plane_elements
 
+def _reindex_like(values: Any, like: pd.DataFrame, name: str) -> Any:
+    # NOTE: components are paired on their labels, not their positions, so a
+    # frame (or a Series of per-component values) is put in the order of
+    # like, its labels must match like's exactly
+    if isinstance(values, pd.DataFrame):
+        if not (
+            values.columns.sort_values().equals(like.columns.sort_values())
+            and values.index.sort_values().equals(like.index.sort_values())
+        ):
+            raise ValueError(
+                f"{name} must have the same index & columns as component_areas"
+            )
+        return values.reindex(index=like.index, columns=like.columns)
+    if isinstance(values, pd.Series):
+        if not values.index.sort_values().equals(like.columns.sort_values()):
+            raise ValueError(
+                f"{name} must be indexed by the columns of component_areas"
+            )
+        return values.reindex(like.columns)
+    return values
 
-def _raise_for_zero_floor_areas(floor_areas: pd.Series) -> None:
-    is_zero_floor_area = (floor_areas == 0) | (floor_areas.isnull())
-    if is_zero_floor_area.any():
-        raise ZeroDivisionError(
-            "Cannot divide heat_loss_coefficient by zero"
-            " - please remove any zero floor areas!"
+
+@instrument.instrumented
+def calculate_fabric_heat_loss_coefficient_from_components(
+    component_areas: Union[pd.DataFrame, np.ndarray],
+    component_uvalues: Union[pd.DataFrame, np.ndarray],
+    thermal_bridging_factor: Union[float, np.ndarray, pd.Series, pd.DataFrame] = 0.05,
+) -> pd.Series:
+    """Fabric heat loss coefficient of N buildings with K components each.
+
+    Areas & U-values are (N, K) - pad buildings with fewer components with
+    zero areas & zero U-values.  thermal_bridging_factor is a scalar, one
+    factor per component (K,) or one per building & component (N, K).
+    Frames are matched to component_areas on their labels.
+    """
+    if isinstance(component_areas, pd.DataFrame):
+        component_uvalues = _reindex_like(
+            component_uvalues, component_areas, "component_uvalues"
+        )
+        thermal_bridging_factor = _reindex_like(
+            thermal_bridging_factor, component_areas, "thermal_bridging_factor"
         )
+    dtype = dtypes.get_float_dtype()
+    areas = np.asarray(component_areas, dtype=dtype)
+    uvalues = np.asarray(component_uvalues, dtype=dtype)
+    thermal_bridging_factor = np.asarray(thermal_bridging_factor, dtype=dtype)
+
+    heat_loss_via_plane_elements = np.einsum("nk,nk->n", areas, uvalues)
+    if thermal_bridging_factor.ndim == 2:
+        thermal_bridging = np.einsum("nk,nk->n", areas, thermal_bridging_factor)
+    else:
+        thermal_bridging = areas @ np.broadcast_to(
+            thermal_bridging_factor, areas.shape[1:]
+        )
+
+    index = getattr(component_areas, "index", None)
+    return pd.Series(heat_loss_via_plane_elements + thermal_bridging, index=index)
+
+
+@instrument.instrumented
+def calculate_fabric_heat_loss_coefficient_from_component_table(
+    components: pd.DataFrame,
+    building: str = "building_id",
+    area: str = "area",
+    uvalue: str = "uvalue",
+    thermal_bridging_factor: Union[float, str] = 0.05,
+) -> pd.Series:
+    """Fabric heat loss coefficient from a long table with one row per component.
+
+    thermal_bridging_factor is a scalar or the name of a column of
+    per-component factors.  The output is indexed by building.
+    """
+    dtype = dtypes.get_float_dtype()
+    if isinstance(thermal_bridging_factor, str):
+        thermal_bridging_factor = components[thermal_bridging_factor].to_numpy(dtype)
+    component_heat_loss_coefficient = components[area].to_numpy(dtype=dtype) * (
+        components[uvalue].to_numpy(dtype=dtype) + thermal_bridging_factor
+    )
+    codes, buildings = pd.factorize(components[building], sort=True)
+    heat_loss_coefficient = np.bincount(
+        codes, weights=component_heat_loss_coefficient, minlength=len(buildings)
+    )
+    return pd.Series(
+        heat_loss_coefficient.astype(dtype, copy=False),
+        index=pd.Index(buildings, name=building),
+    )
+
+
+@instrument.instrumented
+def calculate_fabric_upgrade_heat_loss_coefficients(
+    component_areas: pd.DataFrame,
+    component_uvalues: pd.DataFrame,
+    scenarios: Mapping[str, Mapping[str, Union[float, pd.Series]]],
+    thermal_bridging_factor: Union[float, np.ndarray] = 0.05,
+    only_improve: bool = True,
+) -> pd.DataFrame:
+    """Fabric heat loss coefficient of every building under every scenario.
+
+    Each scenario maps component names (columns of component_areas &
+    component_uvalues) to upgraded U-values.  If only_improve, a component
+    keeps its current U-value wherever the upgrade would be worse, otherwise
+    every upgraded U-value is used as is.  The baseline is calculated once &
+    each scenario adds area x change in U-value for its upgraded components
+    only, so the output is an (N, S) frame with one column per scenario.
+    """
+    # the baseline & the deltas are both taken from frames in the order of
+    # component_areas so they describe the same buildings
+    component_uvalues = _reindex_like(
+        component_uvalues, component_areas, "component_uvalues"
+    )
+    thermal_bridging_factor = _reindex_like(
+        thermal_bridging_factor, component_areas, "thermal_bridging_factor"
+    )
+    baseline = calculate_fabric_heat_loss_coefficient_from_components(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+        thermal_bridging_factor=thermal_bridging_factor,
+    ).to_numpy()
+
+    dtype = dtypes.get_float_dtype()
+    heat_loss_coefficients = np.empty((len(baseline), len(scenarios)), dtype=dtype)
+    heat_loss_coefficients[:] = baseline[:, np.newaxis]
+    for column, upgrades in enumerate(scenarios.values()):
+        for component, upgraded_uvalue in upgrades.items():
+            uvalue = component_uvalues[component].to_numpy(dtype=dtype)
+            if isinstance(upgraded_uvalue, pd.Series):
+                if not upgraded_uvalue.index.sort_values().equals(
+                    component_areas.index.sort_values()
+                ):
+                    raise ValueError(
+                        f"Upgraded {component} U-values must have the same index"
+                        " as component_areas"
+                    )
+                upgraded_uvalue = upgraded_uvalue.reindex(component_areas.index)
+            upgraded_uvalue = np.asarray(upgraded_uvalue, dtype=dtype)
+            if only_improve:
+                upgraded_uvalue = np.minimum(uvalue, upgraded_uvalue)
+            delta_uvalue = upgraded_uvalue - uvalue
+            heat_loss_coefficients[:, column] += (
+                component_areas[component].to_numpy(dtype=dtype) * delta_uvalue
+            )
+
+    return pd.DataFrame(
+        heat_loss_coefficients, index=component_areas.index, columns=list(scenarios)
+    )
+
+
+def _raise_for_zero_floor_areas(floor_areas: pd.Series) -> None:
+    arrays._raise_for_zero_floor_areas(
+        pd.Series(floor_areas).to_numpy(dtype="float64", na_value=np.nan)
+    )
 
 
+@instrument.instrumented
 def calculate_heat_loss_parameter(
     fabric_heat_loss_coefficient: pd.Series,
     ventilation_heat_loss_coefficient: pd.Series,
     total_floor_area: pd.Series,
 ) -> pd.Series:
-    _raise_for_zero_floor_areas(total_floor_area)
-    heat_loss_coefficient = (
-        fabric_heat_loss_coefficient + ventilation_heat_loss_coefficient
+    index, inputs = _align(
+        {
+            "fabric_heat_loss_coefficient": fabric_heat_loss_coefficient,
+            "ventilation_heat_loss_coefficient": ventilation_heat_loss_coefficient,
+            "total_floor_area": total_floor_area,
+        }
     )
-    return heat_loss_coefficient / total_floor_area
+    return pd.Series(arrays.calculate_heat_loss_parameter(**inputs), index=index)
@@ -0,0 +1,154 @@
+import inspect
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import pandas as pd
+
+from rcbm import fab
+from rcbm import htuse
+from rcbm import vent
+
+
+class Node(NamedTuple):
+    func: Callable
+    dependencies: Tuple[str, ...]
+    parameters: Tuple[str, ...]
+
+
+def node(func: Callable) -> Node:
+    # arguments without defaults are upstream nodes or input columns, arguments
+    # with defaults are model parameters
+    signature = inspect.signature(func).parameters.values()
+    return Node(
+        func=func,
+        dependencies=tuple(p.name for p in signature if p.default is p.empty),
+        parameters=tuple(p.name for p in signature if p.default is not p.empty),
+    )
+
+
+def _calculate_infiltration_rate(
+    infiltration_rate_due_to_openings: pd.Series,
+    infiltration_rate_due_to_structure: pd.Series,
+    infiltration_rate_adjustment_factor: pd.Series,
+) -> pd.Series:
+    return (
+        infiltration_rate_due_to_openings + infiltration_rate_due_to_structure
+    ) * infiltration_rate_adjustment_factor
+
+
+def _calculate_heat_loss_coefficient(
+    fabric_heat_loss_coefficient: pd.Series,
+    ventilation_heat_loss_coefficient: pd.Series,
+) -> pd.Series:
+    return fabric_heat_loss_coefficient + ventilation_heat_loss_coefficient
+
+
+def _calculate_annual_heat_loss(
+    heat_loss_coefficient: pd.Series,
+    internal_temperatures=None,
+    external_temperatures=None,
+    how: str = "monthly",
+) -> pd.Series:
+    return htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient, internal_temperatures, external_temperatures, how=how
+    )
+
+
+NODES = {
+    "fabric_heat_loss_coefficient": node(fab.calculate_fabric_heat_loss_coefficient),
+    "infiltration_rate_due_to_openings": node(
+        vent.calculate_infiltration_rate_due_to_openings
+    ),
+    "infiltration_rate_due_to_structure": node(
+        vent.calculate_infiltration_rate_due_to_structure
+    ),
+    "infiltration_rate_adjustment_factor": node(
+        vent.calculate_infiltration_rate_adjustment_factor
+    ),
+    "infiltration_rate": node(_calculate_infiltration_rate),
+    "effective_air_rate_change": node(vent.calculate_effective_air_rate_change),
+    "ventilation_heat_loss_coefficient": node(
+        vent.calculate_ventilation_heat_loss_coefficient
+    ),
+    "heat_loss_coefficient": node(_calculate_heat_loss_coefficient),
+    "heat_loss_parameter": node(fab.calculate_heat_loss_parameter),
+    "annual_heat_loss": node(_calculate_annual_heat_loss),
+}
+
+
+class BuildingStockModel:
+    """Lazily evaluate & memoize the rcbm calculations for a building stock.
+
+    Only the nodes needed for a requested output are calculated & each result
+    is cached until one of its inputs or parameters changes, at which point
+    only the nodes downstream of the change are dropped.
+    """
+
+    def __init__(
+        self,
+        stock: pd.DataFrame,
+        nodes: Optional[Mapping[str, Node]] = None,
+        **parameters: Any,
+    ) -> None:
+        self._inputs = {column: stock[column] for column in stock.columns}
+        self._nodes = dict(NODES if nodes is None else nodes)
+        self._parameters = parameters
+        self._cache: Dict[str, pd.Series] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        for name, _node in self._nodes.items():
+            for upstream in _node.dependencies + _node.parameters:
+                self._dependents.setdefault(upstream, set()).add(name)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        return self.get(name)
+
+    def __setitem__(self, name: str, values: pd.Series) -> None:
+        if name in self._nodes:
+            raise KeyError(f"{name!r} is calculated & cannot be set!")
+        self._inputs[name] = values
+        self._invalidate(name)
+
+    @property
+    def cached(self) -> FrozenSet[str]:
+        return frozenset(self._cache)
+
+    def set_parameter(self, name: str, value: Any) -> None:
+        self._parameters[name] = value
+        self._invalidate(name)
+
+    def get(self, name: str) -> pd.Series:
+        if name in self._inputs:
+            return self._inputs[name]
+        if name in self._cache:
+            return self._cache[name]
+        if name not in self._nodes:
+            raise KeyError(f"{name!r} is neither an input column nor a model node!")
+
+        _node = self._nodes[name]
+        kwargs = {dependency: self.get(dependency) for dependency in _node.dependencies}
+        kwargs.update(
+            {p: self._parameters[p] for p in _node.parameters if p in self._parameters}
+        )
+        self._cache[name] = _node.func(**kwargs)
+        return self._cache[name]
+
+    def compute(self, *names: str) -> pd.DataFrame:
+        return pd.DataFrame({name: self.get(name) for name in names})
+
+    def _invalidate(self, name: str) -> None:
+        stale = set()
+        to_visit = list(self._dependents.get(name, ()))
+        while to_visit:
+            dependent = to_visit.pop()
+            if dependent not in stale:
+                stale.add(dependent)
+                to_visit.extend(self._dependents.get(dependent, ()))
+        for dependent in stale:
+            self._cache.pop(dependent, None)
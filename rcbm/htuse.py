@@ -1,19 +1,43 @@
+from collections.abc import Mapping
+
 import numpy as np
 import pandas as pd
 
+from rcbm import arrays
+from rcbm import dtypes
+from rcbm import instrument
+
+MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+
+
+def _read_temperatures(temperatures, weather_store=None):
+    # NOTE: (station, year) keys are looked up in the weather store, which
+    # returns a read-only memory-mapped view rather than a copy of the profile
+    if weather_store is not None and isinstance(temperatures, tuple):
+        return weather_store[temperatures]
+    return temperatures
+
 
 def _calculate_heat_loss_kwh(heat_loss_coefficient, delta_t, hours):
-    # NOTE: all arrays must be the same length!
-    broadcasted_delta_t = np.tile(delta_t, len(heat_loss_coefficient))
-    broadcasted_hours = np.tile(hours, len(heat_loss_coefficient))
-    broadcasted_heat_loss_coefficient = np.repeat(heat_loss_coefficient, len(hours))
-    w_to_kwh = 1 / 1000
-    return (
-        broadcasted_heat_loss_coefficient
-        * broadcasted_delta_t
-        * broadcasted_hours
-        * w_to_kwh
-    )
+    return arrays._calculate_heat_loss_kwh_by_outer_product(
+        heat_loss_coefficient=heat_loss_coefficient,
+        delta_t=delta_t,
+        hours=hours,
+        per_period=True,
+    ).ravel()
 
 
 def _calculate_heat_loss_per_year_on_monthly_averages(
@@ -21,60 +45,213 @@ def _calculate_heat_loss_per_year_on_monthly_averages(
     internal_temperatures=None,
     external_temperatures=None,
 ):
-    # heating_months are ["jan", "feb", "mar", "apr", "may", "oct", "nov", "dec"]
-    heating_hours = np.array(
-        [d * 24 for d in (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)]
+    heat_loss_coefficient = pd.Series(heat_loss_coefficient)
+    heat_loss_kwh = arrays.calculate_heat_loss_per_year(
+        heat_loss_coefficient, internal_temperatures, external_temperatures
+    )
+    return pd.Series(heat_loss_kwh, index=heat_loss_coefficient.index).round()
+
+
+@instrument.instrumented
+def calculate_heat_loss_per_month(
+    heat_loss_coefficient,
+    internal_temperatures=None,
+    external_temperatures=None,
+    weather_store=None,
+):
+    heat_loss_coefficient = pd.Series(heat_loss_coefficient)
+    internal_temperatures = _read_temperatures(internal_temperatures, weather_store)
+    external_temperatures = _read_temperatures(external_temperatures, weather_store)
+    heat_loss_kwh = arrays.calculate_heat_loss_per_month(
+        heat_loss_coefficient, internal_temperatures, external_temperatures
+    )
+    return pd.DataFrame(
+        heat_loss_kwh, index=heat_loss_coefficient.index, columns=MONTHS
     )
-    heating_hours[5:9] = 0
-
-    if internal_temperatures is None:
-        internal_temperatures = np.array(
-            [
-                17.72,
-                17.73,
-                17.85,
-                17.95,
-                18.15,
-                18.35,
-                18.50,
-                18.48,
-                18.33,
-                18.11,
-                17.88,
-                17.77,
-            ]
-        )
 
-    if external_temperatures is None:
-        external_temperatures = np.array(
-            [
-                5.3,
-                5.5,
-                7.0,
-                8.3,
-                11.0,
-                13.5,
-                15.5,
-                15.2,
-                13.3,
-                10.4,
-                7.5,
-                6.0,
-            ]
+
+def _calculate_heat_loss_per_year_on_hourly_temperatures(
+    heat_loss_coefficient,
+    internal_temperatures,
+    external_temperatures,
+    block_size=100_000,
+):
+    heat_loss_coefficient = pd.Series(heat_loss_coefficient)
+    heat_loss_kwh = arrays.calculate_heat_loss_per_year(
+        heat_loss_coefficient,
+        internal_temperatures,
+        external_temperatures,
+        how="hourly",
+        block_size=block_size,
+    )
+    return pd.Series(heat_loss_kwh, index=heat_loss_coefficient.index).round()
+
+
+def iter_heat_loss_per_hour(
+    heat_loss_coefficient,
+    internal_temperatures,
+    external_temperatures,
+    block_size=10_000,
+    weather_store=None,
+):
+    """Yield hourly heat loss [kWh] in blocks of at most block_size buildings.
+
+    Each block is a DataFrame indexed by building with one column per hour.
+    """
+    heat_loss_coefficient = pd.Series(heat_loss_coefficient)
+    internal_temperatures = _read_temperatures(internal_temperatures, weather_store)
+    external_temperatures = _read_temperatures(external_temperatures, weather_store)
+    w_to_kwh = 1 / 1000
+    for block, delta_t in arrays._iter_hourly_delta_t(
+        internal_temperatures=internal_temperatures,
+        external_temperatures=external_temperatures,
+        no_buildings=len(heat_loss_coefficient),
+        block_size=block_size,
+    ):
+        heat_loss_coefficient_block = heat_loss_coefficient.iloc[block]
+        heat_loss_kwh = (
+            heat_loss_coefficient_block.to_numpy(dtype=delta_t.dtype)[:, np.newaxis]
+            * delta_t
+            * w_to_kwh
         )
-    delta_t = internal_temperatures - external_temperatures
+        yield pd.DataFrame(heat_loss_kwh, index=heat_loss_coefficient_block.index)
 
-    heat_loss_kwh = _calculate_heat_loss_kwh(
-        heat_loss_coefficient=heat_loss_coefficient,
-        delta_t=delta_t,
-        hours=heating_hours,
+
+def _select_climate_zone_temperatures(temperatures, climate_zone, rows, weather_store):
+    if isinstance(temperatures, Mapping):
+        return _read_temperatures(temperatures[climate_zone], weather_store)
+    temperatures = _read_temperatures(temperatures, weather_store)
+    if temperatures is not None and np.ndim(temperatures) == 2:
+        return np.asarray(temperatures)[rows]
+    return temperatures
+
+
+def _calculate_heat_loss_per_year_by_climate_zone(
+    _calc,
+    heat_loss_coefficient,
+    climate_zone,
+    internal_temperatures,
+    external_temperatures,
+    weather_store=None,
+    **kwargs,
+):
+    # NOTE: buildings are grouped with one hash pass & one stable sort so each
+    # climate zone runs as a single batch, whatever the order of the stock
+    heat_loss_coefficient = pd.Series(heat_loss_coefficient)
+    codes, climate_zones = pd.factorize(pd.Series(climate_zone))
+    if (codes == -1).any():
+        raise ValueError("Every building must have a climate zone - found nulls!")
+    rows_by_climate_zone = np.split(
+        np.argsort(codes, kind="stable"),
+        np.cumsum(np.bincount(codes, minlength=len(climate_zones)))[:-1],
     )
-    return heat_loss_kwh.sum(level=0).round()
 
+    heat_loss_kwh = np.empty(len(heat_loss_coefficient), dtype=dtypes.get_float_dtype())
+    for zone, rows in zip(climate_zones, rows_by_climate_zone):
+        heat_loss_kwh[rows] = _calc(
+            heat_loss_coefficient.iloc[rows],
+            _select_climate_zone_temperatures(
+                internal_temperatures, zone, rows, weather_store
+            ),
+            _select_climate_zone_temperatures(
+                external_temperatures, zone, rows, weather_store
+            ),
+            **kwargs,
+        ).to_numpy()
+    return pd.Series(heat_loss_kwh, index=heat_loss_coefficient.index)
 
+
+@instrument.instrumented
 def calculate_heat_loss_per_year(
-    heat_loss_coefficient, internal_temperatures, external_temperatures, how="monthly"
+    heat_loss_coefficient,
+    internal_temperatures,
+    external_temperatures,
+    how="monthly",
+    weather_store=None,
+    climate_zone=None,
+    **kwargs,
 ):
-    _function_map = {"monthly": _calculate_heat_loss_per_year_on_monthly_averages}
+    _function_map = {
+        "monthly": _calculate_heat_loss_per_year_on_monthly_averages,
+        "hourly": _calculate_heat_loss_per_year_on_hourly_temperatures,
+    }
     _calc = _function_map[how]
-    return _calc(heat_loss_coefficient, internal_temperatures, external_temperatures)
+    if climate_zone is not None:
+        return _calculate_heat_loss_per_year_by_climate_zone(
+            _calc,
+            heat_loss_coefficient,
+            climate_zone,
+            internal_temperatures,
+            external_temperatures,
+            weather_store=weather_store,
+            **kwargs,
+        )
+    internal_temperatures = _read_temperatures(internal_temperatures, weather_store)
+    external_temperatures = _read_temperatures(external_temperatures, weather_store)
+    return _calc(
+        heat_loss_coefficient, internal_temperatures, external_temperatures, **kwargs
+    )
+
+
+def _get_monthly_gains(gains):
+    # a Series holds one value per building while arrays broadcast as is
+    if isinstance(gains, pd.Series):
+        return gains.to_numpy(dtype=dtypes.get_float_dtype())[:, np.newaxis]
+    return np.asarray(gains)
+
+
+@instrument.instrumented
+def calculate_space_heating_demand_per_month(
+    heat_loss_coefficient,
+    thermal_capacitance,
+    internal_gains=0.0,
+    solar_gains=0.0,
+    internal_temperatures=None,
+    external_temperatures=None,
+    weather_store=None,
+):
+    """Monthly heat loss [kWh] net of the usable share of gains (ISO 13790).
+
+    Gains [W] are a Series with one value per building or anything that
+    broadcasts to (no_buildings, 12).  thermal_capacitance [J/K] is per
+    building - see dynamic.calculate_thermal_capacitance.
+    """
+    heat_loss_coefficient = pd.Series(heat_loss_coefficient)
+    internal_temperatures = _read_temperatures(internal_temperatures, weather_store)
+    external_temperatures = _read_temperatures(external_temperatures, weather_store)
+    space_heating_demand = arrays.calculate_space_heating_demand_per_month(
+        heat_loss_coefficient,
+        thermal_capacitance,
+        internal_gains=_get_monthly_gains(internal_gains),
+        solar_gains=_get_monthly_gains(solar_gains),
+        internal_temperatures=internal_temperatures,
+        external_temperatures=external_temperatures,
+    )
+    return pd.DataFrame(
+        space_heating_demand, index=heat_loss_coefficient.index, columns=MONTHS
+    )
+
+
+@instrument.instrumented
+def calculate_space_heating_demand_per_year(
+    heat_loss_coefficient,
+    thermal_capacitance,
+    internal_gains=0.0,
+    solar_gains=0.0,
+    internal_temperatures=None,
+    external_temperatures=None,
+    weather_store=None,
+):
+    return (
+        calculate_space_heating_demand_per_month(
+            heat_loss_coefficient,
+            thermal_capacitance,
+            internal_gains=internal_gains,
+            solar_gains=solar_gains,
+            internal_temperatures=internal_temperatures,
+            external_temperatures=external_temperatures,
+            weather_store=weather_store,
+        )
+        .sum(axis=1)
+        .round()
+    )
@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import itertools
+import time
+import tracemalloc
+from typing import Callable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Record(NamedTuple):
+    name: str
+    seconds: float
+    rows: Optional[int]
+    peak_memory_bytes: Optional[int]
+
+
+class Recorder:
+    def __init__(
+        self,
+        callback: Optional[Callable[[Record], None]] = None,
+        trace_memory: bool = False,
+    ) -> None:
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records: List[Record] = []
+        # absolute peaks of the stages that are currently running
+        self._peaks: List[int] = []
+
+    def __repr__(self) -> str:
+        return f"Recorder(records={len(self.records)})"
+
+    def _add(self, record: Record) -> None:
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def report(self) -> pd.DataFrame:
+        """Calls, total time, total rows & largest peak allocation per stage."""
+        records = pd.DataFrame(self.records, columns=Record._fields)
+        return (
+            records.groupby("name", sort=False)
+            .agg(
+                calls=("seconds", "size"),
+                seconds=("seconds", "sum"),
+                rows=("rows", "sum"),
+                peak_memory_bytes=("peak_memory_bytes", "max"),
+            )
+            .sort_values("seconds", ascending=False)
+        )
+
+
+_recorder: ContextVar[Optional[Recorder]] = ContextVar("recorder", default=None)
+
+
+def is_recording() -> bool:
+    return _recorder.get() is not None
+
+
+@contextmanager
+def record(
+    callback: Optional[Callable[[Record], None]] = None, trace_memory: bool = False
+) -> Iterator[Recorder]:
+    """Record wall time & rows of every rcbm function called in this context.
+
+    Each call is passed to callback (if any) as soon as it finishes & all
+    calls are kept on the yielded Recorder - see Recorder.report().  Set
+    trace_memory=True to also record peak allocations via tracemalloc, which
+    slows calculations down considerably.  Schema validation is recorded as a
+    separate "<function>[validation]" stage.  Outside this context functions
+    are called directly at the cost of one context variable lookup.
+    """
+    if trace_memory and not hasattr(tracemalloc, "reset_peak"):
+        raise RuntimeError("trace_memory=True requires Python 3.9+")
+    recorder = Recorder(callback=callback, trace_memory=trace_memory)
+    is_tracing = tracemalloc.is_tracing()
+    if trace_memory and not is_tracing:
+        tracemalloc.start()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        if trace_memory and not is_tracing:
+            tracemalloc.stop()
+
+
+def _count_rows(args: tuple, kwargs: dict) -> Optional[int]:
+    for value in itertools.chain(args, kwargs.values()):
+        if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray)):
+            return len(value)
+    return None
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None) -> Iterator[None]:
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+
+    trace_memory = recorder.trace_memory and tracemalloc.is_tracing()
+    if trace_memory:
+        # NOTE: tracemalloc has one peak so nested stages reset it - the
+        # running peak of the enclosing stage is kept on the recorder instead
+        current_memory, peak = tracemalloc.get_traced_memory()
+        if recorder._peaks:
+            recorder._peaks[-1] = max(recorder._peaks[-1], peak)
+        recorder._peaks.append(0)
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_memory_bytes = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, recorder._peaks.pop())
+            if recorder._peaks:
+                recorder._peaks[-1] = max(recorder._peaks[-1], peak)
+            peak_memory_bytes = peak - current_memory
+        recorder._add(
+            Record(
+                name=name,
+                seconds=seconds,
+                rows=rows,
+                peak_memory_bytes=peak_memory_bytes,
+            )
+        )
+
+
+def instrumented(func: Callable) -> Callable:
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _recorder.get() is None:
+            return func(*args, **kwargs)
+        with stage(name, rows=_count_rows(args, kwargs)):
+            return func(*args, **kwargs)
+
+    return wrapper
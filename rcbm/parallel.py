@@ -0,0 +1,242 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import sys
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from pandera.errors import SchemaError
+
+from rcbm import arrays
+from rcbm import instrument
+from rcbm import pipeline
+
+
+class _SharedArray(NamedTuple):
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _create_shared_array(
+    shape: Tuple[int, ...], dtype: str
+) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _attach_shared_memory(spec: _SharedArray) -> shared_memory.SharedMemory:
+    # NOTE: pool workers share the parent process's resource tracker whatever
+    # the start method, so attaching must not unregister the block - the
+    # parent owns & unlinks it
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=spec.name, track=False)
+    return shared_memory.SharedMemory(name=spec.name)
+
+
+def _to_validation_frame(
+    columns: Dict[str, np.ndarray], start: int, stop: int
+) -> pd.DataFrame:
+    # NOTE: enumerations are validated on their codes - unknown values & nulls
+    # were coded as -1 so fail is_category_of just as the raw values would
+    return pd.DataFrame(
+        {c: columns[c] for c in pipeline.INPUT_COLUMNS},
+        index=pd.RangeIndex(start, stop),
+        copy=False,
+    )
+
+
+def _select_shard_temperatures(temperatures, start: int, stop: int):
+    # per-building temperatures are (no_buildings, no_periods)
+    if temperatures is not None and np.ndim(temperatures) == 2:
+        return np.asarray(temperatures)[start:stop]
+    return temperatures
+
+
+def _calculate_shard(
+    float_shm: shared_memory.SharedMemory,
+    floats: _SharedArray,
+    float_columns: List[str],
+    int_shm: shared_memory.SharedMemory,
+    ints: _SharedArray,
+    int_columns: List[str],
+    out_shm: shared_memory.SharedMemory,
+    out: _SharedArray,
+    start: int,
+    stop: int,
+    thermal_bridging_factor: float,
+    ventilation_heat_loss_constant: float,
+    internal_temperatures,
+    external_temperatures,
+    how: str,
+    validate: bool,
+) -> None:
+    float_block = np.ndarray(floats.shape, dtype=floats.dtype, buffer=float_shm.buf)
+    int_block = np.ndarray(ints.shape, dtype=ints.dtype, buffer=int_shm.buf)
+    out_block = np.ndarray(out.shape, dtype=out.dtype, buffer=out_shm.buf)
+
+    columns: Dict[str, np.ndarray] = {
+        column: float_block[i, start:stop] for i, column in enumerate(float_columns)
+    }
+    columns.update(
+        {column: int_block[i, start:stop] for i, column in enumerate(int_columns)}
+    )
+    columns["is_draught_lobby"] = columns["is_draught_lobby"].astype(bool)
+    if validate:
+        pipeline.input_schema().validate(_to_validation_frame(columns, start, stop))
+    arrays._raise_for_zero_floor_areas(columns["total_floor_area"])
+
+    outputs = arrays.calculate_heat_loss(
+        columns,
+        thermal_bridging_factor=thermal_bridging_factor,
+        ventilation_heat_loss_constant=ventilation_heat_loss_constant,
+    )
+    outputs["annual_heat_loss"] = np.round(
+        arrays.calculate_heat_loss_per_year(
+            outputs["heat_loss_coefficient"],
+            internal_temperatures,
+            external_temperatures,
+            how=how,
+        )
+    )
+    for i, column in enumerate(pipeline.OUTPUT_COLUMNS):
+        out_block[i, start:stop] = outputs[column]
+
+
+def _run_shard(
+    floats: _SharedArray,
+    float_columns: List[str],
+    ints: _SharedArray,
+    int_columns: List[str],
+    out: _SharedArray,
+    start: int,
+    stop: int,
+    thermal_bridging_factor: float,
+    ventilation_heat_loss_constant: float,
+    internal_temperatures,
+    external_temperatures,
+    how: str,
+    validate: bool,
+) -> Optional[str]:
+    # NOTE: array views on shared memory must be released before it is closed,
+    # so they only live within _calculate_shard.  SchemaErrors hold their
+    # (unpicklable) schema so only their message is sent back to the parent
+    shms = [_attach_shared_memory(spec) for spec in (floats, ints, out)]
+    try:
+        _calculate_shard(
+            shms[0],
+            floats,
+            float_columns,
+            shms[1],
+            ints,
+            int_columns,
+            shms[2],
+            out,
+            start,
+            stop,
+            thermal_bridging_factor,
+            ventilation_heat_loss_constant,
+            internal_temperatures,
+            external_temperatures,
+            how,
+            validate,
+        )
+    except SchemaError as e:
+        return str(e)
+    finally:
+        for shm in shms:
+            shm.close()
+    return None
+
+
+@instrument.instrumented
+def calculate_heat_loss(
+    stock: pd.DataFrame,
+    max_workers: Optional[int] = None,
+    no_shards: Optional[int] = None,
+    thermal_bridging_factor: float = 0.05,
+    ventilation_heat_loss_constant: float = 0.33,
+    internal_temperatures=None,
+    external_temperatures=None,
+    how: str = "monthly",
+    validate: bool = True,
+) -> pd.DataFrame:
+    """As rcbm.calculate_heat_loss but split into shards run on a process pool.
+
+    Inputs & outputs live in shared memory so no frames are pickled - each
+    shard validates, calculates & writes its own rows (annual heat loss
+    included), so results match the serial run exactly & come back in the
+    original order.  Only column names & dtypes are checked up front.
+    Requires Python 3.8+.
+    """
+    if validate:
+        with instrument.stage("parallel.calculate_heat_loss[validation]"):
+            # values are validated per shard, on their encoded arrays
+            pipeline.input_schema().validate(stock.iloc[:0])
+
+    max_workers = max_workers or os.cpu_count() or 1
+    no_shards = no_shards or max_workers
+    no_rows = len(stock)
+    inputs = pipeline._to_arrays(stock)
+    int_columns = [*pipeline.CATEGORICAL_COLUMNS, "is_draught_lobby"]
+    float_columns = [c for c in pipeline.INPUT_COLUMNS if c not in int_columns]
+
+    float_shm, float_block = _create_shared_array(
+        (len(float_columns), no_rows), "float64"
+    )
+    int_shm, int_block = _create_shared_array((len(int_columns), no_rows), "int8")
+    out_shm, out_block = _create_shared_array(
+        (len(pipeline.OUTPUT_COLUMNS), no_rows), "float64"
+    )
+    try:
+        for i, column in enumerate(float_columns):
+            float_block[i] = inputs[column]
+        for i, column in enumerate(int_columns):
+            int_block[i] = inputs[column]
+        del inputs
+
+        bounds = np.linspace(0, no_rows, min(no_shards, no_rows) + 1, dtype=int)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _run_shard,
+                    _SharedArray(float_shm.name, float_block.shape, "float64"),
+                    float_columns,
+                    _SharedArray(int_shm.name, int_block.shape, "int8"),
+                    int_columns,
+                    _SharedArray(out_shm.name, out_block.shape, "float64"),
+                    start,
+                    stop,
+                    thermal_bridging_factor,
+                    ventilation_heat_loss_constant,
+                    _select_shard_temperatures(internal_temperatures, start, stop),
+                    _select_shard_temperatures(external_temperatures, start, stop),
+                    how,
+                    validate,
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            failures = [future.result() for future in futures]
+        failure = next((f for f in failures if f is not None), None)
+        if failure is not None:
+            raise SchemaError(pipeline.input_schema(), stock, failure)
+
+        heat_loss = pd.DataFrame(
+            {
+                column: out_block[i].copy()
+                for i, column in enumerate(pipeline.OUTPUT_COLUMNS)
+            },
+            index=stock.index,
+        )
+    finally:
+        del float_block, int_block, out_block
+        for shm in (float_shm, int_shm, out_shm):
+            shm.close()
+            shm.unlink()
+    return heat_loss
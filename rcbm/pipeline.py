@@ -0,0 +1,171 @@
+from typing import Dict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pandera as pa
+
+from rcbm import arrays
+from rcbm import dtypes
+from rcbm import fab
+from rcbm import htuse
+from rcbm import instrument
+from rcbm import vent
+
+FABRIC_COLUMNS = [
+    f"{component}_{quantity}"
+    for component in fab.FABRIC_COMPONENTS
+    for quantity in ("area", "uvalue")
+]
+INPUT_COLUMNS = FABRIC_COLUMNS + ["total_floor_area"] + list(vent.INPUT_COLUMNS)
+OUTPUT_COLUMNS = [
+    "fabric_heat_loss_coefficient",
+    "ventilation_heat_loss_coefficient",
+    "heat_loss_coefficient",
+    "heat_loss_parameter",
+    "annual_heat_loss",
+]
+INTERMEDIATE_COLUMNS = [
+    "infiltration_rate_due_to_openings",
+    "infiltration_rate_due_to_structure",
+    "infiltration_rate",
+    "effective_air_rate_change",
+]
+CATEGORICAL_COLUMNS = {
+    "structure_type": vent.STRUCTURE_TYPES,
+    "is_floor_suspended": vent.FLOOR_TYPES,
+    "ventilation_method": vent.VENTILATION_METHODS,
+}
+COUNT_COLUMNS = [
+    "no_chimneys",
+    "no_open_flues",
+    "no_fans",
+    "no_room_heaters",
+    "no_storeys",
+    "no_sides_sheltered",
+]
+
+
+def input_schema() -> pa.DataFrameSchema:
+    fabric_columns = {
+        column: pa.Column(checks=vent.is_number, nullable=False)
+        for column in FABRIC_COLUMNS
+    }
+    total_floor_area = pa.Column(
+        checks=[vent.is_number, pa.Check.not_equal_to(0)], nullable=False
+    )
+    return vent.input_schema().add_columns(
+        {**fabric_columns, "total_floor_area": total_floor_area}
+    )
+
+
+@instrument.instrumented
+def compact(stock: pd.DataFrame, dtype: str = "float32") -> pd.DataFrame:
+    """Downcast the input columns of a stock to use as little memory as possible.
+
+    Enumerations become categoricals, counts become the smallest unsigned
+    integer that holds them losslessly & all other numbers become dtype.
+    """
+    compacted = stock.copy()
+    for column in INPUT_COLUMNS:
+        if column in CATEGORICAL_COLUMNS:
+            compacted[column] = stock[column].astype(
+                pd.CategoricalDtype(CATEGORICAL_COLUMNS[column])
+            )
+        elif column in COUNT_COLUMNS:
+            compacted[column] = pd.to_numeric(stock[column], downcast="unsigned")
+        elif column != "is_draught_lobby":
+            compacted[column] = stock[column].astype(dtypes.get_float_dtype(dtype))
+    return compacted
+
+
+def _to_arrays(stock: pd.DataFrame) -> Dict[str, np.ndarray]:
+    dtype = dtypes.get_float_dtype()
+    columns = {}
+    for column in INPUT_COLUMNS:
+        if column in CATEGORICAL_COLUMNS:
+            columns[column] = vent._get_codes(
+                stock[column], CATEGORICAL_COLUMNS[column]
+            )
+        elif column == "is_draught_lobby":
+            columns[column] = stock[column].to_numpy(dtype="bool")
+        else:
+            columns[column] = stock[column].to_numpy(dtype=dtype, na_value=np.nan)
+    return columns
+
+
+def _find_archetypes(stock: pd.DataFrame):
+    # NOTE: one grouping pass numbers each unique combination of inputs, so
+    # codes is the inverse index from buildings to their archetype
+    codes = (
+        stock.groupby(INPUT_COLUMNS, sort=False, dropna=False, observed=True)
+        .ngroup()
+        .to_numpy()
+    )
+    _, first_rows = np.unique(codes, return_index=True)
+    return first_rows, codes
+
+
+@instrument.instrumented
+def calculate_heat_loss(
+    stock: pd.DataFrame,
+    thermal_bridging_factor: float = 0.05,
+    ventilation_heat_loss_constant: float = 0.33,
+    internal_temperatures=None,
+    external_temperatures=None,
+    how: str = "monthly",
+    validate: bool = True,
+    keep_intermediates: bool = False,
+    dtype: Optional[str] = None,
+    deduplicate: bool = False,
+) -> pd.DataFrame:
+    """Heat Loss Coefficient, Heat Loss Parameter & annual heat loss of a stock.
+
+    The stock needs one column per fab/vent input (see INPUT_COLUMNS).  It is
+    validated once up front (unless validate=False) & then run in one pass on
+    NumPy arrays.  Set keep_intermediates=True to also return the
+    infiltration & air rate change stages.  dtype overrides the float dtype
+    policy (see dtypes.float_dtype) for this call only.  Set deduplicate=True
+    to validate & calculate each unique combination of inputs (archetype) once
+    & copy its results to every building that shares it - finding archetypes
+    costs about as much as the calculation itself, so this pays off when
+    validating or when running on hourly temperatures.
+    """
+    if deduplicate:
+        # archetypes are found first so only they are validated & calculated
+        with instrument.stage("pipeline.calculate_heat_loss[deduplication]"):
+            archetypes, codes = _find_archetypes(stock)
+            archetype_stock = stock.iloc[archetypes]
+    else:
+        archetype_stock = stock
+    if validate:
+        with instrument.stage("pipeline.calculate_heat_loss[validation]"):
+            input_schema().validate(archetype_stock)
+    fab._raise_for_zero_floor_areas(archetype_stock["total_floor_area"])
+    # temperatures per building make every building its own archetype
+    is_per_building = (
+        max(np.ndim(internal_temperatures), np.ndim(external_temperatures)) == 2
+    )
+
+    with dtypes.float_dtype(dtypes.get_float_dtype(dtype).name):
+        outputs = arrays.calculate_heat_loss(
+            _to_arrays(archetype_stock),
+            thermal_bridging_factor=thermal_bridging_factor,
+            ventilation_heat_loss_constant=ventilation_heat_loss_constant,
+            keep_intermediates=keep_intermediates,
+        )
+        if deduplicate and is_per_building:
+            outputs = {c: values[codes] for c, values in outputs.items()}
+        outputs["annual_heat_loss"] = htuse.calculate_heat_loss_per_year(
+            pd.Series(outputs["heat_loss_coefficient"], copy=False),
+            internal_temperatures,
+            external_temperatures,
+            how=how,
+        ).to_numpy()
+        if deduplicate and not is_per_building:
+            outputs = {c: values[codes] for c, values in outputs.items()}
+
+    columns = OUTPUT_COLUMNS + (INTERMEDIATE_COLUMNS if keep_intermediates else [])
+    return pd.DataFrame(
+        {column: outputs[column] for column in columns}, index=stock.index
+    )
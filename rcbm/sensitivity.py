@@ -0,0 +1,195 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from rcbm import arrays
+from rcbm import fab
+from rcbm import instrument
+from rcbm import pipeline
+from rcbm import vent
+from rcbm.arrays import OPENING_VENTILATION_RATES
+
+NUMERIC_INPUT_COLUMNS = [
+    c
+    for c in pipeline.INPUT_COLUMNS
+    if c not in pipeline.CATEGORICAL_COLUMNS and c != "is_draught_lobby"
+]
+SENSITIVITY_OUTPUT_COLUMNS = [
+    "heat_loss_coefficient",
+    "heat_loss_parameter",
+    "annual_heat_loss",
+]
+
+
+def _calculate_degree_kilohours(
+    no_buildings: int, internal_temperatures, external_temperatures, how: str
+) -> np.ndarray:
+    # annual heat loss is HLC x degree hours / 1000 so its partials are those
+    # of HLC scaled by these - i.e. the annual heat loss of a unit HLC
+    return arrays.calculate_heat_loss_per_year(
+        np.ones(no_buildings), internal_temperatures, external_temperatures, how=how
+    )
+
+
+def _calculate_effective_air_rate_change_partials(
+    columns: Dict[str, np.ndarray], infiltration_rate: np.ndarray
+) -> Dict[str, np.ndarray]:
+    # partials of effective air rate change wrt infiltration rate, building
+    # volume (directly) & heat exchanger efficiency, per ventilation method
+    methods = columns["ventilation_method"]
+    building_volume = columns["building_volume"]
+
+    def _is(method: str) -> np.ndarray:
+        return methods == vent.VENTILATION_METHODS.index(method)
+
+    is_natural = _is("natural_ventilation") | _is(
+        "positive_input_ventilation_from_loft"
+    )
+    natural = np.where(infiltration_rate > 1, 1.0, infiltration_rate)
+    wrt_infiltration_rate = np.select(
+        [
+            is_natural,
+            _is("positive_input_ventilation_from_outside"),
+            _is("mechanical_ventilation_no_heat_recovery")
+            | _is("mechanical_ventilation_heat_recovery"),
+        ],
+        [natural, (infiltration_rate + 0.25 > 0.5).astype("float64"), 1.0],
+        default=np.nan,
+    )
+    wrt_building_volume = np.where(
+        _is("positive_input_ventilation_from_loft"), -20 / building_volume**2, 0.0
+    )
+    wrt_heat_exchanger_efficiency = np.where(
+        _is("mechanical_ventilation_heat_recovery"), -0.5 / 100, 0.0
+    )
+    return {
+        "infiltration_rate": wrt_infiltration_rate,
+        "building_volume": wrt_building_volume,
+        "heat_exchanger_efficiency": wrt_heat_exchanger_efficiency,
+    }
+
+
+def _calculate_infiltration_rate_partials(
+    columns: Dict[str, np.ndarray],
+    infiltration_rate_due_to_openings: np.ndarray,
+    infiltration_rate_due_to_structure: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    building_volume = columns["building_volume"]
+    shelter_factor = 1 - 0.075 * columns["no_sides_sheltered"]
+    has_permeability_test = ~np.isnan(columns["permeability_test_result"])
+    is_theoretical = (~has_permeability_test).astype("float64")
+
+    partials = {
+        column: shelter_factor * rate / building_volume
+        for column, rate in OPENING_VENTILATION_RATES.items()
+    }
+    openings = sum(
+        columns[column] * rate for column, rate in OPENING_VENTILATION_RATES.items()
+    )
+    partials["building_volume"] = -shelter_factor * openings / building_volume**2
+    partials["permeability_test_result"] = shelter_factor * has_permeability_test
+    partials["no_storeys"] = shelter_factor * 0.1 * is_theoretical
+    partials["percentage_draught_stripped"] = (
+        shelter_factor * (-0.2 / 100) * is_theoretical
+    )
+    partials["no_sides_sheltered"] = -0.075 * (
+        infiltration_rate_due_to_openings + infiltration_rate_due_to_structure
+    )
+    return partials
+
+
+@instrument.instrumented
+def calculate_heat_loss_sensitivities(
+    stock: pd.DataFrame,
+    thermal_bridging_factor: float = 0.05,
+    ventilation_heat_loss_constant: float = 0.33,
+    internal_temperatures=None,
+    external_temperatures=None,
+    how: str = "monthly",
+    validate: bool = True,
+) -> pd.DataFrame:
+    """Partial derivatives of HLC, HLP & annual heat loss wrt every numeric input.
+
+    Returns one row per building with columns (output, input).  Derivatives
+    are exact & evaluated in one pass alongside the model.  Where the model
+    has a kink (natural ventilation at an infiltration rate of 1, positive
+    input ventilation from outside at 0.25) the derivative of the branch the
+    building is on is used.  Rounding of annual heat loss is ignored.
+    Derivatives wrt missing permeability test results or heat exchanger
+    efficiencies are 0.
+    """
+    if validate:
+        pipeline.input_schema().validate(stock)
+    fab._raise_for_zero_floor_areas(stock["total_floor_area"])
+
+    columns = pipeline._to_arrays(stock)
+    outputs = arrays.calculate_heat_loss(
+        columns,
+        thermal_bridging_factor=thermal_bridging_factor,
+        ventilation_heat_loss_constant=ventilation_heat_loss_constant,
+        keep_intermediates=True,
+    )
+    building_volume = columns["building_volume"]
+    total_floor_area = columns["total_floor_area"]
+
+    air_rate_partials = _calculate_effective_air_rate_change_partials(
+        columns, outputs["infiltration_rate"]
+    )
+    infiltration_rate_partials = _calculate_infiltration_rate_partials(
+        columns,
+        outputs["infiltration_rate_due_to_openings"],
+        outputs["infiltration_rate_due_to_structure"],
+    )
+
+    # ventilation HLC is constant x volume x air rate change(infiltration rate)
+    ventilation_factor = ventilation_heat_loss_constant * building_volume
+    heat_loss_coefficient_partials = {
+        column: ventilation_factor * air_rate_partials["infiltration_rate"] * partial
+        for column, partial in infiltration_rate_partials.items()
+    }
+    heat_loss_coefficient_partials["building_volume"] += (
+        ventilation_heat_loss_constant * outputs["effective_air_rate_change"]
+        + ventilation_factor * air_rate_partials["building_volume"]
+    )
+    heat_loss_coefficient_partials["heat_exchanger_efficiency"] = (
+        ventilation_factor * air_rate_partials["heat_exchanger_efficiency"]
+    )
+    for component in fab.FABRIC_COMPONENTS:
+        heat_loss_coefficient_partials[f"{component}_area"] = (
+            columns[f"{component}_uvalue"] + thermal_bridging_factor
+        )
+        heat_loss_coefficient_partials[f"{component}_uvalue"] = columns[
+            f"{component}_area"
+        ]
+    heat_loss_coefficient_partials["total_floor_area"] = np.zeros(len(stock))
+
+    heat_loss_parameter_partials = {
+        column: partial / total_floor_area
+        for column, partial in heat_loss_coefficient_partials.items()
+    }
+    heat_loss_parameter_partials["total_floor_area"] = (
+        -outputs["heat_loss_coefficient"] / total_floor_area**2
+    )
+
+    degree_kilohours = _calculate_degree_kilohours(
+        len(stock), internal_temperatures, external_temperatures, how
+    )
+    annual_heat_loss_partials = {
+        column: partial * degree_kilohours
+        for column, partial in heat_loss_coefficient_partials.items()
+    }
+
+    partials = {
+        "heat_loss_coefficient": heat_loss_coefficient_partials,
+        "heat_loss_parameter": heat_loss_parameter_partials,
+        "annual_heat_loss": annual_heat_loss_partials,
+    }
+    return pd.DataFrame(
+        {
+            (output, column): partials[output][column]
+            for output in SENSITIVITY_OUTPUT_COLUMNS
+            for column in NUMERIC_INPUT_COLUMNS
+        },
+        index=stock.index,
+    )
@@ -0,0 +1,126 @@
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Union
+
+import pandas as pd
+
+from rcbm import pipeline
+from rcbm import vent
+
+PathLike = Union[str, Path]
+
+CATEGORICAL_DTYPES = {
+    "structure_type": vent.STRUCTURE_TYPE_DTYPE,
+    "is_floor_suspended": vent.FLOOR_TYPE_DTYPE,
+    "ventilation_method": vent.VENTILATION_METHOD_DTYPE,
+}
+
+
+def _import_pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required to read & write Parquet files"
+            " - please install it via `pip install rcbm[arrow]`!"
+        ) from e
+    return pq
+
+
+def _is_parquet(path: PathLike) -> bool:
+    return Path(path).suffix in (".parquet", ".pq")
+
+
+def iter_stock(
+    path: PathLike,
+    columns: Optional[Mapping[str, str]] = None,
+    index_col: Optional[str] = None,
+    chunksize: int = 100_000,
+) -> Iterator[pd.DataFrame]:
+    """Read only the model's input columns from a CSV or Parquet stock file.
+
+    columns maps column names in the file to model input names & defaults to
+    pipeline.INPUT_COLUMNS as named in the file.  Chunks of at most chunksize
+    rows are yielded one at a time.
+    """
+    if columns is None:
+        columns = {column: column for column in pipeline.INPUT_COLUMNS}
+    usecols = list(columns) + ([index_col] if index_col is not None else [])
+
+    if _is_parquet(path):
+        pq = _import_pyarrow_parquet()
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(
+            batch_size=chunksize, columns=usecols
+        ):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            if index_col is not None:
+                chunk = chunk.set_index(index_col)
+            yield chunk.rename(columns=columns)
+    else:
+        dtype = {
+            file_column: CATEGORICAL_DTYPES[column]
+            for file_column, column in columns.items()
+            if column in CATEGORICAL_DTYPES
+        }
+        for chunk in pd.read_csv(
+            path,
+            usecols=usecols,
+            index_col=index_col,
+            dtype=dtype,
+            chunksize=chunksize,
+        ):
+            yield chunk.rename(columns=columns)
+
+
+def iter_heat_loss(
+    path: PathLike,
+    columns: Optional[Mapping[str, str]] = None,
+    index_col: Optional[str] = None,
+    chunksize: int = 100_000,
+    **kwargs: Any,
+) -> Iterator[pd.DataFrame]:
+    for chunk in iter_stock(
+        path, columns=columns, index_col=index_col, chunksize=chunksize
+    ):
+        yield pipeline.calculate_heat_loss(chunk, **kwargs)
+
+
+def write_heat_loss(
+    path: PathLike,
+    output_path: PathLike,
+    columns: Optional[Mapping[str, str]] = None,
+    index_col: Optional[str] = None,
+    chunksize: int = 100_000,
+    **kwargs: Any,
+) -> None:
+    """Run calculate_heat_loss on a stock file chunk by chunk & write each result.
+
+    Output is written as Parquet or CSV depending on the suffix of output_path
+    so peak memory depends on chunksize rather than on the size of the stock.
+    """
+    results = iter_heat_loss(
+        path, columns=columns, index_col=index_col, chunksize=chunksize, **kwargs
+    )
+    if _is_parquet(output_path):
+        pq = _import_pyarrow_parquet()
+        import pyarrow
+
+        writer = None
+        try:
+            for result in results:
+                table = pyarrow.Table.from_pandas(result, preserve_index=True)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        for i, result in enumerate(results):
+            result.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0)
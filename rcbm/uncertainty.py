@@ -0,0 +1,196 @@
+from typing import Callable
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from rcbm import arrays
+from rcbm import fab
+from rcbm import instrument
+from rcbm import pipeline
+
+Distribution = Callable[[np.ndarray, np.random.Generator, int], np.ndarray]
+
+# totals of these outputs over all buildings are meaningful stock-level figures
+STOCK_OUTPUT_COLUMNS = [
+    "fabric_heat_loss_coefficient",
+    "ventilation_heat_loss_coefficient",
+    "heat_loss_coefficient",
+    "annual_heat_loss",
+]
+
+
+class Uncertainty(NamedTuple):
+    buildings: pd.DataFrame
+    stock: pd.DataFrame
+
+
+def _clip(samples: np.ndarray, minimum: Optional[float]) -> np.ndarray:
+    if minimum is not None:
+        np.maximum(samples, minimum, out=samples)
+    return samples
+
+
+def normal(
+    scale: float, relative: bool = False, minimum: Optional[float] = 0
+) -> Distribution:
+    """Normally distributed around each building's input.
+
+    scale is a standard deviation - as a fraction of the input if relative.
+    """
+
+    def _sample(baseline: np.ndarray, rng: np.random.Generator, m: int):
+        noise = rng.normal(0, scale, size=(len(baseline), m))
+        if relative:
+            samples = baseline[:, np.newaxis] * (1 + noise)
+        else:
+            samples = baseline[:, np.newaxis] + noise
+        return _clip(samples, minimum)
+
+    return _sample
+
+
+def uniform(
+    half_width: float, relative: bool = False, minimum: Optional[float] = 0
+) -> Distribution:
+    """Uniformly distributed within +/- half_width of each building's input.
+
+    half_width is a fraction of the input if relative.
+    """
+
+    def _sample(baseline: np.ndarray, rng: np.random.Generator, m: int):
+        noise = rng.uniform(-half_width, half_width, size=(len(baseline), m))
+        if relative:
+            samples = baseline[:, np.newaxis] * (1 + noise)
+        else:
+            samples = baseline[:, np.newaxis] + noise
+        return _clip(samples, minimum)
+
+    return _sample
+
+
+def _raise_for_invalid_distributions(distributions: Mapping[str, Distribution]):
+    invalid_columns = [
+        column
+        for column in distributions
+        if column not in pipeline.INPUT_COLUMNS
+        or column in pipeline.CATEGORICAL_COLUMNS
+        or column == "is_draught_lobby"
+    ]
+    if invalid_columns:
+        raise ValueError(
+            f"Cannot sample {invalid_columns} - distributions can only be"
+            " assigned to numeric input columns!"
+        )
+
+
+def _raise_for_zero_samples(
+    columns: Mapping[str, np.ndarray], distributions: Mapping[str, Distribution]
+) -> None:
+    # NOTE: samples clipped to a minimum of 0 can be exactly 0, which the
+    # baseline checks cannot catch
+    zero_columns = [
+        column
+        for column in ("total_floor_area", "building_volume")
+        if column in distributions
+        and ((columns[column] == 0) | np.isnan(columns[column])).any()
+    ]
+    if zero_columns:
+        raise ZeroDivisionError(
+            f"Samples of {zero_columns} contain zeros or nulls"
+            " - please give their distributions a positive minimum!"
+        )
+
+
+@instrument.instrumented
+def calculate_heat_loss_uncertainty(
+    stock: pd.DataFrame,
+    distributions: Mapping[str, Distribution],
+    no_samples: int = 1_000,
+    percentiles: Sequence[float] = (5, 50, 95),
+    seed: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    thermal_bridging_factor: float = 0.05,
+    ventilation_heat_loss_constant: float = 0.33,
+    internal_temperatures=None,
+    external_temperatures=None,
+    validate: bool = True,
+) -> Uncertainty:
+    """Monte Carlo distributions of rcbm.calculate_heat_loss outputs.
+
+    distributions maps numeric input columns to callables that draw
+    (no_buildings, no_samples) samples from (baseline, rng, no_samples) - see
+    normal & uniform.  Buildings are run chunksize at a time with all of their
+    samples in one batch, so memory is bound by chunksize x no_samples.
+    Returns per-building percentiles with columns (output, percentile) &
+    percentiles of stock totals indexed by output.  Annual heat loss uses
+    monthly average temperatures.  The same seed & chunksize always give the
+    same samples.  Raises ZeroDivisionError if samples of total_floor_area or
+    building_volume are zero - set a positive minimum on their distributions.
+    """
+    _raise_for_invalid_distributions(distributions)
+    if validate:
+        pipeline.input_schema().validate(stock)
+    fab._raise_for_zero_floor_areas(stock["total_floor_area"])
+
+    rng = np.random.default_rng(seed)
+    no_rows = len(stock)
+    chunksize = chunksize or max(1, 2**20 // no_samples)
+    inputs = pipeline._to_arrays(stock)
+    output_columns = pipeline.OUTPUT_COLUMNS
+
+    building_percentiles = {
+        column: np.empty((no_rows, len(percentiles))) for column in output_columns
+    }
+    stock_totals = {column: np.zeros(no_samples) for column in STOCK_OUTPUT_COLUMNS}
+    for start in range(0, no_rows, chunksize):
+        chunk = slice(start, min(start + chunksize, no_rows))
+        # NOTE: (chunk, no_samples) samples are raveled so the 1D pipeline
+        # kernels run every sample of every building in one pass
+        columns = {
+            column: (
+                distributions[column](values[chunk], rng, no_samples).ravel()
+                if column in distributions
+                else np.repeat(values[chunk], no_samples)
+            )
+            for column, values in inputs.items()
+        }
+        _raise_for_zero_samples(columns, distributions)
+        outputs = arrays.calculate_heat_loss(
+            columns,
+            thermal_bridging_factor=thermal_bridging_factor,
+            ventilation_heat_loss_constant=ventilation_heat_loss_constant,
+        )
+        outputs["annual_heat_loss"] = arrays.calculate_heat_loss_per_year(
+            outputs["heat_loss_coefficient"],
+            internal_temperatures,
+            external_temperatures,
+        )
+        for column in output_columns:
+            samples = outputs[column].reshape(-1, no_samples)
+            building_percentiles[column][chunk] = np.percentile(
+                samples, percentiles, axis=1
+            ).T
+            if column in stock_totals:
+                stock_totals[column] += samples.sum(axis=0)
+
+    buildings = pd.concat(
+        {
+            column: pd.DataFrame(
+                building_percentiles[column],
+                index=stock.index,
+                columns=list(percentiles),
+            )
+            for column in output_columns
+        },
+        axis=1,
+    )
+    stock_percentiles = pd.DataFrame(
+        [np.percentile(stock_totals[c], percentiles) for c in STOCK_OUTPUT_COLUMNS],
+        index=STOCK_OUTPUT_COLUMNS,
+        columns=list(percentiles),
+    )
+    return Uncertainty(buildings=buildings, stock=stock_percentiles)
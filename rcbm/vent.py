@@ -1,30 +1,50 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import inspect
+from typing import Any
+from typing import Iterator
+from typing import Mapping
+
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_integer_dtype
 from pandas.api.types import is_numeric_dtype
 import pandera as pa
 from pandera.typing import Series
 
-STRUCTURE_TYPES = [
-    "unknown",
-    "masonry",
-    "timber_or_steel",
-    "concrete",
-]
-
-FLOOR_TYPES = ["none", "sealed", "unsealed"]
+from rcbm import arrays
+from rcbm import dtypes
+from rcbm import fab
+from rcbm import instrument
+from rcbm.arrays import FLOOR_TYPES
+from rcbm.arrays import STRUCTURE_TYPES
+from rcbm.arrays import VENTILATION_METHODS
 
-VENTILATION_METHODS = [
-    "positive_input_ventilation_from_loft",
-    "natural_ventilation",
-    "mechanical_ventilation_no_heat_recovery",
-    "mechanical_ventilation_heat_recovery",
-    "positive_input_ventilation_from_outside",
-]
+STRUCTURE_TYPE_DTYPE = pd.CategoricalDtype(STRUCTURE_TYPES)
+FLOOR_TYPE_DTYPE = pd.CategoricalDtype(FLOOR_TYPES)
+VENTILATION_METHOD_DTYPE = pd.CategoricalDtype(VENTILATION_METHODS)
 
 
 is_number = pa.Check(is_numeric_dtype, name="is_number")
 
 
+def is_category_of(categories: list) -> pa.Check:
+    # NOTE: accepts strings, pd.Categorical or integer codes into categories -
+    # categoricals are checked on their (few) categories rather than every row
+    def _is_category_of(series: pd.Series) -> pd.Series:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            is_valid_category = np.isin(series.cat.categories, categories)
+            # nulls have code -1 & are left to the schema's nullable check
+            is_valid = np.append(is_valid_category, True)[series.cat.codes]
+            return pd.Series(is_valid, index=series.index)
+        if is_integer_dtype(series.dtype):
+            return (series >= 0) & (series < len(categories))
+        return series.isin(categories)
+
+    return pa.Check(_is_category_of, name="is_category_of")
+
+
 def schema(name: str) -> pa.SeriesSchema:
     _schemas = {
         "no_openings": pa.SeriesSchema(
@@ -56,8 +76,7 @@ def schema(name: str) -> pa.SeriesSchema:
             nullable=False,
         ),
         "structure_type": pa.SeriesSchema(
-            str,
-            checks=pa.Check.isin(STRUCTURE_TYPES),
+            checks=is_category_of(STRUCTURE_TYPES),
             nullable=False,
         ),
         "infiltration_rate_due_to_structure_type": pa.SeriesSchema(
@@ -65,8 +84,7 @@ def schema(name: str) -> pa.SeriesSchema:
             nullable=False,
         ),
         "is_floor_suspended": pa.SeriesSchema(
-            str,
-            checks=pa.Check.isin(FLOOR_TYPES),
+            checks=is_category_of(FLOOR_TYPES),
             nullable=False,
         ),
         "infiltration_rate_due_to_suspended_floor": pa.SeriesSchema(
@@ -94,8 +112,7 @@ def schema(name: str) -> pa.SeriesSchema:
             nullable=False,
         ),
         "ventilation_method": pa.SeriesSchema(
-            str,
-            checks=pa.Check.isin(VENTILATION_METHODS),
+            checks=is_category_of(VENTILATION_METHODS),
             nullable=False,
         ),
         "infiltration_rate": pa.SeriesSchema(
@@ -114,7 +131,111 @@ def schema(name: str) -> pa.SeriesSchema:
     return _schemas[name]
 
 
-@pa.check_io(
+INPUT_COLUMNS = {
+    "building_volume": "building_volume",
+    "no_chimneys": "no_openings",
+    "no_open_flues": "no_openings",
+    "no_fans": "no_openings",
+    "no_room_heaters": "no_openings",
+    "is_draught_lobby": "is_draught_lobby",
+    "permeability_test_result": "permeability_test_result",
+    "no_storeys": "no_storeys",
+    "percentage_draught_stripped": "percentage_draught_stripped",
+    "is_floor_suspended": "is_floor_suspended",
+    "structure_type": "structure_type",
+    "no_sides_sheltered": "no_sides_sheltered",
+    "ventilation_method": "ventilation_method",
+    "heat_exchanger_efficiency": "heat_exchanger_efficiency",
+}
+
+
+def input_schema() -> pa.DataFrameSchema:
+    columns = {}
+    for column, name in INPUT_COLUMNS.items():
+        series_schema = schema(name)
+        columns[column] = pa.Column(
+            series_schema.dtype,
+            checks=series_schema.checks,
+            nullable=series_schema.nullable,
+        )
+    return pa.DataFrameSchema(columns)
+
+
+@instrument.instrumented
+def validate_inputs(stock: pd.DataFrame) -> pd.DataFrame:
+    with instrument.stage("vent.validate_inputs[validation]"):
+        return input_schema().validate(stock)
+
+
+def _get_codes(values: Series, categories: list) -> np.ndarray:
+    # NOTE: unknown values & nulls are coded as -1
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        if list(dtype.categories) == list(categories):
+            return codes
+        recoded = pd.Index(categories).get_indexer(dtype.categories)
+        return np.append(recoded, -1)[codes]
+    if is_integer_dtype(dtype):
+        return values.to_numpy()
+    return pd.Categorical(values, categories=categories).codes
+
+
+def _to_array(values: Series) -> np.ndarray:
+    return values.to_numpy(dtype=dtypes.get_float_dtype(), na_value=np.nan)
+
+
+_is_validating = ContextVar("is_validating", default=True)
+
+
+@contextmanager
+def trusted_inputs() -> Iterator[None]:
+    """Skip per-function schema checks for inputs that are already validated.
+
+    Validate the whole stock once via validate_inputs(stock) and then run the
+    calculations within this context.
+    """
+    token = _is_validating.set(False)
+    try:
+        yield
+    finally:
+        _is_validating.reset(token)
+
+
+def _check_io(**schemas):
+    def decorator(func):
+        checked_func = pa.check_io(**schemas)(func)
+        signature = inspect.signature(func)
+        input_schemas = {k: v for k, v in schemas.items() if k != "out"}
+        validation_stage = f"vent.{func.__name__}[validation]"
+
+        def _recorded_checked_func(*args, **kwargs):
+            # validate step by step so validation is recorded apart from func
+            with instrument.stage(validation_stage):
+                arguments = signature.bind(*args, **kwargs).arguments
+                for name, input_schema in input_schemas.items():
+                    input_schema.validate(arguments[name])
+            output = func(*args, **kwargs)
+            if "out" in schemas:
+                with instrument.stage(validation_stage):
+                    schemas["out"].validate(output)
+            return output
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _is_validating.get():
+                return func(*args, **kwargs)
+            if instrument.is_recording():
+                return _recorded_checked_func(*args, **kwargs)
+            return checked_func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@instrument.instrumented
+@_check_io(
     no_openings=schema("no_openings"),
     building_volume=schema("building_volume"),
     out=schema("infiltration_rate_due_to_opening"),
@@ -122,9 +243,20 @@ def schema(name: str) -> pa.SeriesSchema:
 def calculate_infiltration_rate_due_to_opening(
     no_openings: Series, building_volume: Series, ventilation_rate: int
 ) -> Series:
-    return no_openings * ventilation_rate / building_volume
+    index, inputs = fab._align(
+        {"no_openings": no_openings, "building_volume": building_volume}
+    )
+    return pd.Series(
+        arrays.calculate_infiltration_rate_due_to_opening(
+            _to_array(inputs["no_openings"]),
+            _to_array(inputs["building_volume"]),
+            ventilation_rate,
+        ),
+        index=index,
+    )
 
 
+@instrument.instrumented
 def calculate_infiltration_rate_due_to_chimneys(
     no_chimneys: Series, building_volume: Series, ventilation_rate: int = 40
 ) -> Series:
@@ -133,6 +265,7 @@ def calculate_infiltration_rate_due_to_chimneys(
     )
 
 
+@instrument.instrumented
 def calculate_infiltration_rate_due_to_open_flues(
     no_chimneys: Series, building_volume: Series, ventilation_rate: int = 20
 ) -> Series:
@@ -141,6 +274,7 @@ def calculate_infiltration_rate_due_to_open_flues(
     )
 
 
+@instrument.instrumented
 def calculate_infiltration_rate_due_to_fans(
     no_chimneys: Series, building_volume: Series, ventilation_rate: int = 10
 ) -> Series:
@@ -149,6 +283,7 @@ def calculate_infiltration_rate_due_to_fans(
     )
 
 
+@instrument.instrumented
 def calculate_infiltration_rate_due_to_room_heaters(
     no_chimneys: Series, building_volume: Series, ventilation_rate: int = 40
 ) -> Series:
@@ -157,16 +292,23 @@ def calculate_infiltration_rate_due_to_room_heaters(
     )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     is_draught_lobby=schema("is_draught_lobby"),
     out=schema("infiltration_rate_due_to_draught_lobby"),
 )
 def calculate_infiltration_rate_due_to_draught_lobby(
     is_draught_lobby: Series,
 ) -> Series:
-    return is_draught_lobby.map({True: 0, False: 0.05})
+    return pd.Series(
+        arrays.calculate_infiltration_rate_due_to_draught_lobby(
+            is_draught_lobby.to_numpy(dtype="bool")
+        ),
+        index=is_draught_lobby.index,
+    )
 
 
+@instrument.instrumented
 def calculate_infiltration_rate_due_to_openings(
     building_volume: Series,
     no_chimneys: Series,
@@ -186,52 +328,69 @@ def calculate_infiltration_rate_due_to_openings(
     )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     no_storeys=schema("no_storeys"),
     out=schema("infiltration_rate_due_to_height"),
 )
 def calculate_infiltration_rate_due_to_height(no_storeys: Series) -> Series:
-    return (no_storeys - 1) * 0.1
+    return pd.Series(
+        arrays.calculate_infiltration_rate_due_to_height(_to_array(no_storeys)),
+        index=no_storeys.index,
+    )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     structure_type=schema("structure_type"),
     out=schema("infiltration_rate_due_to_structure_type"),
 )
 def calculate_infiltration_rate_due_to_structure_type(
     structure_type: Series, unknown_structure_infiltration_rate: float = 0.35
 ) -> Series:
-    infiltration_rate_map = {
-        "unknown": unknown_structure_infiltration_rate,
-        "masonry": 0.35,
-        "timber_or_steel": 0.25,
-        "concrete": 0,
-    }
-    return structure_type.map(infiltration_rate_map)
+    return pd.Series(
+        arrays.calculate_infiltration_rate_due_to_structure_type(
+            _get_codes(structure_type, STRUCTURE_TYPES),
+            unknown_structure_infiltration_rate,
+        ),
+        index=structure_type.index,
+    )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     is_floor_suspended=schema("is_floor_suspended"),
     out=schema("infiltration_rate_due_to_suspended_floor"),
 )
 def calculate_infiltration_rate_due_to_suspended_floor(
     is_floor_suspended: Series,
 ) -> Series:
-    infiltration_rate_map = {"none": 0, "sealed": 0.1, "unsealed": 0.2}
-    return is_floor_suspended.map(infiltration_rate_map)
+    return pd.Series(
+        arrays.calculate_infiltration_rate_due_to_suspended_floor(
+            _get_codes(is_floor_suspended, FLOOR_TYPES)
+        ),
+        index=is_floor_suspended.index,
+    )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     percentage_draught_stripped=schema("percentage_draught_stripped"),
     out=schema("infiltration_rate_due_to_draught"),
 )
 def calculate_infiltration_rate_due_to_draught(
     percentage_draught_stripped: Series,
 ) -> Series:
-    return 0.25 - (0.2 * (percentage_draught_stripped / 100))
+    return pd.Series(
+        arrays.calculate_infiltration_rate_due_to_draught(
+            _to_array(percentage_draught_stripped)
+        ),
+        index=percentage_draught_stripped.index,
+    )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     permeability_test_result=schema("permeability_test_result"),
     out=schema("infiltration_rate_due_to_structure"),
 )
@@ -248,25 +407,33 @@ def calculate_infiltration_rate_due_to_structure(
         + calculate_infiltration_rate_due_to_suspended_floor(is_floor_suspended)
         + calculate_infiltration_rate_due_to_draught(percentage_draught_stripped)
     )
-    infiltration_rate_is_available = permeability_test_result.notna()
+    measured_infiltration_rate = _to_array(permeability_test_result)
     return pd.Series(
         np.where(
-            infiltration_rate_is_available,
-            permeability_test_result,
-            theoretical_infiltration_rate,
-        )
+            np.isnan(measured_infiltration_rate),
+            theoretical_infiltration_rate.to_numpy(),
+            measured_infiltration_rate,
+        ),
+        index=permeability_test_result.index,
     )
 
 
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     no_sides_sheltered=schema("no_sides_sheltered"),
 )
 def calculate_infiltration_rate_adjustment_factor(
     no_sides_sheltered: Series,
 ) -> Series:
-    return 1 - no_sides_sheltered * 0.075
+    return pd.Series(
+        arrays.calculate_infiltration_rate_adjustment_factor(
+            _to_array(no_sides_sheltered)
+        ),
+        index=no_sides_sheltered.index,
+    )
 
 
+@instrument.instrumented
 def calculate_infiltration_rate(
     no_sides_sheltered: Series,
     building_volume: Series,
@@ -306,43 +473,8 @@ def calculate_infiltration_rate(
     )
 
 
-def _calculate_natural_ventilation_air_rate_change(
-    infiltration_rate: Series,
-) -> Series:
-    return infiltration_rate.where(
-        infiltration_rate > 1, 0.5 + (infiltration_rate ** 2) * 0.5
-    )
-
-
-def _calculate_loft_ventilation_air_rate_change(
-    infiltration_rate: Series, building_volume: Series
-) -> Series:
-    return (
-        _calculate_natural_ventilation_air_rate_change(infiltration_rate)
-        + 20 / building_volume
-    )
-
-
-def _calculate_outside_ventilation_air_rate_change(
-    infiltration_rate: Series,
-) -> Series:
-    return np.maximum([0.5] * len(infiltration_rate), infiltration_rate + 0.25)
-
-
-def _calculate_mech_ventilation_air_rate_change(
-    infiltration_rate: Series,
-) -> Series:
-    return infiltration_rate + 0.5
-
-
-def _calculate_heat_recovery_ventilation_air_rate_change(
-    infiltration_rate: Series,
-    heat_exchanger_efficiency: Series,
-) -> Series:
-    return infiltration_rate + 0.5 * (1 - heat_exchanger_efficiency / 100)
-
-
-@pa.check_io(
+@instrument.instrumented
+@_check_io(
     ventilation_method=schema("ventilation_method"),
     building_volume=schema("building_volume"),
     infiltration_rate=schema("infiltration_rate"),
@@ -355,35 +487,195 @@ def calculate_effective_air_rate_change(
     infiltration_rate: Series,
     heat_exchanger_efficiency: Series,
 ) -> Series:
-    natural = _calculate_natural_ventilation_air_rate_change(
-        infiltration_rate[ventilation_method == "natural_ventilation"]
-    )
-    loft = _calculate_loft_ventilation_air_rate_change(
-        infiltration_rate[ventilation_method == "positive_input_ventilation_from_loft"],
-        building_volume[ventilation_method == "positive_input_ventilation_from_loft"],
+    index, inputs = fab._align(
+        {
+            "ventilation_method": ventilation_method,
+            "building_volume": building_volume,
+            "infiltration_rate": infiltration_rate,
+            "heat_exchanger_efficiency": heat_exchanger_efficiency,
+        }
     )
-    outside = _calculate_outside_ventilation_air_rate_change(
-        infiltration_rate[
-            ventilation_method == "positive_input_ventilation_from_outside"
-        ]
-    )
-    mechanical = _calculate_mech_ventilation_air_rate_change(
-        infiltration_rate[
-            ventilation_method == "mechanical_ventilation_no_heat_recovery"
-        ]
-    )
-    heat_recovery = _calculate_heat_recovery_ventilation_air_rate_change(
-        infiltration_rate[ventilation_method == "mechanical_ventilation_heat_recovery"],
-        heat_exchanger_efficiency[
-            ventilation_method == "mechanical_ventilation_heat_recovery"
-        ],
+    effective_air_rate_change = arrays.calculate_effective_air_rate_change(
+        ventilation_method=_get_codes(
+            inputs["ventilation_method"], VENTILATION_METHODS
+        ),
+        building_volume=_to_array(inputs["building_volume"]),
+        infiltration_rate=_to_array(inputs["infiltration_rate"]),
+        heat_exchanger_efficiency=_to_array(inputs["heat_exchanger_efficiency"]),
     )
-    return pd.concat([natural, loft, outside, mechanical, heat_recovery]).sort_index()
+    return pd.Series(effective_air_rate_change, index=index)
 
 
+@instrument.instrumented
 def calculate_ventilation_heat_loss_coefficient(
     building_volume: Series,
     effective_air_rate_change: Series,
     ventilation_heat_loss_constant: float = 0.33,  # SEAI, DEAP 4.2.0
 ) -> Series:
-    return building_volume * ventilation_heat_loss_constant * effective_air_rate_change
+    index, inputs = fab._align(
+        {
+            "building_volume": building_volume,
+            "effective_air_rate_change": effective_air_rate_change,
+        }
+    )
+    return pd.Series(
+        arrays.calculate_ventilation_heat_loss_coefficient(
+            _to_array(inputs["building_volume"]),
+            _to_array(inputs["effective_air_rate_change"]),
+            ventilation_heat_loss_constant,
+        ),
+        index=index,
+    )
+
+
+_INFILTRATION_RATE_COMPONENTS = {
+    "openings": (
+        calculate_infiltration_rate_due_to_openings,
+        [
+            "building_volume",
+            "no_chimneys",
+            "no_open_flues",
+            "no_fans",
+            "no_room_heaters",
+            "is_draught_lobby",
+        ],
+    ),
+    "height": (calculate_infiltration_rate_due_to_height, ["no_storeys"]),
+    "structure_type": (
+        calculate_infiltration_rate_due_to_structure_type,
+        ["structure_type"],
+    ),
+    "suspended_floor": (
+        calculate_infiltration_rate_due_to_suspended_floor,
+        ["is_floor_suspended"],
+    ),
+    "draught": (
+        calculate_infiltration_rate_due_to_draught,
+        ["percentage_draught_stripped"],
+    ),
+    "shelter_factor": (
+        calculate_infiltration_rate_adjustment_factor,
+        ["no_sides_sheltered"],
+    ),
+}
+
+
+def _get_scenario_input(
+    stock: pd.DataFrame, column: str, overrides: Mapping[str, Any]
+) -> Series:
+    if column not in overrides:
+        return stock[column]
+    value = overrides[column]
+    if callable(value):
+        value = value(stock[column])
+    return pd.Series(value, index=stock.index)
+
+
+def _raise_for_unknown_overrides(scenarios: Mapping[str, Mapping[str, Any]]) -> None:
+    unknown_columns = {
+        scenario: [c for c in overrides if c not in INPUT_COLUMNS]
+        for scenario, overrides in scenarios.items()
+        if not set(overrides).issubset(INPUT_COLUMNS)
+    }
+    if unknown_columns:
+        raise ValueError(
+            f"Scenarios override unknown columns {unknown_columns}"
+            f" - please choose from {list(INPUT_COLUMNS)}!"
+        )
+
+
+@instrument.instrumented
+def calculate_ventilation_upgrade_scenarios(
+    stock: pd.DataFrame,
+    scenarios: Mapping[str, Mapping[str, Any]],
+    ventilation_heat_loss_constant: float = 0.33,
+) -> pd.DataFrame:
+    """Effective air rate change & ventilation HLC under every scenario.
+
+    Each scenario maps input columns of the stock to overrides - a scalar, a
+    Series or a function of the baseline column, e.g. ``{"is_floor_suspended":
+    lambda s: s.replace("unsealed", "sealed")}``.  Infiltration components are
+    calculated once for the baseline & only the components that depend on an
+    overridden column are recalculated.  Overrides of columns that are not in
+    INPUT_COLUMNS raise a ValueError.  Returns an (N, 2 x S) frame with
+    columns (output, scenario).
+    """
+    _raise_for_unknown_overrides(scenarios)
+    dtype = dtypes.get_float_dtype()
+    no_scenarios = len(scenarios)
+    shape = (len(stock), no_scenarios)
+
+    def _stack(baseline: np.ndarray) -> np.ndarray:
+        return np.repeat(baseline[:, np.newaxis], no_scenarios, axis=1)
+
+    components = {}
+    for name, (func, columns) in _INFILTRATION_RATE_COMPONENTS.items():
+        baseline = func(**{c: stock[c] for c in columns}).to_numpy(dtype=dtype)
+        components[name] = _stack(baseline)
+        for scenario, overrides in enumerate(scenarios.values()):
+            if any(c in overrides for c in columns):
+                components[name][:, scenario] = func(
+                    **{c: _get_scenario_input(stock, c, overrides) for c in columns}
+                ).to_numpy(dtype=dtype)
+
+    def _convert(column: str, values: pd.Series) -> np.ndarray:
+        if _is_validating.get():
+            schema(INPUT_COLUMNS[column]).validate(values)
+        if column == "ventilation_method":
+            return _get_codes(values, VENTILATION_METHODS)
+        return values.to_numpy(dtype=dtype, na_value=np.nan)
+
+    inputs = {}
+    for column in (
+        "permeability_test_result",
+        "building_volume",
+        "heat_exchanger_efficiency",
+        "ventilation_method",
+    ):
+        inputs[column] = _stack(_convert(column, stock[column]))
+        for scenario, overrides in enumerate(scenarios.values()):
+            if column in overrides:
+                inputs[column][:, scenario] = _convert(
+                    column, _get_scenario_input(stock, column, overrides)
+                )
+
+    theoretical_infiltration_rate = (
+        components["height"]
+        + components["structure_type"]
+        + components["suspended_floor"]
+        + components["draught"]
+    )
+    infiltration_rate_due_to_structure = np.where(
+        np.isnan(inputs["permeability_test_result"]),
+        theoretical_infiltration_rate,
+        inputs["permeability_test_result"],
+    )
+    infiltration_rate = (
+        components["openings"] + infiltration_rate_due_to_structure
+    ) * components["shelter_factor"]
+
+    effective_air_rate_change = arrays.calculate_effective_air_rate_change(
+        ventilation_method=inputs["ventilation_method"].ravel(),
+        building_volume=inputs["building_volume"].ravel(),
+        infiltration_rate=infiltration_rate.ravel(),
+        heat_exchanger_efficiency=inputs["heat_exchanger_efficiency"].ravel(),
+    ).reshape(shape)
+    ventilation_heat_loss_coefficient = (
+        inputs["building_volume"]
+        * ventilation_heat_loss_constant
+        * effective_air_rate_change
+    )
+
+    return pd.concat(
+        {
+            "effective_air_rate_change": pd.DataFrame(
+                effective_air_rate_change, index=stock.index, columns=list(scenarios)
+            ),
+            "ventilation_heat_loss_coefficient": pd.DataFrame(
+                ventilation_heat_loss_coefficient,
+                index=stock.index,
+                columns=list(scenarios),
+            ),
+        },
+        axis=1,
+    )
@@ -0,0 +1,73 @@
+import os
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+
+Key = Tuple[str, int]
+
+
+def _raise_for_invalid_station(station: str) -> None:
+    if not station or os.sep in station or station.startswith("."):
+        raise ValueError(
+            f"Invalid station name {station!r}"
+            " - station names are used as directory names on disk!"
+        )
+
+
+class WeatherStore:
+    """Temperature profiles saved as memory-mapped NumPy arrays.
+
+    Profiles are keyed by (station, year) and stored at
+    ``<path>/<station>/<year>.npy`` so any number of processes can read the
+    same profile from the page cache without copying it.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+
+    def __repr__(self) -> str:
+        return f"WeatherStore({str(self.path)!r})"
+
+    def __getitem__(self, key: Key) -> np.ndarray:
+        station, year = key
+        return self.load(station, year)
+
+    def __contains__(self, key: Key) -> bool:
+        station, year = key
+        return self._get_filepath(station, year).exists()
+
+    def _get_filepath(self, station: str, year: int) -> Path:
+        _raise_for_invalid_station(station)
+        return self.path / station / f"{int(year)}.npy"
+
+    def save(self, station: str, year: int, temperatures: np.ndarray) -> None:
+        filepath = self._get_filepath(station, year)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first so readers never map a partial profile
+        tmp_filepath = filepath.with_name(f".{filepath.stem}.{os.getpid()}.npy")
+        np.save(tmp_filepath, np.ascontiguousarray(temperatures, dtype="float64"))
+        os.replace(tmp_filepath, filepath)
+
+    def load(self, station: str, year: int) -> np.ndarray:
+        filepath = self._get_filepath(station, year)
+        if not filepath.exists():
+            raise KeyError((station, year))
+        return np.load(filepath, mmap_mode="r")
+
+    def keys(self) -> List[Key]:
+        return sorted(
+            (filepath.parent.name, int(filepath.stem))
+            for filepath in self.path.glob("*/*.npy")
+            if not filepath.name.startswith(".")
+        )
+
+    def for_year(self, year: int) -> Dict[str, np.ndarray]:
+        return {
+            station: self.load(station, year)
+            for station, _year in self.keys()
+            if _year == year
+        }
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rcbm import pipeline
+
+
+@pytest.fixture
+def stock():
+    """Row 0 is equivalent to DEAP 4.2.0 example A"""
+    return pd.DataFrame(
+        {
+            "roof_area": [63, 50, 80],
+            "roof_uvalue": [0.11, 0.4, 2.3],
+            "wall_area": [85.7, 100, 120],
+            "wall_uvalue": [0.13, 0.55, 2.1],
+            "floor_area": [63, 50, 80],
+            "floor_uvalue": [0.14, 0.6, 0.8],
+            "window_area": [29.6, 20, 15],
+            "window_uvalue": [0.87, 2.8, 4.8],
+            "door_area": [1.85, 2, 2],
+            "door_uvalue": [1.5, 3, 3],
+            "total_floor_area": [126, 100, 160],
+            "building_volume": [321, 250, 400],
+            "no_chimneys": [0, 1, 2],
+            "no_open_flues": [0, 0, 1],
+            "no_fans": [1, 2, 0],
+            "no_room_heaters": [0, 0, 1],
+            "is_draught_lobby": [False, True, False],
+            "permeability_test_result": [0.15, np.nan, np.nan],
+            "no_storeys": [2, 2, 3],
+            "percentage_draught_stripped": [100, 50, 0],
+            "is_floor_suspended": ["none", "sealed", "unsealed"],
+            "structure_type": ["masonry", "timber_or_steel", "unknown"],
+            "no_sides_sheltered": [2, 1, 0],
+            "ventilation_method": [
+                "natural_ventilation",
+                "positive_input_ventilation_from_loft",
+                "mechanical_ventilation_heat_recovery",
+            ],
+            "heat_exchanger_efficiency": [np.nan, np.nan, 85],
+        },
+        index=[30, 10, 20],
+    )
+
+
+@pytest.fixture
+def synthetic_stock():
+    rng = np.random.default_rng(seed=42)
+    no_rows = 25
+    stock = pd.DataFrame(
+        {
+            column: rng.uniform(1, 100, no_rows)
+            for column in pipeline.FABRIC_COLUMNS
+            + ["total_floor_area", "building_volume"]
+        }
+    )
+    for column in ["no_chimneys", "no_open_flues", "no_fans", "no_room_heaters"]:
+        stock[column] = rng.integers(0, 3, no_rows)
+    stock["is_draught_lobby"] = rng.choice([True, False], no_rows)
+    stock["permeability_test_result"] = np.where(
+        rng.random(no_rows) > 0.8, rng.uniform(0.1, 1, no_rows), np.nan
+    )
+    stock["no_storeys"] = rng.integers(1, 4, no_rows)
+    stock["percentage_draught_stripped"] = rng.uniform(0, 100, no_rows)
+    stock["is_floor_suspended"] = rng.choice(["none", "sealed", "unsealed"], no_rows)
+    stock["structure_type"] = rng.choice(["masonry", "concrete"], no_rows)
+    stock["no_sides_sheltered"] = rng.integers(0, 4, no_rows)
+    stock["ventilation_method"] = rng.choice(
+        ["natural_ventilation", "mechanical_ventilation_heat_recovery"], no_rows
+    )
+    stock["heat_exchanger_efficiency"] = rng.uniform(50, 90, no_rows)
+    stock["ber_number"] = [f"ber{i}" for i in range(no_rows)]
+    stock["unused_column"] = "unused"
+    return stock
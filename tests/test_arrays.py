@@ -0,0 +1,202 @@
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+from numpy.testing import assert_array_equal
+import pandas as pd
+import pytest
+
+from rcbm import arrays
+from rcbm import fab
+from rcbm import htuse
+from rcbm import pipeline
+from rcbm import vent
+
+
+def test_encode():
+    values = np.array(["concrete", "brick", "unknown", "masonry"])
+    expected_output = np.array([3, -1, 0, 1])
+
+    output = arrays.encode(values, arrays.STRUCTURE_TYPES)
+
+    assert_array_equal(output, expected_output)
+
+
+@pytest.mark.parametrize("null", [None, np.nan])
+def test_encode_on_nulls(null):
+    values = np.array(["concrete", null, "brick"], dtype=object)
+    expected_output = np.array([3, -1, -1])
+
+    output = arrays.encode(values, arrays.STRUCTURE_TYPES)
+
+    assert_array_equal(output, expected_output)
+
+
+def test_calculate_infiltration_rate_due_to_structure_type_on_unknown_codes():
+    expected_output = np.array([0.25, np.nan])
+
+    output = arrays.calculate_infiltration_rate_due_to_structure_type(np.array([2, -1]))
+
+    assert_array_equal(output, expected_output)
+
+
+def test_calculate_effective_air_rate_change():
+    ventilation_method = np.array([0, 1, 1, 2, 3, 4, 4, -1])
+    building_volume = np.full(8, 200.0)
+    infiltration_rate = np.array([0.2, 0.2, 1.2, 0.2, 0.2, 0.2, 0.4, 0.2])
+    heat_exchanger_efficiency = np.array([np.nan] * 3 + [np.nan, 50] + [np.nan] * 3)
+    expected_output = np.array([0.62, 0.52, 1.2, 0.7, 0.45, 0.5, 0.65, np.nan])
+
+    output = arrays.calculate_effective_air_rate_change(
+        ventilation_method=ventilation_method,
+        building_volume=building_volume,
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=heat_exchanger_efficiency,
+    )
+
+    assert_array_almost_equal(output, expected_output)
+
+
+def test_calculate_heat_loss_parameter_raises_zerodivisionerror():
+    with pytest.raises(ZeroDivisionError):
+        arrays.calculate_heat_loss_parameter(
+            np.array([1.0]), np.array([1.0]), np.array([0.0])
+        )
+
+
+def test_calculate_heat_loss_kwh_by_outer_product():
+    delta_t = np.array([10.0, 5.0, 0.0])
+    hours = np.array([744, 672, 744])
+    heat_loss_coefficient = pd.Series([100, 200])
+    expected_per_period = np.array(
+        [[744.0, 336.0, 0.0], [1488.0, 672.0, 0.0]],
+    )
+
+    per_period = arrays._calculate_heat_loss_kwh_by_outer_product(
+        heat_loss_coefficient=heat_loss_coefficient,
+        delta_t=delta_t,
+        hours=hours,
+        per_period=True,
+    )
+    annual = arrays._calculate_heat_loss_kwh_by_outer_product(
+        heat_loss_coefficient=heat_loss_coefficient,
+        delta_t=delta_t,
+        hours=hours,
+    )
+
+    assert_array_almost_equal(per_period, expected_per_period)
+    assert_array_almost_equal(annual, expected_per_period.sum(axis=1))
+
+
+def test_calculate_heat_loss_per_year_raises_on_invalid_how():
+    with pytest.raises(ValueError):
+        arrays.calculate_heat_loss_per_year(np.array([1.0]), how="daily")
+
+
+def test_functions_match_pandas_functions(stock):
+    columns = {c: stock[c].to_numpy() for c in pipeline.INPUT_COLUMNS}
+    for column, categories in pipeline.CATEGORICAL_COLUMNS.items():
+        columns[column] = arrays.encode(columns[column], categories)
+    vent_columns = {c: columns[c] for c in vent.INPUT_COLUMNS}
+    infiltration_rate_columns = {
+        c: v
+        for c, v in vent_columns.items()
+        if c not in ("ventilation_method", "heat_exchanger_efficiency")
+    }
+    expected_infiltration_rate = vent.calculate_infiltration_rate(
+        **{c: stock[c] for c in infiltration_rate_columns}
+    )
+    expected_fabric_heat_loss_coefficient = fab.calculate_fabric_heat_loss_coefficient(
+        **{c: stock[c] for c in pipeline.FABRIC_COLUMNS}
+    )
+
+    infiltration_rate = arrays.calculate_infiltration_rate(**infiltration_rate_columns)
+    fabric_heat_loss_coefficient = arrays.calculate_fabric_heat_loss_coefficient(
+        **{c: columns[c] for c in pipeline.FABRIC_COLUMNS}
+    )
+    effective_air_rate_change = arrays.calculate_effective_air_rate_change(
+        ventilation_method=columns["ventilation_method"],
+        building_volume=columns["building_volume"],
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=columns["heat_exchanger_efficiency"],
+    )
+    ventilation_heat_loss_coefficient = (
+        arrays.calculate_ventilation_heat_loss_coefficient(
+            columns["building_volume"], effective_air_rate_change
+        )
+    )
+    heat_loss_parameter = arrays.calculate_heat_loss_parameter(
+        fabric_heat_loss_coefficient,
+        ventilation_heat_loss_coefficient,
+        columns["total_floor_area"],
+    )
+    annual_heat_loss = arrays.calculate_heat_loss_per_year(
+        fabric_heat_loss_coefficient + ventilation_heat_loss_coefficient
+    )
+
+    expected_output = pipeline.calculate_heat_loss(stock)
+    assert_array_almost_equal(infiltration_rate, expected_infiltration_rate)
+    assert_array_almost_equal(
+        fabric_heat_loss_coefficient, expected_fabric_heat_loss_coefficient
+    )
+    assert_array_almost_equal(
+        ventilation_heat_loss_coefficient,
+        expected_output["ventilation_heat_loss_coefficient"],
+    )
+    assert_array_almost_equal(
+        heat_loss_parameter, expected_output["heat_loss_parameter"]
+    )
+    assert_array_almost_equal(
+        annual_heat_loss.round(), expected_output["annual_heat_loss"]
+    )
+
+
+def test_calculate_heat_loss_matches_pipeline(stock):
+    expected_output = pipeline.calculate_heat_loss(stock, keep_intermediates=True)
+
+    output = arrays.calculate_heat_loss(
+        pipeline._to_arrays(stock), keep_intermediates=True
+    )
+
+    for column, values in output.items():
+        assert_array_equal(values, expected_output[column].to_numpy())
+
+
+def test_calculate_heat_loss_per_month_matches_htuse():
+    heat_loss_coefficient = np.array([121.0, 150.0])
+    expected_output = htuse.calculate_heat_loss_per_month(heat_loss_coefficient)
+
+    output = arrays.calculate_heat_loss_per_month(heat_loss_coefficient)
+
+    assert_array_equal(output, expected_output.to_numpy())
+
+
+def test_calculate_gain_utilisation_factor():
+    """Output matches ISO 13790:2008 12.2.1.1 either side of a gain/loss ratio of 1"""
+    heat_loss = np.array([[100.0, 100.0, 100.0, 0.0]])
+    heat_gain = np.array([[50.0, 100.0, 400.0, 10.0]])
+    time_constant = np.array([30.0])
+    a = 1 + 30 / 15
+    expected_output = np.array(
+        [
+            [
+                (1 - 0.5**a) / (1 - 0.5 ** (a + 1)),
+                a / (a + 1),
+                (1 - 4**a) / (1 - 4 ** (a + 1)),
+                0,
+            ]
+        ]
+    )
+
+    output = arrays.calculate_gain_utilisation_factor(
+        heat_loss, heat_gain, time_constant
+    )
+
+    assert_array_almost_equal(output, expected_output)
+
+
+def test_calculate_gain_utilisation_factor_on_very_large_gains():
+    output = arrays.calculate_gain_utilisation_factor(
+        np.array([[1e-6]]), np.array([[1e6]]), np.array([1e4])
+    )
+
+    assert np.isfinite(output).all()
+    assert_array_almost_equal(output * 1e6, [[1e-6]])
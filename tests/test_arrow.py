@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+import rcbm
+from rcbm import arrow
+from rcbm import pipeline
+
+
+@pytest.fixture
+def table(synthetic_stock):
+    return pa.Table.from_pandas(synthetic_stock, preserve_index=False)
+
+
+def test_calculate_heat_loss_matches_pipeline(synthetic_stock, table):
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock.set_index("ber_number"))
+
+    output = arrow.calculate_heat_loss(table, index_column="ber_number")
+
+    assert isinstance(output, pa.RecordBatch)
+    assert_frame_equal(
+        output.to_pandas().set_index("ber_number"), expected_output, check_exact=True
+    )
+
+
+def test_calculate_heat_loss_on_dictionary_encoded_inputs(synthetic_stock, table):
+    for column in pipeline.CATEGORICAL_COLUMNS:
+        i = table.schema.get_field_index(column)
+        table = table.set_column(i, column, pc.dictionary_encode(table.column(i)))
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    output = arrow.calculate_heat_loss(table)
+
+    assert_frame_equal(output.to_pandas(), expected_output, check_exact=True)
+
+
+def test_calculate_heat_loss_on_chunked_inputs(synthetic_stock, table):
+    chunked_table = pa.concat_tables([table.slice(0, 10), table.slice(10)])
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    output = arrow.calculate_heat_loss(chunked_table)
+
+    assert_frame_equal(output.to_pandas(), expected_output, check_exact=True)
+
+
+def test_numeric_columns_are_zero_copy(table):
+    column = table.column("building_volume")
+
+    values = arrow._get_floats(column, np.dtype("float64"))
+
+    assert values.ctypes.data == column.chunk(0).buffers()[1].address
+
+
+def test_calculate_heat_loss_on_renamed_columns(synthetic_stock, table):
+    table = table.rename_columns(
+        ["volume" if c == "building_volume" else c for c in table.column_names]
+    )
+    columns = {c: c for c in pipeline.INPUT_COLUMNS if c != "building_volume"}
+    columns["volume"] = "building_volume"
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    output = arrow.calculate_heat_loss(table, columns=columns)
+
+    assert_frame_equal(output.to_pandas(), expected_output, check_exact=True)
+
+
+@pytest.mark.parametrize(
+    "column, values",
+    [
+        ("ventilation_method", ["natural_ventilation", "brick"]),
+        ("structure_type", ["masonry", None]),
+        ("building_volume", [1.0, None]),
+        ("is_draught_lobby", ["yes", "no"]),
+        ("building_volume", [1.0, 0.0]),
+    ],
+)
+def test_calculate_heat_loss_on_invalid_inputs(synthetic_stock, column, values):
+    synthetic_stock = synthetic_stock.iloc[:2].copy()
+    synthetic_stock[column] = values
+
+    with pytest.raises(ValueError):
+        arrow.calculate_heat_loss(
+            pa.Table.from_pandas(synthetic_stock, preserve_index=False)
+        )
+
+
+def test_calculate_heat_loss_on_nan_floats(table):
+    wall_area = table.column("wall_area").to_numpy().copy()
+    wall_area[1] = np.nan
+    table = table.set_column(
+        table.schema.get_field_index("wall_area"),
+        "wall_area",
+        pa.array(wall_area, from_pandas=False),
+    )
+
+    with pytest.raises(ValueError):
+        arrow.calculate_heat_loss(table)
+
+
+def test_write_heat_loss(tmp_path, synthetic_stock, table):
+    input_path = tmp_path / "synthetic_stock.parquet"
+    output_path = tmp_path / "heat_loss.parquet"
+    pq.write_table(table, input_path)
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock.set_index("ber_number"))
+
+    arrow.write_heat_loss(
+        input_path, output_path, index_column="ber_number", batch_size=10
+    )
+
+    output = pd.read_parquet(output_path).set_index("ber_number")
+    assert_frame_equal(output, expected_output, check_exact=True)
+
+
+def test_iter_heat_loss_on_record_batch(synthetic_stock, table):
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    batches = list(
+        arrow.iter_heat_loss(table.combine_chunks().to_batches()[0], batch_size=10)
+    )
+
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+    output = pa.Table.from_batches(batches).to_pandas()
+    assert_frame_equal(output, expected_output, check_exact=True)
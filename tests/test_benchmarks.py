@@ -0,0 +1,37 @@
+from pandas.testing import assert_frame_equal
+
+from benchmarks import compare
+from benchmarks import suite
+from benchmarks.stock import make_stock
+from rcbm import pipeline
+
+
+def test_make_stock_is_valid():
+    stock = make_stock(1_000)
+
+    pipeline.input_schema().validate(stock)
+    assert len(stock) == 1_000
+
+
+def test_make_stock_is_reproducible():
+    assert_frame_equal(make_stock(100, seed=1), make_stock(100, seed=1))
+
+
+def test_run():
+    report = suite.run([100], repeat=1, names=["pipeline.calculate_heat_loss"])
+
+    [result] = report["results"]
+    assert result["rows"] == 100
+    assert result["seconds"] > 0
+    assert result["peak_memory_bytes"] > 0
+
+
+def test_compare_flags_regressions():
+    key = ("pipeline.calculate_heat_loss", 100)
+    base = {key: {"seconds": 1.0, "peak_memory_bytes": 100}}
+    new = {key: {"seconds": 1.5, "peak_memory_bytes": 100}}
+
+    comparisons = compare.compare(base, new, threshold=0.1)
+
+    is_regression = {c["metric"]: c["is_regression"] for c in comparisons}
+    assert is_regression == {"seconds": True, "peak_memory_bytes": False}
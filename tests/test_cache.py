@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from pandas.testing import assert_series_equal
+import pytest
+
+import rcbm
+from rcbm import cache
+from rcbm import dtypes
+from rcbm import fab
+from rcbm import htuse
+from rcbm import vent
+from rcbm import weather
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    return cache.ResultCache(tmp_path / "cache")
+
+
+def _count_calls(func):
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        return func(*args, **kwargs)
+
+    wrapper.calls = 0
+    return wrapper
+
+
+def test_hash_inputs_on_changed_buffers_and_indexes():
+    values = pd.Series([1.0, 2.0, 3.0])
+    key = cache.hash_inputs(values, thermal_bridging_factor=0.05)
+
+    assert key == cache.hash_inputs(values.copy(), thermal_bridging_factor=0.05)
+    assert key != cache.hash_inputs(values, thermal_bridging_factor=0.1)
+    assert key != cache.hash_inputs(values.set_axis([3, 2, 1]))
+    assert key != cache.hash_inputs(values.where(values < 3, 4.0))
+    assert key != cache.hash_inputs(values.to_numpy())
+
+
+def test_result_cache_returns_cached_results(result_cache, stock):
+    calculate_heat_loss = _count_calls(rcbm.calculate_heat_loss)
+    expected_output = rcbm.calculate_heat_loss(stock)
+
+    result_cache.call(calculate_heat_loss, stock)
+    output = result_cache.call(calculate_heat_loss, stock)
+
+    assert calculate_heat_loss.calls == 1
+    assert_frame_equal(output, expected_output)
+
+
+def test_result_cache_misses_on_changed_parameters(result_cache, stock):
+    calculate_heat_loss = _count_calls(rcbm.calculate_heat_loss)
+
+    result_cache.call(calculate_heat_loss, stock)
+    output = result_cache.call(
+        calculate_heat_loss, stock, ventilation_heat_loss_constant=0.5
+    )
+    result_cache.call(calculate_heat_loss, stock.assign(no_fans=0))
+
+    assert calculate_heat_loss.calls == 3
+    assert_frame_equal(
+        output, rcbm.calculate_heat_loss(stock, ventilation_heat_loss_constant=0.5)
+    )
+
+
+def test_result_cache_misses_on_changed_policies(result_cache, stock):
+    calculate_heat_loss = _count_calls(rcbm.calculate_heat_loss)
+
+    result_cache.call(calculate_heat_loss, stock)
+    with dtypes.float_dtype("float32"):
+        output = result_cache.call(calculate_heat_loss, stock)
+    with vent.trusted_inputs():
+        result_cache.call(calculate_heat_loss, stock)
+
+    assert calculate_heat_loss.calls == 3
+    assert (output.dtypes == "float32").all()
+
+
+def test_result_cache_misses_on_resaved_weather_profiles(result_cache, tmp_path):
+    store = weather.WeatherStore(tmp_path / "weather")
+    calculate = result_cache.cached(htuse.calculate_heat_loss_per_year)
+    kwargs = {
+        "heat_loss_coefficient": pd.Series([1.0, 2.0]),
+        "internal_temperatures": np.full(24, 20.0),
+        "external_temperatures": ("dublin", 2020),
+        "how": "hourly",
+        "weather_store": store,
+    }
+
+    store.save("dublin", 2020, np.full(24, 19.0))
+    calculate(**kwargs)
+    store.save("dublin", 2020, np.full(24, 18.0))
+    output = calculate(**kwargs)
+
+    assert len(result_cache) == 2
+    assert_series_equal(output, htuse.calculate_heat_loss_per_year(**kwargs))
+
+
+def test_result_cache_skips_inputs_without_content_hashes(result_cache):
+    class Factor:
+        value = 2.0
+
+    @_count_calls
+    def scale(values, factor):
+        return values * factor.value
+
+    result_cache.call(scale, pd.Series([1.0]), Factor())
+    result_cache.call(scale, pd.Series([1.0]), Factor())
+
+    assert scale.calls == 2
+    assert len(result_cache) == 0
+    with pytest.raises(cache.UnhashableInputError):
+        cache.hash_inputs(Factor())
+
+
+def test_result_cache_returns_cached_series(result_cache, stock):
+    inputs = {c: stock[c] for c in rcbm.pipeline.FABRIC_COLUMNS}
+    calculate = result_cache.cached(fab.calculate_fabric_heat_loss_coefficient)
+    expected_output = fab.calculate_fabric_heat_loss_coefficient(**inputs)
+
+    calculate(**inputs)
+    output = calculate(**inputs)
+
+    assert len(result_cache) == 1
+    assert_series_equal(output, expected_output)
+
+
+def test_result_cache_evicts_least_recently_used_results(tmp_path):
+    result_cache = cache.ResultCache(tmp_path / "cache")
+    result_cache.set("a", pd.Series(np.arange(10.0)))
+    # room for two results only
+    result_cache.max_bytes = 2.5 * result_cache._get_filepath("a").stat().st_size
+
+    result_cache.set("b", pd.Series(np.arange(10.0)))
+    result_cache.get("a")
+    result_cache.set("c", pd.Series(np.arange(10.0)))
+
+    assert result_cache.get("a") is not None
+    assert result_cache.get("b") is None
+    assert result_cache.get("c") is not None
@@ -0,0 +1,115 @@
+import numpy as np
+from numpy.testing import assert_allclose
+import pandas as pd
+import pytest
+
+import rcbm
+from rcbm import dtypes
+from rcbm import fab
+from rcbm import htuse
+from rcbm import vent
+
+# float32 results of DEAP 4.2.0 example A are within this of float64
+RTOL = 1e-6
+
+
+def test_float_dtype_sets_and_resets_policy():
+    assert dtypes.get_float_dtype() == np.dtype("float64")
+    with dtypes.float_dtype("float32"):
+        assert dtypes.get_float_dtype() == np.dtype("float32")
+        assert dtypes.get_float_dtype("float64") == np.dtype("float64")
+    assert dtypes.get_float_dtype() == np.dtype("float64")
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int64"])
+def test_float_dtype_raises_on_invalid_dtypes(dtype):
+    with pytest.raises(ValueError):
+        with dtypes.float_dtype(dtype):
+            pass
+
+
+def test_calculate_heat_loss_on_float32_is_within_error_bound(stock):
+    """Row 0 is equivalent to DEAP 4.2.0 example A"""
+    expected_output = rcbm.calculate_heat_loss(stock)
+
+    output = rcbm.calculate_heat_loss(stock, dtype="float32")
+
+    assert (output.dtypes == "float32").all()
+    assert_allclose(output, expected_output, rtol=RTOL)
+
+
+def test_calculate_heat_loss_on_compact_stock_is_within_error_bound(
+    stock,
+):
+    expected_output = rcbm.calculate_heat_loss(stock)
+
+    with dtypes.float_dtype("float32"):
+        output = rcbm.calculate_heat_loss(rcbm.pipeline.compact(stock))
+
+    assert (output.dtypes == "float32").all()
+    assert_allclose(output, expected_output, rtol=RTOL)
+
+
+def test_fab_and_vent_on_float32_are_within_error_bound(stock):
+    areas = pd.DataFrame(
+        {c: stock[f"{c}_area"] for c in fab.FABRIC_COMPONENTS}, index=stock.index
+    )
+    uvalues = pd.DataFrame(
+        {c: stock[f"{c}_uvalue"] for c in fab.FABRIC_COMPONENTS}, index=stock.index
+    )
+    infiltration_rate = pd.Series([0.2, 0.8, 1.5], index=stock.index)
+
+    def _calculate():
+        return (
+            fab.calculate_fabric_heat_loss_coefficient_from_components(areas, uvalues),
+            vent.calculate_effective_air_rate_change(
+                ventilation_method=stock["ventilation_method"],
+                building_volume=stock["building_volume"],
+                infiltration_rate=infiltration_rate,
+                heat_exchanger_efficiency=stock["heat_exchanger_efficiency"],
+            ),
+            vent.calculate_infiltration_rate_due_to_structure(
+                permeability_test_result=stock["permeability_test_result"],
+                no_storeys=stock["no_storeys"],
+                percentage_draught_stripped=stock["percentage_draught_stripped"],
+                is_floor_suspended=stock["is_floor_suspended"],
+                structure_type=stock["structure_type"],
+            ),
+            vent.calculate_infiltration_rate(
+                **{
+                    c: stock[c]
+                    for c in vent.INPUT_COLUMNS
+                    if c not in ("ventilation_method", "heat_exchanger_efficiency")
+                }
+            ),
+        )
+
+    expected_outputs = _calculate()
+    with dtypes.float_dtype("float32"):
+        outputs = _calculate()
+
+    for output, expected_output in zip(outputs, expected_outputs):
+        assert output.dtype == "float32"
+        assert_allclose(output, expected_output, rtol=RTOL)
+
+
+def test_heat_loss_per_year_on_float32_hourly_temperatures_is_within_error_bound():
+    heat_loss_coefficient = pd.Series([121.0, 150.0])
+    rng = np.random.default_rng(42)
+    internal_temperatures = np.full(8760, 20.0)
+    external_temperatures = rng.normal(8, 5, size=(2, 8760))
+
+    def _calculate():
+        return htuse.calculate_heat_loss_per_year(
+            heat_loss_coefficient,
+            internal_temperatures,
+            external_temperatures,
+            how="hourly",
+        )
+
+    expected_output = _calculate()
+    with dtypes.float_dtype("float32"):
+        output = _calculate()
+
+    assert output.dtype == "float32"
+    assert_allclose(output, expected_output, rtol=RTOL)
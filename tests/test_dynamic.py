@@ -0,0 +1,107 @@
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+import pandas as pd
+from pandas.testing import assert_series_equal
+import pytest
+
+from rcbm import dynamic
+
+
+def test_calculate_thermal_capacitance():
+    total_floor_area = pd.Series([100, 50])
+    expected_output = pd.Series([16_500_000, 8_250_000])
+
+    output = dynamic.calculate_thermal_capacitance(total_floor_area, "medium")
+
+    assert_series_equal(output, expected_output)
+
+
+def test_calculate_heating_demand_per_year_reaches_steady_state():
+    fabric_heat_loss_coefficient = pd.Series([68.0, 150.0])
+    ventilation_heat_loss_coefficient = pd.Series([53.0, 80.0])
+    total_floor_area = pd.Series([100.0, 120.0])
+    thermal_capacitance = dynamic.calculate_thermal_capacitance(total_floor_area)
+    h_tr_is = 3.45 * 4.5 * total_floor_area
+    steady_state_heat_loss_coefficient = ventilation_heat_loss_coefficient + 1 / (
+        1 / h_tr_is + 1 / fabric_heat_loss_coefficient
+    )
+    expected_output = steady_state_heat_loss_coefficient * (20 - 5) / 1000
+
+    output = dynamic.simulate(
+        fabric_heat_loss_coefficient=fabric_heat_loss_coefficient,
+        ventilation_heat_loss_coefficient=ventilation_heat_loss_coefficient,
+        thermal_capacitance=thermal_capacitance,
+        total_floor_area=total_floor_area,
+        external_temperatures=np.full(1000, 5.0),
+        heating_setpoint=20.0,
+        initial_mass_temperature=20.0,
+    )
+
+    assert output.heating_power.shape == (2, 1000)
+    assert_array_almost_equal(output.air_temperature[:, -1], [20, 20])
+    assert_array_almost_equal(
+        output.heating_power[:, -1] / 1000, expected_output.to_numpy()
+    )
+
+
+def test_calculate_heating_demand_per_year_matches_building_by_building():
+    rng = np.random.default_rng(seed=42)
+    no_buildings = 5
+    fabric_heat_loss_coefficient = pd.Series(rng.uniform(50, 200, no_buildings))
+    ventilation_heat_loss_coefficient = pd.Series(rng.uniform(30, 100, no_buildings))
+    total_floor_area = pd.Series(rng.uniform(60, 200, no_buildings))
+    thermal_capacitance = dynamic.calculate_thermal_capacitance(total_floor_area)
+    external_temperatures = rng.uniform(-5, 25, 168)
+    internal_gains = rng.uniform(0, 500, (no_buildings, 168))
+
+    output = dynamic.calculate_heating_demand_per_year(
+        fabric_heat_loss_coefficient=fabric_heat_loss_coefficient,
+        ventilation_heat_loss_coefficient=ventilation_heat_loss_coefficient,
+        thermal_capacitance=thermal_capacitance,
+        total_floor_area=total_floor_area,
+        external_temperatures=external_temperatures,
+        internal_gains=internal_gains,
+        max_heating_power=5000,
+    )
+    expected_output = pd.concat(
+        [
+            dynamic.calculate_heating_demand_per_year(
+                fabric_heat_loss_coefficient=fabric_heat_loss_coefficient[[i]],
+                ventilation_heat_loss_coefficient=ventilation_heat_loss_coefficient[
+                    [i]
+                ],
+                thermal_capacitance=thermal_capacitance[[i]],
+                total_floor_area=total_floor_area[[i]],
+                external_temperatures=external_temperatures,
+                internal_gains=internal_gains[[i]],
+                max_heating_power=5000,
+            )
+            for i in range(no_buildings)
+        ]
+    )
+
+    assert_series_equal(output, expected_output)
+    assert (output > 0).all()
+
+
+def test_calculate_heating_demand_per_year_is_zero_when_warm_outside():
+    output = dynamic.calculate_heating_demand_per_year(
+        fabric_heat_loss_coefficient=pd.Series([68.0]),
+        ventilation_heat_loss_coefficient=pd.Series([53.0]),
+        thermal_capacitance=pd.Series([16_500_000.0]),
+        total_floor_area=pd.Series([100.0]),
+        external_temperatures=np.full(24, 25.0),
+    )
+
+    assert_series_equal(output, pd.Series([0.0]))
+
+
+def test_calculate_heating_demand_per_year_raises_on_invalid_fabric():
+    with pytest.raises(ValueError):
+        dynamic.calculate_heating_demand_per_year(
+            fabric_heat_loss_coefficient=pd.Series([0.0]),
+            ventilation_heat_loss_coefficient=pd.Series([53.0]),
+            thermal_capacitance=pd.Series([16_500_000.0]),
+            total_floor_area=pd.Series([100.0]),
+            external_temperatures=np.full(24, 5.0),
+        )
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from pandas.testing import assert_frame_equal
 from pandas.testing import assert_series_equal
 import pytest
 
@@ -56,6 +57,33 @@ def test_calculate_heat_loss_parameter():
     assert_series_equal(output.round(2), expected_output)
 
 
+def test_calculate_heat_loss_parameter_aligns_inputs_on_index():
+    fabric_heat_loss_coefficient = pd.Series([10, 20], index=[1, 2])
+    ventilation_heat_loss_coefficient = pd.Series([20, 10], index=[2, 1])
+    total_floor_area = pd.Series([1, 2], index=[1, 2])
+    expected_output = pd.Series([20.0, 20.0], index=[1, 2])
+
+    output = fab.calculate_heat_loss_parameter(
+        fabric_heat_loss_coefficient=fabric_heat_loss_coefficient,
+        ventilation_heat_loss_coefficient=ventilation_heat_loss_coefficient,
+        total_floor_area=total_floor_area,
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_calculate_fabric_component_heat_loss_coefficient_aligns_inputs_on_index():
+    component_area = pd.Series([10, 20], index=["b", "a"])
+    component_uvalue = pd.Series([1.0, 2.0, 3.0], index=["a", "b", "c"])
+    expected_output = pd.Series([20 * 1.05, 10 * 2.05, np.nan], index=["a", "b", "c"])
+
+    output = fab.calculate_fabric_component_heat_loss_coefficient(
+        component_area, component_uvalue
+    )
+
+    assert_series_equal(output, expected_output)
+
+
 @pytest.mark.parametrize("floor_area", [pd.Series([np.nan]), pd.Series([0])])
 def test_calculate_heat_loss_parameter_raises_zerodivisionerror(floor_area):
     empty_series = pd.Series([np.nan])
@@ -65,3 +93,189 @@ def test_calculate_heat_loss_parameter_raises_zerodivisionerror(floor_area):
             ventilation_heat_loss_coefficient=empty_series,
             total_floor_area=floor_area,
         )
+
+
+def test_calculate_fabric_heat_loss_coefficient_from_components():
+    """Output is equivalent to DEAP 4.2.0 example A"""
+    component_areas = pd.DataFrame(
+        [[63, 85.7, 63, 29.6, 1.85], [63, 85.7, 63, 29.6, 0]],
+        columns=fab.FABRIC_COMPONENTS,
+        index=["a", "b"],
+    )
+    component_uvalues = pd.DataFrame(
+        [[0.11, 0.13, 0.14, 0.87, 1.5], [0.11, 0.13, 0.14, 0.87, 0]],
+        columns=fab.FABRIC_COMPONENTS,
+        index=["a", "b"],
+    )
+    expected_output = pd.Series([68, 65], index=["a", "b"], dtype="int64")
+
+    output = fab.calculate_fabric_heat_loss_coefficient_from_components(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+    )
+
+    assert_series_equal(output.round().astype("int64"), expected_output)
+
+
+def test_calculate_fabric_heat_loss_coefficient_from_components_on_factors():
+    component_areas = np.array([[10.0, 20.0], [30.0, 40.0]])
+    component_uvalues = np.array([[1.0, 2.0], [0.5, 0.25]])
+    thermal_bridging_factor = np.array([0.1, 0.0])
+    expected_output = pd.Series([51.0, 28.0])
+
+    output = fab.calculate_fabric_heat_loss_coefficient_from_components(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+        thermal_bridging_factor=thermal_bridging_factor,
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_calculate_fabric_heat_loss_coefficient_from_component_table():
+    components = pd.DataFrame(
+        {
+            "building_id": ["b", "a", "a", "b", "a"],
+            "area": [10.0, 20.0, 5.0, 30.0, 2.0],
+            "uvalue": [1.0, 0.5, 2.0, 0.2, 3.0],
+            "thermal_bridging_factor": [0.1, 0.0, 0.1, 0.0, 0.0],
+        }
+    )
+    expected_output = pd.Series(
+        [26.5, 17.0], index=pd.Index(["a", "b"], name="building_id")
+    )
+
+    output = fab.calculate_fabric_heat_loss_coefficient_from_component_table(
+        components, thermal_bridging_factor="thermal_bridging_factor"
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_calculate_fabric_upgrade_heat_loss_coefficients():
+    component_areas = pd.DataFrame(
+        {"wall": [100.0, 80.0], "roof": [50.0, 40.0], "window": [20.0, 10.0]}
+    )
+    component_uvalues = pd.DataFrame(
+        {"wall": [2.1, 0.2], "roof": [0.4, 2.3], "window": [4.8, 1.4]}
+    )
+    scenarios = {
+        "wall_insulation": {"wall": 0.35},
+        "deep_retrofit": {"wall": 0.35, "roof": 0.16, "window": 1.4},
+    }
+    upgraded_uvalues = {
+        scenario: component_uvalues.assign(
+            **{c: component_uvalues[c].clip(upper=u) for c, u in upgrades.items()}
+        )
+        for scenario, upgrades in scenarios.items()
+    }
+    expected_output = pd.DataFrame(
+        {
+            scenario: fab.calculate_fabric_heat_loss_coefficient_from_components(
+                component_areas, uvalues
+            )
+            for scenario, uvalues in upgraded_uvalues.items()
+        }
+    )
+
+    output = fab.calculate_fabric_upgrade_heat_loss_coefficients(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+        scenarios=scenarios,
+    )
+
+    assert_frame_equal(output, expected_output)
+    assert output.loc[1, "wall_insulation"] == pytest.approx(
+        fab.calculate_fabric_heat_loss_coefficient_from_components(
+            component_areas, component_uvalues
+        )[1]
+    )
+
+
+def test_calculate_fabric_upgrade_heat_loss_coefficients_on_worse_uvalues():
+    component_areas = pd.DataFrame({"wall": [100.0, 80.0]})
+    component_uvalues = pd.DataFrame({"wall": [2.1, 0.2]})
+    upgraded_uvalues = pd.DataFrame({"wall": [0.35, 0.35]})
+    expected_output = fab.calculate_fabric_heat_loss_coefficient_from_components(
+        component_areas, upgraded_uvalues
+    ).to_frame("wall_insulation")
+
+    output = fab.calculate_fabric_upgrade_heat_loss_coefficients(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+        scenarios={"wall_insulation": {"wall": 0.35}},
+        only_improve=False,
+    )
+
+    assert_frame_equal(output, expected_output)
+
+
+def test_calculate_fabric_heat_loss_coefficient_from_components_on_shuffled_labels():
+    component_areas = pd.DataFrame(
+        {"wall": [100.0, 80.0], "window": [20.0, 10.0]}, index=["a", "b"]
+    )
+    component_uvalues = pd.DataFrame(
+        {"window": [2.0, 1.0], "wall": [0.5, 0.2]}, index=["b", "a"]
+    )
+    thermal_bridging_factor = pd.Series({"window": 0.1, "wall": 0.0})
+    expected_output = pd.Series(
+        [100 * 0.2 + 20 * 1.1, 80 * 0.5 + 10 * 2.1], index=["a", "b"]
+    )
+
+    output = fab.calculate_fabric_heat_loss_coefficient_from_components(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+        thermal_bridging_factor=thermal_bridging_factor,
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_calculate_fabric_heat_loss_coefficient_from_components_on_unequal_labels():
+    component_areas = pd.DataFrame({"wall": [100.0], "window": [20.0]})
+    component_uvalues = pd.DataFrame({"wall": [0.5], "door": [2.0]})
+
+    with pytest.raises(ValueError):
+        fab.calculate_fabric_heat_loss_coefficient_from_components(
+            component_areas=component_areas, component_uvalues=component_uvalues
+        )
+
+
+def test_calculate_fabric_upgrade_heat_loss_coefficients_on_shuffled_labels():
+    component_areas = pd.DataFrame(
+        {"wall": [100.0, 80.0], "window": [20.0, 10.0]}, index=["a", "b"]
+    )
+    component_uvalues = pd.DataFrame(
+        {"window": [2.0, 1.0], "wall": [0.5, 0.2]}, index=["b", "a"]
+    )
+    scenarios = {
+        "wall_insulation": {"wall": pd.Series({"b": 0.35, "a": 0.15})},
+        "window_upgrade": {"window": 0.8},
+    }
+    expected_output = pd.DataFrame(
+        {
+            "wall_insulation": [100 * 0.2 + 20 * 1.05, 80 * 0.4 + 10 * 2.05],
+            "window_upgrade": [100 * 0.25 + 20 * 0.85, 80 * 0.55 + 10 * 0.85],
+        },
+        index=["a", "b"],
+    )
+
+    output = fab.calculate_fabric_upgrade_heat_loss_coefficients(
+        component_areas=component_areas,
+        component_uvalues=component_uvalues,
+        scenarios=scenarios,
+    )
+
+    assert_frame_equal(output, expected_output)
+
+
+def test_calculate_heat_loss_parameter_on_arrays():
+    expected_output = pd.Series([1.0, 2.0])
+
+    output = fab.calculate_heat_loss_parameter(
+        fabric_heat_loss_coefficient=np.array([0.5, 1.0]),
+        ventilation_heat_loss_coefficient=np.array([0.5, 1.0]),
+        total_floor_area=np.array([1.0, 1.0]),
+    )
+
+    assert_series_equal(output, expected_output)
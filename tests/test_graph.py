@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_series_equal
+import pytest
+
+import rcbm
+from rcbm import graph
+
+
+@pytest.fixture
+def stock():
+    return pd.DataFrame(
+        {
+            "roof_area": [63, 50],
+            "roof_uvalue": [0.11, 0.4],
+            "wall_area": [85.7, 100],
+            "wall_uvalue": [0.13, 0.55],
+            "floor_area": [63, 50],
+            "floor_uvalue": [0.14, 0.6],
+            "window_area": [29.6, 20],
+            "window_uvalue": [0.87, 2.8],
+            "door_area": [1.85, 2],
+            "door_uvalue": [1.5, 3],
+            "total_floor_area": [126, 100],
+            "building_volume": [321, 250],
+            "no_chimneys": [0, 1],
+            "no_open_flues": [0, 0],
+            "no_fans": [1, 2],
+            "no_room_heaters": [0, 0],
+            "is_draught_lobby": [False, True],
+            "permeability_test_result": [0.15, np.nan],
+            "no_storeys": [2, 2],
+            "percentage_draught_stripped": [100, 50],
+            "is_floor_suspended": ["none", "sealed"],
+            "structure_type": ["masonry", "timber_or_steel"],
+            "no_sides_sheltered": [2, 1],
+            "ventilation_method": [
+                "natural_ventilation",
+                "positive_input_ventilation_from_loft",
+            ],
+            "heat_exchanger_efficiency": [np.nan, np.nan],
+        },
+        index=[7, 3],
+    )
+
+
+def test_building_stock_model_matches_pipeline(stock):
+    expected_output = rcbm.calculate_heat_loss(stock)
+    model = graph.BuildingStockModel(stock)
+
+    output = model.compute(*expected_output.columns)
+
+    pd.testing.assert_frame_equal(output, expected_output)
+
+
+def test_building_stock_model_only_evaluates_requested_nodes(stock):
+    model = graph.BuildingStockModel(stock)
+
+    model["fabric_heat_loss_coefficient"]
+
+    assert model.cached == {"fabric_heat_loss_coefficient"}
+
+
+def test_building_stock_model_invalidates_downstream_nodes(stock):
+    model = graph.BuildingStockModel(stock)
+    model["heat_loss_parameter"]
+
+    model["wall_uvalue"] = stock["wall_uvalue"] * 2
+
+    assert "infiltration_rate" in model.cached
+    assert "ventilation_heat_loss_coefficient" in model.cached
+    assert "fabric_heat_loss_coefficient" not in model.cached
+    assert "heat_loss_parameter" not in model.cached
+    assert_series_equal(
+        model["heat_loss_parameter"],
+        rcbm.calculate_heat_loss(stock.assign(wall_uvalue=stock["wall_uvalue"] * 2))[
+            "heat_loss_parameter"
+        ],
+        check_names=False,
+    )
+
+
+def test_building_stock_model_invalidates_on_parameter_change(stock):
+    model = graph.BuildingStockModel(stock, thermal_bridging_factor=0.05)
+    before = model["fabric_heat_loss_coefficient"]
+
+    model.set_parameter("thermal_bridging_factor", 0.15)
+
+    assert "fabric_heat_loss_coefficient" not in model.cached
+    assert (model["fabric_heat_loss_coefficient"] > before).all()
+
+
+def test_building_stock_model_raises_on_unknown_nodes(stock):
+    model = graph.BuildingStockModel(stock.drop(columns="wall_area"))
+    with pytest.raises(KeyError):
+        model["fabric_heat_loss_coefficient"]
+    with pytest.raises(KeyError):
+        model["heat_loss_coefficient"] = stock["wall_area"]
@@ -1,6 +1,7 @@
 import numpy as np
 from numpy.testing import assert_array_almost_equal
 import pandas as pd
+from pandas.testing import assert_frame_equal
 from pandas.testing import assert_series_equal
 import pytest
 
@@ -151,3 +152,226 @@ def test_heat_loss_per_year():
     )
 
     assert_series_equal(output, expected_output)
+
+
+def test_heat_loss_per_year_on_hourly_temperatures():
+    internal_temperatures = np.full(8760, 20.0)
+    external_temperatures = np.tile([10.0, 25.0], 4380)
+    heat_loss_coefficient = pd.Series([100, 200], index=["a", "b"])
+    expected_output = pd.Series([4380.0, 8760.0], index=["a", "b"])
+
+    output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=internal_temperatures,
+        external_temperatures=external_temperatures,
+        how="hourly",
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_heat_loss_per_year_on_hourly_temperatures_per_building_in_blocks():
+    rng = np.random.default_rng(seed=42)
+    internal_temperatures = np.full(8760, 20.0)
+    external_temperatures = rng.uniform(-5, 25, size=8760)
+    heat_loss_coefficient = pd.Series(rng.uniform(50, 300, size=25))
+    expected_output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=internal_temperatures,
+        external_temperatures=external_temperatures,
+        how="hourly",
+    )
+
+    output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=np.tile(internal_temperatures, (25, 1)),
+        external_temperatures=external_temperatures,
+        how="hourly",
+        block_size=4,
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_heat_loss_per_year_on_hourly_temperatures_raises_on_mismatched_rows():
+    with pytest.raises(ValueError):
+        htuse.calculate_heat_loss_per_year(
+            heat_loss_coefficient=pd.Series([100, 200]),
+            internal_temperatures=np.full((3, 8760), 20.0),
+            external_temperatures=np.full(8760, 10.0),
+            how="hourly",
+        )
+
+
+def test_heat_loss_per_year_on_hourly_temperatures_raises_without_temperatures():
+    with pytest.raises(ValueError, match="Hourly mode"):
+        htuse.calculate_heat_loss_per_year(
+            heat_loss_coefficient=pd.Series([100, 200]),
+            internal_temperatures=None,
+            external_temperatures=np.full(8760, 10.0),
+            how="hourly",
+        )
+
+
+def test_iter_heat_loss_per_hour():
+    internal_temperatures = np.full(8760, 20.0)
+    external_temperatures = np.tile([10.0, 25.0], 4380)
+    heat_loss_coefficient = pd.Series([100, 200, 300])
+
+    blocks = list(
+        htuse.iter_heat_loss_per_hour(
+            heat_loss_coefficient=heat_loss_coefficient,
+            internal_temperatures=internal_temperatures,
+            external_temperatures=external_temperatures,
+            block_size=2,
+        )
+    )
+    output = pd.concat(blocks)
+
+    assert [len(b) for b in blocks] == [2, 1]
+    assert output.shape == (3, 8760)
+    assert_array_almost_equal(output[0], [1, 2, 3])
+    assert_array_almost_equal(output[1], [0, 0, 0])
+
+
+def test_calculate_heat_loss_per_month():
+    heat_loss_coefficient = pd.Series([121, 150], index=["a", "b"])
+
+    output = htuse.calculate_heat_loss_per_month(heat_loss_coefficient)
+
+    assert output.shape == (2, 12)
+    assert list(output.columns) == htuse.MONTHS
+    assert (output[["jun", "jul", "aug", "sep"]] == 0).all().all()
+    assert_series_equal(
+        output.sum(axis=1).round(),
+        htuse.calculate_heat_loss_per_year(heat_loss_coefficient, None, None),
+    )
+
+
+def test_heat_loss_per_year_by_climate_zone():
+    heat_loss_coefficient = pd.Series([100, 200, 300, 400], index=[10, 11, 12, 13])
+    climate_zone = pd.Series(["cork", "dublin", "cork", "dublin"])
+    external_temperatures = {
+        "dublin": np.full(8760, 10.0),
+        "cork": np.full(8760, 15.0),
+    }
+    expected_output = pd.Series(
+        [4380.0, 17520.0, 13140.0, 35040.0], index=[10, 11, 12, 13]
+    )
+
+    output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=np.full(8760, 20.0),
+        external_temperatures=external_temperatures,
+        how="hourly",
+        climate_zone=climate_zone,
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_heat_loss_per_year_by_climate_zone_matches_monthly_without_zones():
+    heat_loss_coefficient = pd.Series([121, 150, 90])
+
+    output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=None,
+        external_temperatures=None,
+        climate_zone=["dublin", "dublin", "dublin"],
+    )
+
+    assert_series_equal(
+        output,
+        htuse.calculate_heat_loss_per_year(heat_loss_coefficient, None, None),
+    )
+
+
+def test_heat_loss_per_year_by_climate_zone_raises_on_missing_zones():
+    with pytest.raises(ValueError):
+        htuse.calculate_heat_loss_per_year(
+            heat_loss_coefficient=pd.Series([121, 150]),
+            internal_temperatures=None,
+            external_temperatures={"dublin": None},
+            climate_zone=["dublin", None],
+        )
+
+
+def test_calculate_space_heating_demand_per_month_without_gains():
+    heat_loss_coefficient = pd.Series([121, 150], index=["a", "b"])
+    thermal_capacitance = pd.Series([165_000 * 100, 165_000 * 120], index=["a", "b"])
+    expected_output = htuse.calculate_heat_loss_per_month(heat_loss_coefficient)
+
+    output = htuse.calculate_space_heating_demand_per_month(
+        heat_loss_coefficient, thermal_capacitance
+    )
+
+    assert_frame_equal(output, expected_output)
+
+
+def test_calculate_space_heating_demand_per_month():
+    heat_loss_coefficient = pd.Series([121.0, 150.0], index=["a", "b"])
+    thermal_capacitance = pd.Series([165_000 * 100, 165_000 * 120], index=["a", "b"])
+    internal_gains = pd.Series([400.0, 500.0], index=["a", "b"])
+    solar_gains = np.linspace(100, 600, 12)
+    heat_loss = htuse.calculate_heat_loss_per_month(heat_loss_coefficient)
+    heating_hours = np.array(
+        [d * 24 for d in (31, 28, 31, 30, 31, 0, 0, 0, 0, 31, 30, 31)]
+    )
+    heat_gain = (
+        (internal_gains.to_numpy()[:, np.newaxis] + solar_gains) * heating_hours / 1000
+    )
+    time_constant = thermal_capacitance / (3600 * heat_loss_coefficient)
+    a = (1 + time_constant / 15).to_numpy()[:, np.newaxis]
+    with np.errstate(invalid="ignore"):
+        gain_loss_ratio = heat_gain / heat_loss.to_numpy()
+        utilisation_factor = (1 - gain_loss_ratio**a) / (1 - gain_loss_ratio ** (a + 1))
+    expected_output = heat_loss - np.nan_to_num(utilisation_factor) * heat_gain
+
+    output = htuse.calculate_space_heating_demand_per_month(
+        heat_loss_coefficient,
+        thermal_capacitance,
+        internal_gains=internal_gains,
+        solar_gains=solar_gains,
+    )
+
+    assert_frame_equal(output, expected_output)
+    assert (output[["jun", "jul", "aug", "sep"]] == 0).all().all()
+    assert ((output > 0) & (output < heat_loss))[["jan", "dec"]].all().all()
+
+
+def test_calculate_space_heating_demand_per_month_on_negative_heat_loss():
+    heat_loss_coefficient = pd.Series([121.0, 150.0])
+    thermal_capacitance = pd.Series([165_000 * 100, 165_000 * 120])
+    external_temperatures = np.array([5.0] * 11 + [22.0])
+
+    output = htuse.calculate_space_heating_demand_per_month(
+        heat_loss_coefficient,
+        thermal_capacitance,
+        internal_gains=400,
+        internal_temperatures=np.full(12, 20.0),
+        external_temperatures=external_temperatures,
+    )
+
+    assert (output["dec"] == 0).all()
+    assert (output[["jan", "nov"]] > 0).all().all()
+
+
+def test_calculate_space_heating_demand_per_year():
+    heat_loss_coefficient = pd.Series([121.0, 150.0])
+    thermal_capacitance = pd.Series([165_000 * 100, 165_000 * 120])
+
+    output = htuse.calculate_space_heating_demand_per_year(
+        heat_loss_coefficient, thermal_capacitance, internal_gains=400
+    )
+
+    assert_series_equal(
+        output,
+        htuse.calculate_space_heating_demand_per_month(
+            heat_loss_coefficient, thermal_capacitance, internal_gains=400
+        )
+        .sum(axis=1)
+        .round(),
+    )
+    assert (
+        output < htuse.calculate_heat_loss_per_year(heat_loss_coefficient, None, None)
+    ).all()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from pandera.errors import SchemaError
+import pytest
+
+import rcbm
+from rcbm import fab
+from rcbm import instrument
+from rcbm import vent
+
+
+def test_record_is_empty_outside_context():
+    with instrument.record() as recorder:
+        pass
+    fab.calculate_heat_loss_parameter(
+        pd.Series([0.5]), pd.Series([0.5]), pd.Series([1])
+    )
+
+    assert recorder.records == []
+    assert not instrument.is_recording()
+
+
+def test_record_times_nested_functions(stock):
+    with instrument.record() as recorder:
+        vent.calculate_infiltration_rate(
+            **{
+                c: stock[c]
+                for c in vent.INPUT_COLUMNS
+                if c not in ("ventilation_method", "heat_exchanger_efficiency")
+            }
+        )
+
+    records = {record.name: record for record in recorder.records}
+    outer = records["vent.calculate_infiltration_rate"]
+    inner = records["vent.calculate_infiltration_rate_due_to_structure"]
+    assert outer.rows == len(stock)
+    assert 0 < inner.seconds < outer.seconds
+    assert "vent.calculate_infiltration_rate_due_to_height[validation]" in records
+
+
+def test_record_times_validation_separately(stock):
+    with instrument.record() as recorder:
+        rcbm.calculate_heat_loss(stock)
+    with instrument.record() as trusted_recorder:
+        rcbm.calculate_heat_loss(stock, validate=False)
+
+    report = recorder.report()
+    assert "pipeline.calculate_heat_loss[validation]" in report.index
+    assert report.loc["pipeline.calculate_heat_loss", "calls"] == 1
+    assert trusted_recorder.report().index.tolist() == [
+        "pipeline.calculate_heat_loss",
+        "htuse.calculate_heat_loss_per_year",
+    ]
+
+
+def test_record_keeps_validation_errors():
+    with instrument.record():
+        with pytest.raises(SchemaError):
+            vent.calculate_infiltration_rate_due_to_structure_type(
+                pd.Series(["not a structure type"])
+            )
+
+
+def test_record_calls_callback():
+    records = []
+    with instrument.record(callback=records.append):
+        fab.calculate_heat_loss_parameter(
+            pd.Series([0.5]), pd.Series([0.5]), pd.Series([1])
+        )
+
+    [record] = records
+    assert record.name == "fab.calculate_heat_loss_parameter"
+    assert record.rows == 1
+    assert record.peak_memory_bytes is None
+
+
+def test_record_traces_peak_memory_of_nested_functions():
+    no_rows = 1_000_000
+    areas = np.ones((no_rows, 5))
+
+    with instrument.record(trace_memory=True) as recorder:
+        fab.calculate_fabric_upgrade_heat_loss_coefficients(
+            pd.DataFrame(areas, columns=fab.FABRIC_COMPONENTS),
+            pd.DataFrame(areas, columns=fab.FABRIC_COMPONENTS),
+            scenarios={"wall": {"wall": 0.5}},
+        )
+
+    records = {record.name: record for record in recorder.records}
+    outer = records["fab.calculate_fabric_upgrade_heat_loss_coefficients"]
+    inner = records["fab.calculate_fabric_heat_loss_coefficient_from_components"]
+    # the (N,) baseline is allocated by the inner function
+    assert inner.peak_memory_bytes >= no_rows * 8
+    assert outer.peak_memory_bytes >= inner.peak_memory_bytes
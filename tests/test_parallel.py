@@ -0,0 +1,69 @@
+from pandas.testing import assert_frame_equal
+from pandera.errors import SchemaError
+import pytest
+
+import rcbm
+from rcbm import parallel
+
+
+@pytest.mark.parametrize("no_shards", [1, 3, 50])
+def test_calculate_heat_loss_matches_serial(synthetic_stock, no_shards):
+    synthetic_stock.index = synthetic_stock.pop("ber_number")
+    synthetic_stock = synthetic_stock.drop(columns="unused_column").sample(
+        frac=1, random_state=42
+    )
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    output = parallel.calculate_heat_loss(
+        synthetic_stock, max_workers=2, no_shards=no_shards
+    )
+
+    assert_frame_equal(output, expected_output, check_exact=True)
+
+
+def test_calculate_heat_loss_on_categorical_inputs(synthetic_stock):
+    synthetic_stock["ventilation_method"] = synthetic_stock[
+        "ventilation_method"
+    ].astype("category")
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    output = parallel.calculate_heat_loss(synthetic_stock, max_workers=2)
+
+    assert_frame_equal(output, expected_output, check_exact=True)
+
+
+def test_calculate_heat_loss_on_hourly_profiles_per_building(synthetic_stock):
+    synthetic_stock = synthetic_stock.drop(columns=["ber_number", "unused_column"])
+    kwargs = {
+        "internal_temperatures": [20.0] * 24,
+        "external_temperatures": [
+            [float(hour + row % 3) for hour in range(24)]
+            for row in range(len(synthetic_stock))
+        ],
+        "how": "hourly",
+    }
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock, **kwargs)
+
+    output = parallel.calculate_heat_loss(
+        synthetic_stock, max_workers=2, no_shards=3, **kwargs
+    )
+
+    assert_frame_equal(output, expected_output, check_exact=True)
+
+
+@pytest.mark.parametrize(
+    "column, value",
+    [
+        ("structure_type", "brick"),
+        ("ventilation_method", None),
+        ("building_volume", float("nan")),
+        ("total_floor_area", 0),
+        ("is_draught_lobby", "yes"),
+    ],
+)
+def test_calculate_heat_loss_on_invalid_inputs(synthetic_stock, column, value):
+    synthetic_stock = synthetic_stock.drop(columns=["ber_number", "unused_column"])
+    synthetic_stock.loc[20, column] = value
+
+    with pytest.raises(SchemaError):
+        parallel.calculate_heat_loss(synthetic_stock, max_workers=2, no_shards=3)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from pandas.testing import assert_index_equal
+from pandas.testing import assert_series_equal
+from pandera.errors import SchemaError
+import pytest
+
+import rcbm
+from rcbm import fab
+from rcbm import htuse
+from rcbm import pipeline
+from rcbm import vent
+
+
+def _calculate_heat_loss_function_by_function(stock):
+    fabric_heat_loss_coefficient = fab.calculate_fabric_heat_loss_coefficient(
+        **{c: stock[c] for c in pipeline.FABRIC_COLUMNS}
+    )
+    infiltration_rate = vent.calculate_infiltration_rate(
+        **{
+            c: stock[c]
+            for c in vent.INPUT_COLUMNS
+            if c not in ("ventilation_method", "heat_exchanger_efficiency")
+        }
+    )
+    effective_air_rate_change = vent.calculate_effective_air_rate_change(
+        ventilation_method=stock["ventilation_method"],
+        building_volume=stock["building_volume"],
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=stock["heat_exchanger_efficiency"],
+    )
+    ventilation_heat_loss_coefficient = (
+        vent.calculate_ventilation_heat_loss_coefficient(
+            building_volume=stock["building_volume"],
+            effective_air_rate_change=effective_air_rate_change,
+        )
+    )
+    heat_loss_coefficient = (
+        fabric_heat_loss_coefficient + ventilation_heat_loss_coefficient
+    )
+    return pd.DataFrame(
+        {
+            "fabric_heat_loss_coefficient": fabric_heat_loss_coefficient,
+            "ventilation_heat_loss_coefficient": ventilation_heat_loss_coefficient,
+            "heat_loss_coefficient": heat_loss_coefficient,
+            "heat_loss_parameter": fab.calculate_heat_loss_parameter(
+                fabric_heat_loss_coefficient,
+                ventilation_heat_loss_coefficient,
+                stock["total_floor_area"],
+            ),
+            "annual_heat_loss": htuse.calculate_heat_loss_per_year(
+                heat_loss_coefficient, None, None
+            ),
+        }
+    )
+
+
+def test_calculate_heat_loss_matches_function_by_function(stock):
+    expected_output = _calculate_heat_loss_function_by_function(stock)
+
+    output = rcbm.calculate_heat_loss(stock)
+
+    assert_index_equal(expected_output.index, stock.index)
+    assert_frame_equal(output, expected_output)
+
+
+def test_calculate_heat_loss_on_deap_example_a(stock):
+    output = rcbm.calculate_heat_loss(stock)
+
+    assert round(output.loc[30, "fabric_heat_loss_coefficient"]) == 68
+
+
+def test_calculate_heat_loss_keeps_intermediates(stock):
+    output = rcbm.calculate_heat_loss(stock, keep_intermediates=True)
+
+    assert list(output.columns) == (
+        pipeline.OUTPUT_COLUMNS + pipeline.INTERMEDIATE_COLUMNS
+    )
+    assert_series_equal(
+        output["ventilation_heat_loss_coefficient"],
+        output["effective_air_rate_change"] * stock["building_volume"] * 0.33,
+        check_names=False,
+    )
+
+
+def test_calculate_heat_loss_on_categorical_inputs(stock):
+    expected_output = rcbm.calculate_heat_loss(stock)
+    stock["ventilation_method"] = stock["ventilation_method"].astype(
+        vent.VENTILATION_METHOD_DTYPE
+    )
+    stock["structure_type"] = stock["structure_type"].astype("category")
+
+    output = rcbm.calculate_heat_loss(stock)
+
+    assert_frame_equal(output, expected_output)
+
+
+def test_calculate_heat_loss_on_invalid_inputs(stock):
+    stock.loc[10, "is_floor_suspended"] = "brick"
+    with pytest.raises(SchemaError):
+        rcbm.calculate_heat_loss(stock)
+
+
+def test_calculate_heat_loss_raises_zerodivisionerror(stock):
+    stock.loc[10, "total_floor_area"] = 0
+    with pytest.raises(ZeroDivisionError):
+        rcbm.calculate_heat_loss(stock, validate=False)
+
+
+def test_compact(stock):
+    stock = pd.concat([stock] * 1000, ignore_index=True)
+
+    output = pipeline.compact(stock)
+
+    assert output["no_chimneys"].dtype == "uint8"
+    assert output["roof_area"].dtype == "float32"
+    assert output["ventilation_method"].dtype == vent.VENTILATION_METHOD_DTYPE
+    assert output.memory_usage(deep=True).sum() < stock.memory_usage(deep=True).sum()
+
+
+@pytest.mark.parametrize("keep_intermediates", [False, True])
+def test_calculate_heat_loss_on_deduplicated_archetypes(stock, keep_intermediates):
+    stock = pd.concat([stock] * 3).sample(frac=1, random_state=42)
+    stock["ventilation_method"] = stock["ventilation_method"].astype("category")
+    expected_output = rcbm.calculate_heat_loss(
+        stock, keep_intermediates=keep_intermediates
+    )
+
+    output = rcbm.calculate_heat_loss(
+        stock, keep_intermediates=keep_intermediates, deduplicate=True
+    )
+
+    assert_frame_equal(output, expected_output, check_exact=True)
+
+
+def test_calculate_heat_loss_on_deduplicated_archetypes_with_hourly_profiles(stock):
+    stock = pd.concat([stock] * 2)
+    internal_temperatures = np.full(24, 20.0)
+    external_temperatures = np.tile(np.linspace(0, 25, 24), (len(stock), 1))
+    external_temperatures[::2] += 1
+    kwargs = {
+        "internal_temperatures": internal_temperatures,
+        "external_temperatures": external_temperatures,
+        "how": "hourly",
+    }
+    expected_output = rcbm.calculate_heat_loss(stock, **kwargs)
+
+    output = rcbm.calculate_heat_loss(stock, deduplicate=True, **kwargs)
+
+    assert_frame_equal(output, expected_output, check_exact=True)
@@ -0,0 +1,66 @@
+import numpy as np
+from numpy.testing import assert_allclose
+import pytest
+
+import rcbm
+from rcbm import sensitivity
+
+
+@pytest.mark.parametrize("column", sensitivity.NUMERIC_INPUT_COLUMNS)
+def test_calculate_heat_loss_sensitivities_matches_finite_differences(stock, column):
+    step = 1e-6
+    outputs = ["heat_loss_coefficient", "heat_loss_parameter"]
+    upper, lower = stock.copy(), stock.copy()
+    upper[column] = stock[column] + step
+    lower[column] = stock[column] - step
+    expected_output = (
+        rcbm.calculate_heat_loss(upper)[outputs]
+        - rcbm.calculate_heat_loss(lower)[outputs]
+    ) / (2 * step)
+
+    output = sensitivity.calculate_heat_loss_sensitivities(stock)
+
+    # missing inputs have no effect on the model & so a derivative of 0
+    is_missing = stock[column].isnull()
+    for name in outputs:
+        assert_allclose(
+            output[(name, column)][~is_missing],
+            expected_output[name][~is_missing],
+            rtol=1e-5,
+            atol=1e-6,
+        )
+        assert (output[(name, column)][is_missing] == 0).all()
+
+
+def test_calculate_heat_loss_sensitivities_of_annual_heat_loss(stock):
+    heat_loss = rcbm.calculate_heat_loss(stock)
+    degree_kilohours = (
+        heat_loss["annual_heat_loss"] / heat_loss["heat_loss_coefficient"]
+    ).to_numpy()
+
+    output = sensitivity.calculate_heat_loss_sensitivities(stock)
+
+    assert_allclose(
+        output["annual_heat_loss"],
+        output["heat_loss_coefficient"] * degree_kilohours[:, np.newaxis],
+        rtol=1e-4,
+    )
+
+
+def test_calculate_heat_loss_sensitivities_on_hourly_temperatures(
+    stock,
+):
+    internal_temperatures = np.full(24, 20.0)
+    external_temperatures = np.tile(np.linspace(0, 25, 24), (len(stock), 1))
+    degree_kilohours = np.clip(20 - np.linspace(0, 25, 24), 0, None).sum() / 1000
+
+    output = sensitivity.calculate_heat_loss_sensitivities(
+        stock,
+        internal_temperatures=internal_temperatures,
+        external_temperatures=external_temperatures,
+        how="hourly",
+    )
+
+    assert_allclose(
+        output["annual_heat_loss"], output["heat_loss_coefficient"] * degree_kilohours
+    )
@@ -0,0 +1,53 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import pytest
+
+import rcbm
+from rcbm import pipeline
+from rcbm import stream
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_iter_stock_reads_only_input_columns_in_chunks(
+    tmp_path, synthetic_stock, suffix
+):
+    path = tmp_path / f"synthetic_stock{suffix}"
+    if suffix == ".csv":
+        synthetic_stock.to_csv(path, index=False)
+    else:
+        synthetic_stock.to_parquet(path, index=False)
+
+    chunks = list(stream.iter_stock(path, index_col="ber_number", chunksize=10))
+
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert set(chunks[0].columns) == set(pipeline.INPUT_COLUMNS)
+    assert chunks[-1].index[-1] == "ber24"
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_write_heat_loss(tmp_path, synthetic_stock, suffix):
+    path = tmp_path / "synthetic_stock.csv"
+    synthetic_stock.to_csv(path, index=False)
+    output_path = tmp_path / f"heat_loss{suffix}"
+    expected_output = rcbm.calculate_heat_loss(synthetic_stock)
+
+    stream.write_heat_loss(path, output_path, chunksize=10)
+
+    if suffix == ".csv":
+        output = pd.read_csv(output_path, index_col=0)
+    else:
+        output = pd.read_parquet(output_path)
+    assert_frame_equal(output, expected_output, check_index_type=False)
+
+
+def test_iter_heat_loss_renames_file_columns(tmp_path, synthetic_stock):
+    path = tmp_path / "synthetic_stock.csv"
+    synthetic_stock.rename(columns={"wall_uvalue": "UValueWall"}).to_csv(
+        path, index=False
+    )
+    columns = {c: c for c in pipeline.INPUT_COLUMNS if c != "wall_uvalue"}
+    columns["UValueWall"] = "wall_uvalue"
+
+    output = pd.concat(stream.iter_heat_loss(path, columns=columns, chunksize=7))
+
+    assert_frame_equal(output, rcbm.calculate_heat_loss(synthetic_stock))
@@ -0,0 +1,93 @@
+import numpy as np
+from numpy.testing import assert_allclose
+from pandas.testing import assert_frame_equal
+import pytest
+
+import rcbm
+from rcbm import uncertainty
+
+
+def test_calculate_heat_loss_uncertainty_without_distributions(stock):
+    expected_output = rcbm.calculate_heat_loss(stock)
+
+    output = uncertainty.calculate_heat_loss_uncertainty(
+        stock, distributions={}, no_samples=10, chunksize=2
+    )
+
+    for column in ["heat_loss_coefficient", "heat_loss_parameter"]:
+        for percentile in [5, 50, 95]:
+            assert_allclose(
+                output.buildings[(column, percentile)], expected_output[column]
+            )
+    assert_allclose(
+        output.stock.loc["annual_heat_loss"],
+        expected_output["annual_heat_loss"].sum(),
+        rtol=1e-4,
+    )
+
+
+def test_calculate_heat_loss_uncertainty_on_distributions(stock):
+    expected_output = rcbm.calculate_heat_loss(stock)
+
+    output = uncertainty.calculate_heat_loss_uncertainty(
+        stock,
+        distributions={
+            "wall_uvalue": uncertainty.normal(0.1, relative=True),
+            "building_volume": uncertainty.uniform(20),
+        },
+        no_samples=2_000,
+        seed=42,
+    )
+
+    hlc = output.buildings["heat_loss_coefficient"]
+    assert (hlc[5] < hlc[50]).all() & (hlc[50] < hlc[95]).all()
+    assert_allclose(hlc[50], expected_output["heat_loss_coefficient"], rtol=0.01)
+    stock_hlc = output.stock.loc["heat_loss_coefficient"]
+    assert stock_hlc[5] < hlc[50].sum() < stock_hlc[95]
+
+
+def test_calculate_heat_loss_uncertainty_is_reproducible(stock):
+    def _calculate():
+        return uncertainty.calculate_heat_loss_uncertainty(
+            stock,
+            distributions={"roof_uvalue": uncertainty.normal(0.05)},
+            no_samples=100,
+            seed=1,
+            chunksize=2,
+        )
+
+    assert_frame_equal(_calculate().buildings, _calculate().buildings)
+
+
+def test_normal_clips_to_minimum():
+    samples = uncertainty.normal(10)(np.array([0.1]), np.random.default_rng(0), 100)
+
+    assert samples.shape == (1, 100)
+    assert samples.min() == 0
+
+
+@pytest.mark.parametrize("column", ["ventilation_method", "not_a_column"])
+def test_calculate_heat_loss_uncertainty_raises_on_invalid_columns(stock, column):
+    with pytest.raises(ValueError):
+        uncertainty.calculate_heat_loss_uncertainty(
+            stock, distributions={column: uncertainty.normal(1)}
+        )
+
+
+@pytest.mark.parametrize("column", ["total_floor_area", "building_volume"])
+def test_calculate_heat_loss_uncertainty_raises_on_zero_samples(stock, column):
+    with pytest.raises(ZeroDivisionError):
+        uncertainty.calculate_heat_loss_uncertainty(
+            stock, distributions={column: uncertainty.uniform(1_000)}, seed=42
+        )
+
+
+def test_calculate_heat_loss_uncertainty_on_positive_minimum(stock):
+    output = uncertainty.calculate_heat_loss_uncertainty(
+        stock,
+        distributions={"building_volume": uncertainty.uniform(1_000, minimum=1)},
+        no_samples=100,
+        seed=42,
+    )
+
+    assert np.isfinite(output.stock.to_numpy()).all()
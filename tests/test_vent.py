@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from pandas.testing import assert_frame_equal
 from pandas.testing import assert_series_equal
 from pandera.errors import SchemaError
 import pytest
@@ -158,3 +159,287 @@ def test_calculate_ventilation_heat_loss_coefficient(monkeypatch):
     )
 
     assert_series_equal(output.round(), expected_output)
+
+
+@pytest.fixture
+def stock():
+    return pd.DataFrame(
+        {
+            "building_volume": [321.0, 100.0],
+            "no_chimneys": [0, 1],
+            "no_open_flues": [0, 1],
+            "no_fans": [1, 1],
+            "no_room_heaters": [0, 1],
+            "is_draught_lobby": [False, True],
+            "permeability_test_result": [0.15, np.nan],
+            "no_storeys": [2, 1],
+            "percentage_draught_stripped": [50, 75],
+            "is_floor_suspended": ["none", "unsealed"],
+            "structure_type": ["unknown", "timber_or_steel"],
+            "no_sides_sheltered": [2, 2],
+            "ventilation_method": [
+                "natural_ventilation",
+                "mechanical_ventilation_heat_recovery",
+            ],
+            "heat_exchanger_efficiency": [np.nan, 85],
+        }
+    )
+
+
+def test_validate_inputs(stock):
+    expected_output = stock.copy()
+
+    output = vent.validate_inputs(stock)
+
+    assert_frame_equal(output, expected_output)
+
+
+@pytest.mark.parametrize(
+    "column, value",
+    [
+        ("structure_type", "brick"),
+        ("ventilation_method", None),
+        ("building_volume", 0),
+        ("no_storeys", np.nan),
+    ],
+)
+def test_validate_inputs_on_invalid_inputs(stock, column, value):
+    stock.loc[0, column] = value
+    with pytest.raises(SchemaError):
+        vent.validate_inputs(stock)
+
+
+def test_trusted_inputs_skips_validation():
+    with vent.trusted_inputs():
+        output = vent.calculate_infiltration_rate_due_to_structure_type(
+            pd.Series(["brick"])
+        )
+
+    assert output.isnull().all()
+    with pytest.raises(SchemaError):
+        vent.calculate_infiltration_rate_due_to_structure_type(pd.Series(["brick"]))
+
+
+def test_trusted_inputs_matches_validated_outputs(stock):
+    columns = [
+        c
+        for c in vent.INPUT_COLUMNS
+        if c not in ("ventilation_method", "heat_exchanger_efficiency")
+    ]
+    expected_output = vent.calculate_infiltration_rate(**stock[columns])
+
+    with vent.trusted_inputs():
+        output = vent.calculate_infiltration_rate(**stock[columns])
+
+    assert_series_equal(output, expected_output)
+
+
+@pytest.mark.parametrize("index", [[5, 3, 9, 1], [7, 7, 2, 2]])
+def test_calculate_effective_air_rate_change_keeps_input_order(index):
+    ventilation_method = pd.Series(
+        [
+            "mechanical_ventilation_no_heat_recovery",
+            "natural_ventilation",
+            "mechanical_ventilation_heat_recovery",
+            "positive_input_ventilation_from_outside",
+        ],
+        index=index,
+    )
+    building_volume = pd.Series([321] * 4, index=index)
+    infiltration_rate = pd.Series([0.2, 1.2, 0.2, 0.2], index=index)
+    heat_exchanger_efficiency = pd.Series([np.nan, np.nan, 50, np.nan], index=index)
+    expected_output = pd.Series([0.7, 1.2, 0.45, 0.5], index=index)
+
+    output = vent.calculate_effective_air_rate_change(
+        ventilation_method=ventilation_method,
+        building_volume=building_volume,
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=heat_exchanger_efficiency,
+    )
+
+    assert_series_equal(output.round(2), expected_output)
+
+
+def test_calculate_effective_air_rate_change_aligns_inputs_on_index():
+    ventilation_method = pd.Series(
+        ["natural_ventilation", "mechanical_ventilation_no_heat_recovery"],
+        index=[1, 2],
+    )
+    building_volume = pd.Series([321, 321], index=[2, 1])
+    infiltration_rate = pd.Series([0.2, 1.2], index=[2, 1])
+    heat_exchanger_efficiency = pd.Series([np.nan, np.nan], index=[1, 2])
+    expected_output = pd.Series([1.2, 0.7], index=[1, 2])
+
+    output = vent.calculate_effective_air_rate_change(
+        ventilation_method=ventilation_method,
+        building_volume=building_volume,
+        infiltration_rate=infiltration_rate,
+        heat_exchanger_efficiency=heat_exchanger_efficiency,
+    )
+
+    assert_series_equal(output.round(2), expected_output)
+
+
+def test_calculate_ventilation_heat_loss_coefficient_aligns_inputs_on_index():
+    building_volume = pd.Series([100, 200], index=["a", "b"])
+    effective_air_rate_change = pd.Series([2.0, 1.0], index=["b", "a"])
+    expected_output = pd.Series([33.0, 132.0], index=["a", "b"])
+
+    output = vent.calculate_ventilation_heat_loss_coefficient(
+        building_volume, effective_air_rate_change
+    )
+
+    assert_series_equal(output.round(2), expected_output)
+
+
+@pytest.mark.parametrize(
+    "structure_type",
+    [
+        pd.Series(["unknown", "masonry", "timber_or_steel", "concrete"]),
+        pd.Series(
+            ["unknown", "masonry", "timber_or_steel", "concrete"],
+            dtype=vent.STRUCTURE_TYPE_DTYPE,
+        ),
+        pd.Series(
+            ["unknown", "masonry", "timber_or_steel", "concrete"],
+            dtype=pd.CategoricalDtype(
+                ["concrete", "timber_or_steel", "masonry", "unknown"]
+            ),
+        ),
+        pd.Series([0, 1, 2, 3], dtype="int8"),
+    ],
+)
+def test_calculate_infiltration_rate_due_to_structure_type_on_encoded_inputs(
+    structure_type,
+):
+    expected_output = pd.Series([0.35, 0.35, 0.25, 0])
+
+    output = vent.calculate_infiltration_rate_due_to_structure_type(structure_type)
+
+    assert_series_equal(output, expected_output)
+
+
+@pytest.mark.parametrize(
+    "is_floor_suspended",
+    [
+        pd.Series(["none", "brick"], dtype="category"),
+        pd.Series([0, 3], dtype="int8"),
+        pd.Series(["none", None], dtype=vent.FLOOR_TYPE_DTYPE),
+    ],
+)
+def test_calculate_infiltration_rate_due_to_suspended_floor_on_invalid_encoded_inputs(
+    is_floor_suspended,
+):
+    with pytest.raises(SchemaError):
+        vent.calculate_infiltration_rate_due_to_suspended_floor(is_floor_suspended)
+
+
+def test_calculate_effective_air_rate_change_on_categorical_inputs():
+    ventilation_method = pd.Series(
+        ["natural_ventilation", "mechanical_ventilation_no_heat_recovery"],
+        dtype=vent.VENTILATION_METHOD_DTYPE,
+    )
+    expected_output = pd.Series([0.52, 0.7])
+
+    output = vent.calculate_effective_air_rate_change(
+        ventilation_method=ventilation_method,
+        building_volume=pd.Series([321, 321]),
+        infiltration_rate=pd.Series([0.2, 0.2]),
+        heat_exchanger_efficiency=pd.Series([0, 0]),
+    )
+
+    assert_series_equal(output.round(2), expected_output)
+
+
+def test_calculate_ventilation_upgrade_scenarios(stock):
+    scenarios = {
+        "draught_stripping": {"percentage_draught_stripped": 100},
+        "seal_floors": {
+            "is_floor_suspended": lambda s: s.replace("unsealed", "sealed")
+        },
+        "mvhr": {
+            "ventilation_method": "mechanical_ventilation_heat_recovery",
+            "heat_exchanger_efficiency": 85,
+        },
+    }
+    columns = [
+        c
+        for c in vent.INPUT_COLUMNS
+        if c not in ("ventilation_method", "heat_exchanger_efficiency")
+    ]
+
+    def _calculate_ventilation_heat_loss_coefficient(stock):
+        infiltration_rate = vent.calculate_infiltration_rate(**stock[columns])
+        effective_air_rate_change = vent.calculate_effective_air_rate_change(
+            ventilation_method=stock["ventilation_method"],
+            building_volume=stock["building_volume"],
+            infiltration_rate=infiltration_rate,
+            heat_exchanger_efficiency=stock["heat_exchanger_efficiency"],
+        )
+        return vent.calculate_ventilation_heat_loss_coefficient(
+            stock["building_volume"], effective_air_rate_change
+        )
+
+    expected_output = pd.DataFrame(
+        {
+            "draught_stripping": _calculate_ventilation_heat_loss_coefficient(
+                stock.assign(percentage_draught_stripped=100)
+            ),
+            "seal_floors": _calculate_ventilation_heat_loss_coefficient(
+                stock.assign(is_floor_suspended=["none", "sealed"])
+            ),
+            "mvhr": _calculate_ventilation_heat_loss_coefficient(
+                stock.assign(
+                    ventilation_method="mechanical_ventilation_heat_recovery",
+                    heat_exchanger_efficiency=85,
+                )
+            ),
+        }
+    )
+
+    output = vent.calculate_ventilation_upgrade_scenarios(stock, scenarios)
+
+    assert output.shape == (2, 6)
+    assert_frame_equal(
+        output["ventilation_heat_loss_coefficient"],
+        expected_output,
+        check_dtype=False,
+    )
+
+
+def test_calculate_ventilation_upgrade_scenarios_converts_baseline_once(
+    stock, monkeypatch
+):
+    get_codes = vent._get_codes
+    encoded = []
+
+    def _get_codes(values, categories):
+        encoded.append(categories)
+        return get_codes(values, categories)
+
+    monkeypatch.setattr(vent, "_get_codes", _get_codes)
+
+    vent.calculate_ventilation_upgrade_scenarios(
+        stock,
+        {
+            "draught_stripping": {"percentage_draught_stripped": 100},
+            "no_fans": {"no_fans": 0},
+            "mvhr": {"ventilation_method": "mechanical_ventilation_heat_recovery"},
+        },
+    )
+
+    assert encoded.count(vent.VENTILATION_METHODS) == 2
+
+
+def test_calculate_ventilation_upgrade_scenarios_on_invalid_overrides(stock):
+    with pytest.raises(SchemaError):
+        vent.calculate_ventilation_upgrade_scenarios(
+            stock, {"heat_pump": {"ventilation_method": "heat_pump"}}
+        )
+
+
+def test_calculate_ventilation_upgrade_scenarios_on_unknown_overrides(stock):
+    with pytest.raises(ValueError, match="no_open_flus"):
+        vent.calculate_ventilation_upgrade_scenarios(
+            stock, {"seal_flues": {"no_open_flus": 0}}
+        )
@@ -0,0 +1,84 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+import pandas as pd
+from pandas.testing import assert_series_equal
+import pytest
+
+from rcbm import htuse
+from rcbm import weather
+
+
+@pytest.fixture
+def weather_store(tmp_path):
+    store = weather.WeatherStore(tmp_path / "weather")
+    store.save("dublin_airport", 2020, np.full(8760, 5.0))
+    store.save("dublin_airport", 2021, np.full(8760, 6.0))
+    store.save("cork_airport", 2020, np.full(8760, 7.0))
+    return store
+
+
+def test_weather_store_loads_memory_mapped_profiles(weather_store):
+    output = weather_store["dublin_airport", 2020]
+
+    assert isinstance(output, np.memmap)
+    assert not output.flags.writeable
+    assert_array_equal(output, np.full(8760, 5.0))
+
+
+def test_weather_store_keys(weather_store):
+    assert weather_store.keys() == [
+        ("cork_airport", 2020),
+        ("dublin_airport", 2020),
+        ("dublin_airport", 2021),
+    ]
+    assert ("cork_airport", 2020) in weather_store
+    assert ("cork_airport", 2021) not in weather_store
+
+
+def test_weather_store_for_year(weather_store):
+    output = weather_store.for_year(2020)
+
+    assert sorted(output) == ["cork_airport", "dublin_airport"]
+
+
+def test_weather_store_raises_keyerror_on_missing_profiles(weather_store):
+    with pytest.raises(KeyError):
+        weather_store["galway", 2020]
+
+
+@pytest.mark.parametrize("station", ["", "../etc", ".hidden"])
+def test_weather_store_raises_on_invalid_station_names(weather_store, station):
+    with pytest.raises(ValueError):
+        weather_store.save(station, 2020, np.zeros(8760))
+
+
+def test_heat_loss_per_year_reads_profiles_from_weather_store(weather_store):
+    heat_loss_coefficient = pd.Series([100, 200])
+    expected_output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=np.full(8760, 20.0),
+        external_temperatures=np.full(8760, 5.0),
+        how="hourly",
+    )
+
+    output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=heat_loss_coefficient,
+        internal_temperatures=np.full(8760, 20.0),
+        external_temperatures=("dublin_airport", 2020),
+        how="hourly",
+        weather_store=weather_store,
+    )
+
+    assert_series_equal(output, expected_output)
+
+
+def test_heat_loss_per_year_by_climate_zone_reads_from_weather_store(weather_store):
+    output = htuse.calculate_heat_loss_per_year(
+        heat_loss_coefficient=pd.Series([100, 100]),
+        internal_temperatures=np.full(8760, 20.0),
+        external_temperatures=weather_store.for_year(2020),
+        how="hourly",
+        climate_zone=["dublin_airport", "cork_airport"],
+    )
+
+    assert_series_equal(output, pd.Series([13140.0, 11388.0]))